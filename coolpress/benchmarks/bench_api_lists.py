@@ -0,0 +1,85 @@
+"""
+List throughput of the posts and authors API: DRF serialization of model
+instances against the ``values()`` fast path of ``FastListMixin``, for 100,
+1k and 10k rows on a scratch database. The authors serializer runs on the
+queryset the API had before, without ``select_related('user')``.
+
+    python -m benchmarks.bench_api_lists --rows 100 1000 10000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import setup_django, timed, report
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from press.fast_lists import fast_rows, field_lookups, to_json  # noqa: E402
+from press.models import Category, CoolUser, Post, PostStatus  # noqa: E402
+from press.serializers import AuthorSerializer, PostSerializer  # noqa: E402
+from press.views import AuthorsViewSet, PostViewSet  # noqa: E402
+
+
+def seed(rows: int):
+    User.objects.bulk_create([User(username=f'writer{number}') for number in range(rows)],
+                             batch_size=500)
+    CoolUser.objects.bulk_create([CoolUser(user=user, github_profile=user.username, post_count=1)
+                                  for user in User.objects.all()], batch_size=500)
+    category = Category.objects.create(label='Tech', slug='tech', post_count=rows)
+    authors = list(CoolUser.objects.values_list('id', flat=True))
+    Post.objects.bulk_create([Post(category=category, author_id=authors[number],
+                                   title=f'Post number {number}', body='Lorem ipsum ' * 80,
+                                   status=PostStatus.PUBLISHED)
+                              for number in range(rows)], batch_size=500)
+
+
+def serializer_list(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def fast_list(fields, queryset):
+    return to_json(fast_rows(queryset.values(*field_lookups(fields)), fields))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', nargs='+', type=int, default=[100, 1000, 10000])
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        connections.databases['default']['NAME'] = Path(directory) / 'bench.sqlite3'
+        call_command('migrate', verbosity=0)
+        seed(max(args.rows))
+
+        posts = Post.objects.filter(status=PostStatus.PUBLISHED).order_by('-creation_date')
+        authors = CoolUser.objects.filter(post_count__gte=1).order_by('id')
+        endpoints = [
+            ('posts', PostSerializer, posts, PostViewSet.fast_fields, posts),
+            ('authors', AuthorSerializer, authors, AuthorsViewSet.fast_fields,
+             AuthorsViewSet.queryset),
+        ]
+        for rows in args.rows:
+            for name, serializer_class, queryset, fields, fast_queryset in endpoints:
+                serializer_time, _ = timed(serializer_list, serializer_class, queryset[:rows])
+                fast_time, _ = timed(fast_list, fields, fast_queryset[:rows])
+                results.append({
+                    'endpoint': name,
+                    'rows': rows,
+                    'serializer_rows_per_s': int(rows / serializer_time),
+                    'fast_rows_per_s': int(rows / fast_time),
+                    'speedup': f'{serializer_time / fast_time:.2f}x',
+                })
+        connections.close_all()
+    report(results, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
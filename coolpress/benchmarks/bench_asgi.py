@@ -0,0 +1,148 @@
+"""
+The read heavy views under WSGI and under ASGI at a given concurrency:
+requests per second and p50/p99 latency for /home/, /posts/, /trending/ and
+a post detail page, once with the page cache answering ("cached") and once
+with a unique query string per request ("uncached").
+
+Each server runs in its own process, in-process through Django's test
+handlers (no network): WSGI requests on a pool of ``--concurrency`` threads,
+ASGI requests as ``--concurrency`` concurrent tasks. The views are the same
+sync views under both.
+
+    python -m benchmarks.bench_asgi --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.common import setup_django, make_mediastack_articles, report
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import AsyncClient, Client, override_settings  # noqa: E402
+
+from press.mediastack_manager import import_mediastack_batch  # noqa: E402
+from press.models import Post  # noqa: E402
+
+SEED_POSTS = 1000
+SCENARIOS = ['cached', 'uncached']
+SERVERS = ['wsgi', 'asgi']
+
+
+def get_paths():
+    post_id = Post.objects.order_by('id').values_list('id', flat=True).first()
+    return ['/home/', '/posts/', '/trending/', f'/post_details/{post_id}']
+
+
+def request_params(scenario: str, number: int) -> dict:
+    return {'request': number} if scenario == 'uncached' else {}
+
+
+def summarize(server: str, scenario: str, latencies: list, errors: int, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        'server': server,
+        'scenario': scenario,
+        'requests_per_s': int(len(latencies) / elapsed),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+        'errors': errors,
+    }
+
+
+def run_wsgi(paths, scenario: str, concurrency: int, requests: int) -> dict:
+    local = threading.local()
+    latencies, errors = [], []
+
+    def get(number: int):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        start = time.perf_counter()
+        response = local.client.get(paths[number % len(paths)], request_params(scenario, number))
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(number)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(get, range(requests)))
+        list(executor.map(lambda _: connections.close_all(), range(concurrency)))
+    return summarize('wsgi', scenario, latencies, len(errors), time.perf_counter() - start)
+
+
+async def run_asgi(paths, scenario: str, concurrency: int, requests: int) -> dict:
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def get(number: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(paths[number % len(paths)],
+                                        request_params(scenario, number))
+            latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(number)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(get(number) for number in range(requests)))
+    return summarize('asgi', scenario, latencies, len(errors), time.perf_counter() - start)
+
+
+def serve(args):
+    connections.databases['default']['NAME'] = args.database
+    # Before the first request, which builds the URLconf.
+    with override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+        paths = get_paths()
+        results = []
+        for scenario in SCENARIOS:
+            if args.server == 'wsgi':
+                results.append(run_wsgi(paths, scenario, args.concurrency, args.requests))
+            else:
+                results.append(asyncio.run(run_asgi(paths, scenario, args.concurrency,
+                                                    args.requests)))
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--json', dest='json_path')
+    parser.add_argument('--server', choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.server:
+        return serve(args)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        database = str(Path(directory) / 'bench.sqlite3')
+        connections.databases['default']['NAME'] = database
+        call_command('migrate', verbosity=0)
+        import_mediastack_batch(make_mediastack_articles(0, SEED_POSTS))
+        connections.close_all()
+
+        for server in SERVERS:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_asgi', '--server', server,
+                 '--database', database, '--concurrency', str(args.concurrency),
+                 '--requests', str(args.requests)],
+                check=True, capture_output=True, text=True).stdout
+            results.extend(json.loads(output.splitlines()[-1]))
+    report(results, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
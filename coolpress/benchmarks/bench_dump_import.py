@@ -0,0 +1,85 @@
+"""
+Offline import of a gzipped NDJSON mediastack dump into a scratch database:
+parse only (rows per second and peak Python memory, against ``json.load`` of
+the same articles as one JSON response), then the full import at a few batch
+sizes.
+
+    python -m benchmarks.bench_dump_import --articles 100000 --batch-sizes 500 2000 5000
+"""
+import argparse
+import gzip
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import setup_django, make_mediastack_articles, timed, report
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from press.mediastack_dumps import import_mediastack_dumps, iter_dump_files, open_dump  # noqa: E402
+
+WRITE_CHUNK = 10000
+
+
+def write_dumps(directory: Path, articles: int):
+    ndjson, response = directory / 'dump.ndjson.gz', directory / 'dump.json.gz'
+    with gzip.open(ndjson, 'wt') as fw:
+        for start in range(0, articles, WRITE_CHUNK):
+            for article in make_mediastack_articles(start, min(WRITE_CHUNK, articles - start)):
+                fw.write(json.dumps(article) + '\n')
+    with gzip.open(response, 'wt') as fw:
+        json.dump({'data': make_mediastack_articles(0, articles)}, fw)
+    return str(ndjson), str(response)
+
+
+def traced(func, *args):
+    tracemalloc.start()
+    elapsed, result = timed(func, *args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def stream_count(path):
+    return sum(1 for _ in iter_dump_files([path]))
+
+
+def load_count(path):
+    with open_dump(path) as stream:
+        return len(json.load(stream)['data'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[500, 2000, 5000])
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        ndjson, response = write_dumps(Path(directory), args.articles)
+        for name, func, path in [('stream ndjson', stream_count, ndjson),
+                                 ('json.load response', load_count, response)]:
+            elapsed, peak, rows = traced(func, path)
+            results.append({'step': name, 'rows': rows, 'rows_per_s': int(rows / elapsed),
+                            'peak_mb': round(peak / 1024 ** 2, 1)})
+
+        for batch_size in args.batch_sizes:
+            connections.databases['default']['NAME'] = Path(directory) / f'{batch_size}.sqlite3'
+            call_command('migrate', verbosity=0)
+            # Not traced, tracemalloc slows the ORM down too much.
+            elapsed, progress = timed(import_mediastack_dumps, [ndjson], batch_size)
+            results.append({'step': f'import, batches of {batch_size}', 'rows': progress.inserted,
+                            'rows_per_s': int(progress.rows / elapsed), 'peak_mb': '-'})
+            connections.close_all()
+    report(results, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
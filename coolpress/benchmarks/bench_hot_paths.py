@@ -0,0 +1,153 @@
+"""
+The hot paths on a scratch database filled by ``press.synthetic``: a post
+detail page and ``comment_analyzer`` for posts with 10, 1k and 50k comments,
+the trending page, the posts API list, and ``serialize_from_mediastack``
+against ``import_mediastack_batch`` for a page of articles.
+
+Pages are requested with a unique query string, so the page cache never
+answers. Every case runs ``--repeat`` times; the median, the fastest run and
+the queries of one run are reported. The ``--json`` file records the commit
+and the versions next to the results, to compare two runs with
+``benchmarks.compare``:
+
+    python -m benchmarks.bench_hot_paths --json before.json
+    python -m benchmarks.bench_hot_paths --json after.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import setup_django, environment, make_mediastack_articles, report
+
+setup_django()
+
+from django.core.cache import caches  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from press.counters import reconcile_counters  # noqa: E402
+from press.mediastack_manager import import_mediastack_batch, \
+    serialize_from_mediastack  # noqa: E402
+from press.models import Comment, Post  # noqa: E402
+from press.stats_manager import Stats, comment_analyzer, rebuild_comment_word_counts, \
+    top_comment_words  # noqa: E402
+from press.synthetic import TextGenerator, create_comments, create_posts, \
+    generate_synthetic_data  # noqa: E402
+from press.trending import rebuild_trending_scores  # noqa: E402
+from press.word_clouds import WORD_CLOUD_CACHE, render_word_cloud_svg, \
+    word_cloud_key  # noqa: E402
+
+
+def add_commented_posts(comment_counts, data, seed: int) -> dict:
+    """One more post per size with exactly that many comments, by size."""
+    text = TextGenerator(random.Random(seed))
+    posts = {}
+    for count in comment_counts:
+        [post_id] = create_posts(1, text, data.categories, data.users)
+        create_comments(count, text, [post_id], data.users, exponent=None)
+        posts[count] = post_id
+    rebuild_comment_word_counts(post_ids=list(posts.values()))
+    reconcile_counters()
+    rebuild_trending_scores()
+    return posts
+
+
+def warm_word_cloud(post_id: int):
+    # The page renders the cloud in the background on a miss: have it ready,
+    # as it is once the page has been seen, so no run pays for it.
+    frequencies = dict(Stats.from_counts(dict(top_comment_words(post_id, limit=20))).top(20))
+    if frequencies:
+        caches[WORD_CLOUD_CACHE].set(word_cloud_key(frequencies),
+                                     render_word_cloud_svg(frequencies))
+
+
+def measure(case: str, size: int, repeat: int, func) -> dict:
+    """Time ``func(run)`` ``repeat`` times, after a first run that counts the queries."""
+    with CaptureQueriesContext(connection) as queries:
+        func(-1)
+    # Read now, the next requests reset the query log.
+    query_count = len(queries)
+    timings = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        func(run)
+        timings.append(time.perf_counter() - start)
+    return {'case': case, 'size': size,
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'min_ms': round(min(timings) * 1000, 2),
+            'queries': query_count}
+
+
+def get_page(client, path: str):
+    def run(number):
+        response = client.get(path, {'run': time.monotonic_ns()})
+        assert response.status_code == 200, (path, response.status_code)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=50000)
+    parser.add_argument('--comment-counts', nargs='+', type=int, default=[10, 1000, 50000])
+    parser.add_argument('--articles', type=int, default=100,
+                        help='Articles per run for the mediastack cases')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, \
+            override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+        connections.databases['default']['NAME'] = Path(directory) / 'bench.sqlite3'
+        call_command('migrate', verbosity=0)
+        data = generate_synthetic_data(args.users, args.categories, args.posts, args.comments,
+                                       seed=args.seed)
+        commented = add_commented_posts(args.comment_counts, data, args.seed + 1)
+
+        client = Client()
+        for size, post_id in commented.items():
+            warm_word_cloud(post_id)
+            results.append(measure('post_detail', size, args.repeat,
+                                   get_page(client, f'/post_details/{post_id}')))
+        for size, post_id in commented.items():
+            comments = Comment.objects.filter(post_id=post_id)
+            results.append(measure('comment_analyzer', size, args.repeat,
+                                   lambda run: comment_analyzer(comments).top(10)))
+        total_comments = Comment.objects.count()
+        results.append(measure('trending_posts_list', total_comments, args.repeat,
+                               get_page(client, '/trending/')))
+        results.append(measure('posts_api_list', Post.objects.count(), args.repeat,
+                               get_page(APIClient(), '/api/posts/')))
+
+        # New articles on every run, so each one is inserted rather than found.
+        offsets = itertools.count(0, args.articles)
+
+        def articles():
+            return make_mediastack_articles(next(offsets), args.articles)
+
+        results.append(measure('serialize_from_mediastack', args.articles, args.repeat,
+                               lambda run: [serialize_from_mediastack(article)
+                                            for article in articles()]))
+        results.append(measure('import_mediastack_batch', args.articles, args.repeat,
+                               lambda run: import_mediastack_batch(articles())))
+        connections.close_all()
+
+    metadata = {**environment(), 'params': vars(args)}
+    report(results, args.json_path, metadata)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Readers against a writer on SQLite: N threads request the post lists while
+``import_mediastack_batch`` keeps writing, once with SQLite's defaults
+(rollback journal, a new connection per request) and once with the
+production mode of ``settings-prod`` (WAL, tuned PRAGMAs, persistent
+connections). Runs on a scratch database file; every request has its own
+query string, so none is answered by the page cache.
+
+    python -m benchmarks.bench_sqlite_concurrency --readers 1 8 32 --seconds 10
+"""
+import argparse
+import importlib
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import setup_django, make_mediastack_articles, report
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from press.mediastack_manager import import_mediastack_batch  # noqa: E402
+
+READ_PATHS = ['/posts/', '/api/posts/']
+SEED_POSTS = 2000
+
+
+def production_settings():
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark')
+    return importlib.import_module('coolpress.settings-prod')
+
+
+def use_mode(pragmas: dict, conn_max_age: int):
+    connections.close_all()
+    settings.SQLITE_PRAGMAS = pragmas
+    connections.databases['default']['CONN_MAX_AGE'] = conn_max_age
+
+
+def writer(stop: threading.Event, batch_size: int, stats: dict):
+    while not stop.is_set():
+        try:
+            import_mediastack_batch(make_mediastack_articles(stats['next'], batch_size))
+            stats['rows'] += batch_size
+        except Exception:
+            stats['errors'] += 1
+        stats['next'] += batch_size
+    connections.close_all()
+
+
+def reader(stop: threading.Event, latencies: list, errors: list):
+    client = Client(raise_request_exception=False)
+    count = 0
+    while not stop.is_set():
+        path = READ_PATHS[count % len(READ_PATHS)]
+        start = time.perf_counter()
+        response = client.get(path, {'request': f'{threading.get_ident()}-{count}'})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(path)
+        count += 1
+    connections.close_all()
+
+
+def run(readers: int, seconds: float, batch_size: int, start: int):
+    stop = threading.Event()
+    latencies, errors = [], []
+    write_stats = {'rows': 0, 'errors': 0, 'next': start}
+    threads = [threading.Thread(target=writer, args=(stop, batch_size, write_stats))]
+    threads += [threading.Thread(target=reader, args=(stop, latencies, errors))
+                for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return write_stats['next'], {
+        'readers': readers,
+        'requests_per_s': int(len(latencies) / seconds),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else '-',
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 1) if latencies else '-',
+        'read_errors': len(errors),
+        'rows_written_per_s': int(write_stats['rows'] / seconds),
+        'write_errors': write_stats['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    prod = production_settings()
+    modes = [
+        ('default', {'journal_mode': 'delete'}, 0),
+        ('production', prod.SQLITE_PRAGMAS, prod.DATABASES['default']['CONN_MAX_AGE']),
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, \
+            override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+        connections.databases['default']['NAME'] = Path(directory) / 'bench.sqlite3'
+        call_command('migrate', verbosity=0)
+        import_mediastack_batch(make_mediastack_articles(0, SEED_POSTS))
+        written = SEED_POSTS
+
+        for mode, pragmas, conn_max_age in modes:
+            use_mode(pragmas, conn_max_age)
+            for readers in args.readers:
+                written, row = run(readers, args.seconds, args.batch_size, start=written)
+                results.append({'mode': mode, **row})
+        connections.close_all()
+    report(results, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Tokenizer throughput of ``press.stats_manager.Stats``: the previous
+replace/split/filter implementation against the current regex tokenizer and
+heap based top-k, on synthetic corpora.
+
+    python -m benchmarks.bench_stats --sizes 10KB 1MB 10MB 100MB
+"""
+import argparse
+import random
+from collections import Counter
+
+from benchmarks.common import setup_django, parse_size, timed, report
+
+setup_django()
+
+from press.stats_manager import Stats, STOPWORDS  # noqa: E402
+
+VOCABULARY_SIZE = 20000
+
+
+def legacy_top(text, limit):
+    stopwords = set(STOPWORDS) | {'"', '.', '-'}
+    words = text.lower().replace(',', ' ').replace('\n', ' ').split(' ')
+    words = filter(lambda x: len(x) > 0 and not x.isdigit() and not x.isspace()
+                             and x not in stopwords, words)
+    analyzed = Counter(words)
+    results = sorted(analyzed.items(), key=lambda key_val: (-key_val[1], key_val[0]))
+    return results[:limit]
+
+
+def current_top(text, limit):
+    return Stats(text).top(limit)
+
+
+def make_corpus(size: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+                  for _ in range(VOCABULARY_SIZE)]
+    vocabulary.extend(sorted(STOPWORDS)[:200])
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    punctuation = ['', '', '', '', ',', '.', '"', '!', '\n']
+    paragraph = ' '.join(word + rng.choice(punctuation)
+                         for word in rng.choices(vocabulary, weights, k=20000))
+    repeats = size // len(paragraph) + 1
+    return (paragraph + '\n') * repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['10KB', '1MB', '10MB', '100MB'])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = []
+    for size_label in args.sizes:
+        text = make_corpus(parse_size(size_label))[:parse_size(size_label)]
+        words = text.count(' ') + 1
+        legacy_time, _ = timed(legacy_top, text, args.top)
+        current_time, _ = timed(current_top, text, args.top)
+        results.append({
+            'size': size_label,
+            'words': words,
+            'legacy_words_per_s': int(words / legacy_time),
+            'current_words_per_s': int(words / current_time),
+            'speedup': f'{legacy_time / current_time:.2f}x',
+        })
+    report(results, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
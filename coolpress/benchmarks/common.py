@@ -0,0 +1,96 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks are run as modules from the project folder, e.g.
+``python -m benchmarks.bench_stats``.
+"""
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import time
+
+import django
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coolpress.settings")
+    django.setup()
+    logging.getLogger('django.db.backends').setLevel(logging.WARNING)
+
+
+def parse_size(size: str) -> int:
+    match = re.fullmatch(r'(\d+)\s*([KMG]?B)', size.strip().upper())
+    if not match:
+        raise ValueError(f'Invalid size {size!r}, use something like 10KB or 100MB')
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def make_mediastack_articles(start: int, count: int):
+    """Synthetic mediastack results, numbered from ``start``."""
+    return [{
+        'author': f'Staff Writer {number % 20}',
+        'title': f'Article number {number}',
+        'description': f'Description of the article number {number} ' * 20,
+        'url': f'https://example.com/articles/{number}',
+        'source': 'example',
+        'image': None,
+        'category': ['general', 'business', 'science', 'sports'][number % 4],
+        'language': 'en',
+        'country': 'us',
+        'published_at': '2022-11-24T00:50:31+00:00',
+    } for number in range(start, start + count)]
+
+
+def git_revision():
+    """The checked out commit, with a + when the tracked files have changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True,
+                                capture_output=True, text=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                 check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if changes else '')
+
+
+def environment() -> dict:
+    return {'commit': git_revision(), 'python': platform.python_version(),
+            'django': django.get_version(), 'platform': platform.platform(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+
+
+def load_results(json_path):
+    """The result rows of a ``--json`` file, with or without its ``environment()``."""
+    with open(json_path) as fr:
+        data = json.load(fr)
+    return data['results'] if isinstance(data, dict) else data
+
+
+def report(results, json_path=None, metadata=None):
+    """
+    Print the results as a table and, with ``json_path``, save them; with
+    ``metadata`` the file is an object with a ``results`` key instead of a list.
+    """
+    if not results:
+        return
+    columns = list(results[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in results))
+              for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in results:
+        print('  '.join(str(row[column]).ljust(widths[column]) for column in columns))
+    if json_path:
+        with open(json_path, 'w') as fw:
+            json.dump(results if metadata is None else {**metadata, 'results': results}, fw,
+                      indent=2)
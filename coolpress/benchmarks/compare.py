@@ -0,0 +1,68 @@
+"""
+Compare two ``--json`` files of the same benchmark, e.g. the runs of
+``benchmarks.bench_hot_paths`` on two commits: one row per case with both
+values of the metric and the change. With ``--threshold`` the exit status is
+1 when a case got slower by more than that many percent.
+
+    python -m benchmarks.compare before.json after.json --metric median_ms --threshold 10
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.common import load_results, report
+
+
+def load_metadata(json_path) -> dict:
+    with open(json_path) as fr:
+        data = json.load(fr)
+    return data if isinstance(data, dict) else {}
+
+
+def compare(before, after, keys, metric, higher_is_better=False):
+    """Rows of ``after`` matched with ``before`` on ``keys``, with the change of ``metric``."""
+    baseline = {tuple(row.get(key) for key in keys): row[metric] for row in before}
+    rows = []
+    for row in after:
+        key = tuple(row.get(key) for key in keys)
+        if key not in baseline:
+            continue
+        old, new = baseline[key], row[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append({**dict(zip(keys, key)), 'before': old, 'after': new,
+                     'change': f'{change:+.1f}%',
+                     'regression': -change if higher_is_better else change})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--keys', nargs='+', default=['case', 'size'],
+                        help='Columns that identify a case')
+    parser.add_argument('--metric', default='median_ms')
+    parser.add_argument('--higher-is-better', action='store_true',
+                        help='For throughput metrics such as rows_per_s')
+    parser.add_argument('--threshold', type=float,
+                        help='Fail when a case regressed by more than this percentage')
+    args = parser.parse_args()
+
+    for label, path in [('before', args.before), ('after', args.after)]:
+        metadata = load_metadata(path)
+        if metadata:
+            print(f"{label}: {metadata.get('commit')} ({metadata.get('created_at')})")
+    rows = compare(load_results(args.before), load_results(args.after), args.keys, args.metric,
+                   args.higher_is_better)
+    regressions = [row for row in rows
+                   if args.threshold is not None and row['regression'] > args.threshold]
+    for row in rows:
+        row['regression'] = 'yes' if row in regressions else ''
+    report(rows)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
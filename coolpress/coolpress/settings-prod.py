@@ -7,4 +7,39 @@ ALLOWED_HOSTS = ['*']
 
 SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
 
-STATIC_ROOT = "/var/www/coolpress/static/"
\ No newline at end of file
+STATIC_ROOT = "/var/www/coolpress/static/"
+
+# Production SQLite mode: with WAL readers keep going while the importer
+# writes, and connections are reused across requests.
+DATABASES = {alias: {**database, 'CONN_MAX_AGE': 600} for alias, database in DATABASES.items()}
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    # Durable at checkpoints: a power loss may only drop the last commits.
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 ** 2,
+    # Negative sizes are in KiB: 64 MiB of page cache per connection.
+    'cache_size': -64 * 1024,
+    # Wait for a writer instead of failing with "database is locked".
+    'busy_timeout': 5000,
+}
+
+# The page cache versions and the word clouds must be shared by every worker:
+# with a per-process LocMemCache, a version bumped by one worker would leave
+# the others serving the pages it expired. SQLite already ties the site to
+# one host, so a cache directory on that host is enough.
+CACHE_DIR = os.environ.get('COOLPRESS_CACHE_DIR', '/var/tmp/coolpress/cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'default'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+    'wordclouds': {
+        **CACHES['wordclouds'],
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'wordclouds'),
+    },
+}
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'press.db_router.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,6 +76,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'coolpress.wsgi.application'
 
+ASGI_APPLICATION = 'coolpress.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -86,6 +89,52 @@ DATABASES = {
     }
 }
 
+# Read replicas: copies of the primary, listed as comma separated SQLite files
+# in DATABASE_REPLICA_PATHS and opened read-only. Safe requests read from them
+# (see press.db_router); a request that writes pins its client to the primary
+# for READ_YOUR_WRITES_SECONDS, and a replica that fails to connect is skipped
+# for REPLICA_RETRY_SECONDS.
+
+DATABASE_REPLICAS = []
+for number, path in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_PATHS', '').split(',')),
+                              start=1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{path}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['press.db_router.ReplicaRouter']
+
+# PRAGMAs run on every new SQLite connection (see press.sqlite). Empty keeps
+# SQLite's defaults; settings-prod turns on the production mode.
+SQLITE_PRAGMAS = {}
+READ_YOUR_WRITES_SECONDS = 10
+REPLICA_RETRY_SECONDS = 30
+
+
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# LocMemCache is per process, which only suits a single worker: settings-prod
+# shares a cache between the workers and `manage.py check --deploy` refuses
+# LocMemCache (press.checks).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'wordclouds': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wordclouds',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 500,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase
+
+from press.models import Category, CoolUser, Post, PostStatus
+
+
+class AsgiRequestsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.post = Post.objects.create(category=Category.objects.create(label='Tech', slug='tech'),
+                                       title='a new mac is out there', author=cls.cu,
+                                       status=PostStatus.PUBLISHED)
+
+    async def test_asgi_requests_go_through_the_middleware(self):
+        response = await AsyncClient().get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['title'], 'a new mac is out there')
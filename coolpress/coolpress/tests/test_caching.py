@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from press.checks import check_shared_caches
+from press.context_processors import categories_processor
+from press.models import Category, CoolUser, Post
+
+
+class CategoriesProcessorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.tech = Category.objects.create(label='Tech', slug='tech')
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+
+    def categories(self):
+        return list(categories_processor(self.request)['categories'])
+
+    def test_steady_state_costs_no_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.categories(),
+                             [{'id': self.tech.id, 'label': 'Tech', 'slug': 'tech', 'post_count': 0}])
+        with self.assertNumQueries(0):
+            self.categories()
+
+    def test_unused_categories_are_not_loaded(self):
+        with self.assertNumQueries(0):
+            categories_processor(self.request)
+
+    def test_category_and_post_writes_invalidate(self):
+        self.categories()
+
+        Category.objects.create(label='Food', slug='food')
+        self.assertEqual([category['label'] for category in self.categories()], ['Tech', 'Food'])
+
+        Post.objects.create(category=self.tech, title='a new mac is out there', author=self.cu)
+        self.assertEqual(self.categories()[0]['post_count'], 1)
+
+
+class SharedCachesCheckTest(SimpleTestCase):
+
+    def test_process_local_caches_fail_the_deploy_check(self):
+        errors = check_shared_caches(None)
+        self.assertEqual([error.id for error in errors], ['press.E001', 'press.E001'])
+
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                  'LOCATION': '/tmp/coolpress-cache'}
+        with override_settings(CACHES={'default': shared, 'wordclouds': shared}):
+            self.assertEqual(check_shared_caches(None), [])
@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from press.models import Category, Post, CoolUser, Comment, CommentStatus, CommentWordCount
+from press.stats_manager import top_comment_words, comment_analyzer
+from press.word_clouds import get_word_cloud_svg, schedule_word_cloud, WORD_CLOUD_CACHE
+
+
+class CommentWordCountTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='oscar')
+        cls.cu = CoolUser.objects.create(user=user)
+        cls.post = Post.objects.create(category=Category.objects.create(label='Tech', slug='tech'),
+                                       title='a new mac is out there',
+                                       author=cls.cu)
+
+    def add_comment(self, body, **kwargs):
+        return Comment.objects.create(body=body, votes=10, author=self.cu, post=self.post, **kwargs)
+
+    def expected_top(self, limit=10):
+        comments = self.post.comment_set.filter(status=CommentStatus.PUBLISHED)
+        return comment_analyzer(comments).top(limit)
+
+    def test_counts_follow_created_comments(self):
+        self.add_comment('apple apple banana')
+        self.add_comment('banana cherry, apple')
+        self.add_comment('hidden words', status=CommentStatus.NON_PUBLISHED)
+
+        self.assertEqual(top_comment_words(self.post), [('apple', 3), ('banana', 2), ('cherry', 1)])
+        self.assertEqual(top_comment_words(self.post), self.expected_top())
+
+    def test_counts_follow_edited_and_unpublished_comments(self):
+        first = self.add_comment('apple banana')
+        second = self.add_comment('apple cherry')
+
+        first.body = 'banana banana'
+        first.save()
+        self.assertEqual(top_comment_words(self.post), self.expected_top())
+
+        second.status = CommentStatus.NON_PUBLISHED
+        second.save()
+        self.assertEqual(top_comment_words(self.post), [('banana', 2)])
+
+        first.delete()
+        self.assertFalse(CommentWordCount.objects.filter(post=self.post).exists())
+
+    def test_rebuild_command(self):
+        self.add_comment('apple banana apple')
+        CommentWordCount.objects.all().delete()
+
+        call_command('rebuild_comment_stats', stdout=StringIO())
+
+        self.assertEqual(top_comment_words(self.post), [('apple', 2), ('banana', 1)])
+
+    def test_post_detail_reads_stored_counts(self):
+        self.add_comment('apple banana apple')
+
+        response = self.client.get(reverse('posts-detail', kwargs={'post_id': self.post.id}))
+
+        self.assertEqual(response.context['comment_stats'], [('apple', 2), ('banana', 1)])
+
+
+class WordCloudCacheTest(TestCase):
+
+    def setUp(self):
+        caches[WORD_CLOUD_CACHE].clear()
+
+    def test_miss_renders_in_background_then_hits(self):
+        frequencies = {'apple': 3, 'banana': 2}
+
+        self.assertIsNone(get_word_cloud_svg(frequencies))
+        # There is a single render worker: once a later job is done the first one is too.
+        schedule_word_cloud({'sync': 1}).result(timeout=30)
+
+        svg = get_word_cloud_svg(dict(reversed(frequencies.items())))
+        self.assertTrue(svg.startswith('<svg'))
+
+    def test_no_cloud_without_words(self):
+        self.assertIsNone(get_word_cloud_svg({}))
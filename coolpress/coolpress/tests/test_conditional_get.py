@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from press.models import Category, CoolUser, Post, PostStatus
+
+
+class ConditionalGetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.user = User.objects.create(username='oscar')
+        cls.cu = CoolUser.objects.create(user=cls.user)
+        cls.post = Post.objects.create(category=cls.category, author=cls.cu, title='a new mac',
+                                       body='is out there', status=PostStatus.PUBLISHED)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertNotModifiedCheaply(self, url, queries=1, joins=False, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(queries) as context:
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        if not joins:
+            self.assertNotIn('JOIN', context.captured_queries[-1]['sql'])
+        return etag
+
+    def test_posts(self):
+        list_etag = self.assertNotModifiedCheaply('/api/posts/')
+        # django-filter validates the category choice with a query of its own.
+        self.assertNotModifiedCheaply('/api/posts/', queries=2, category=self.category.id)
+        detail_etag = self.assertNotModifiedCheaply(f'/api/posts/{self.post.id}/')
+
+        self.post.title = 'a new phone'
+        self.post.save()
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=list_etag).status_code,
+                         200)
+        response = self.client.get(f'/api/posts/{self.post.id}/', HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.json()['title'], 'a new phone')
+
+    def test_renderings_have_their_own_etag(self):
+        for url in ['/api/posts/', f'/api/posts/{self.post.id}/']:
+            with self.subTest(url=url):
+                json_etag = self.assertNotModifiedCheaply(url)
+                html = self.client.get(url, HTTP_ACCEPT='text/html')
+                self.assertEqual(html['Content-Type'], 'text/html; charset=utf-8')
+                self.assertNotEqual(html['ETag'], json_etag)
+                self.assertIn('Accept', html['Vary'])
+
+                response = self.client.get(url, HTTP_ACCEPT='text/html',
+                                           HTTP_IF_NONE_MATCH=json_etag)
+                self.assertEqual(response.status_code, 200)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=json_etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertIn('Accept', response['Vary'])
+
+    def test_list_etag_follows_deletes(self):
+        Post.objects.create(category=self.category, author=self.cu, title='second',
+                            status=PostStatus.PUBLISHED)
+        etag = self.assertNotModifiedCheaply('/api/posts/')
+
+        Post.objects.filter(title='second').delete()
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_last_modified(self):
+        response = self.client.get(f'/api/categories/{self.category.id}/')
+        response = self.client.get(f'/api/categories/{self.category.id}/',
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_categories_and_authors(self):
+        self.assertNotModifiedCheaply('/api/categories/')
+        self.client.force_authenticate(self.user)
+        etag = self.assertNotModifiedCheaply('/api/authors/')
+        self.assertNotModifiedCheaply(f'/api/authors/{self.cu.id}/')
+
+        self.user.username = 'oscar2'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/authors/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_detail(self):
+        self.assertEqual(self.client.get('/api/posts/0/', HTTP_IF_NONE_MATCH='"x"').status_code,
+                         404)
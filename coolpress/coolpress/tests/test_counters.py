@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from press.counters import reconcile_counters
+from press.models import Category, Comment, CommentStatus, CoolUser, Post
+
+
+class CountersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.other = CoolUser.objects.create(user=User.objects.create(username='ana'))
+        cls.tech = Category.objects.create(label='Tech', slug='tech')
+        cls.music = Category.objects.create(label='Music', slug='music')
+
+    def assertCounts(self, instance, **counts):
+        instance.refresh_from_db()
+        self.assertEqual({field: getattr(instance, field) for field in counts}, counts)
+
+    def test_post_writes_move_the_counters(self):
+        post = Post.objects.create(category=self.tech, title='a new mac', author=self.cu)
+        Post.objects.create(category=self.tech, title='a new pc', author=self.cu)
+        self.assertCounts(self.tech, post_count=2)
+        self.assertCounts(self.cu, post_count=2)
+
+        post.category = self.music
+        post.author = self.other
+        post.save()
+        self.assertCounts(self.tech, post_count=1)
+        self.assertCounts(self.music, post_count=1)
+        self.assertCounts(self.cu, post_count=1)
+        self.assertCounts(self.other, post_count=1)
+
+        post.delete()
+        self.assertCounts(self.music, post_count=0)
+        self.assertCounts(self.other, post_count=0)
+
+    def test_comment_writes_move_the_counters(self):
+        post = Post.objects.create(category=self.tech, title='a new mac', author=self.cu)
+        comment = Comment.objects.create(body='nice', votes=1, author=self.cu, post=post)
+        Comment.objects.create(body='meh', votes=1, author=self.cu, post=post,
+                               status=CommentStatus.NON_PUBLISHED)
+        self.assertCounts(post, comment_count=2, published_comment_count=1)
+
+        comment.status = CommentStatus.NON_PUBLISHED
+        comment.save()
+        self.assertCounts(post, comment_count=2, published_comment_count=0)
+
+        comment.delete()
+        self.assertCounts(post, comment_count=1, published_comment_count=0)
+
+    def test_reconcile_repairs_drift(self):
+        post = Post.objects.create(category=self.tech, title='a new mac', author=self.cu)
+        Comment.objects.create(body='nice', votes=1, author=self.cu, post=post)
+        Category.objects.update(post_count=7)
+        Post.objects.update(published_comment_count=0)
+
+        fixed = reconcile_counters()
+
+        self.assertEqual(fixed, {'category.post_count': 2, 'cooluser.post_count': 0,
+                                 'post.comment_count': 0, 'post.published_comment_count': 1})
+        self.assertCounts(self.tech, post_count=1)
+        self.assertCounts(self.music, post_count=0)
+        self.assertCounts(post, comment_count=1, published_comment_count=1)
+        self.assertEqual(reconcile_counters()['category.post_count'], 0)
+
+    def test_reconcile_touches_and_expires_the_fixed_rows(self):
+        post = Post.objects.create(category=self.tech, title='a new mac', author=self.cu)
+        Category.objects.update(post_count=7)
+        Post.objects.update(comment_count=3)
+        self.tech.refresh_from_db()
+        post.refresh_from_db()
+        cache.clear()
+        self.assertContains(self.client.get(reverse('posts-list')), 'Tech (7)')
+
+        reconcile_counters()
+
+        self.assertGreater(Category.objects.get(pk=self.tech.pk).last_update, self.tech.last_update)
+        self.assertGreater(Post.objects.get(pk=post.pk).last_update, post.last_update)
+        self.assertContains(self.client.get(reverse('posts-list')), 'Tech (1)')
+
+    def test_reconcile_command(self):
+        Post.objects.create(category=self.tech, title='a new mac', author=self.cu)
+        CoolUser.objects.update(post_count=0)
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+
+        self.assertIn('cooluser.post_count: fixed 1 rows', out.getvalue())
+        self.assertCounts(self.cu, post_count=1)
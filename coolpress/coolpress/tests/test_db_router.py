@@ -0,0 +1,105 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from press.db_router import PIN_COOKIE, read_from_replicas
+from press.models import Category, CoolUser, Post, PostStatus
+
+
+def add_sqlite_database(alias: str, path: Path):
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{path}?mode=ro',
+        'OPTIONS': {'uri': True},
+    }
+
+
+def remove_database(alias: str):
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    The replica is a copy of the primary taken in setUp; the post written
+    after it stands for the replication lag.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        self.category = Category.objects.create(label='Tech', slug='tech')
+        self.replicated = Post.objects.create(category=self.category, title='old news',
+                                              author=self.cu, status=PostStatus.PUBLISHED)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        replica_path = Path(directory.name) / 'replica.sqlite3'
+        with sqlite3.connect(replica_path) as replica:
+            connections['default'].connection.backup(replica)
+        add_sqlite_database('replica', replica_path)
+        self.addCleanup(remove_database, 'replica')
+
+        self.lagging = Post.objects.create(category=self.category, title='fresh news',
+                                           author=self.cu, status=PostStatus.PUBLISHED)
+
+    def api_titles(self):
+        return {post['title'] for post in self.client.get('/api/posts/').json()['results']}
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(Post.objects.count(), 2)
+        with read_from_replicas():
+            self.assertEqual(Post.objects.count(), 1)
+
+    def test_writes_pin_the_rest_of_the_block(self):
+        with read_from_replicas() as routing:
+            self.assertEqual(Post.objects.count(), 1)
+            self.replicated.title = 'old news, updated'
+            self.replicated.save()
+            self.assertTrue(routing.wrote)
+            self.assertEqual(Post.objects.count(), 2)
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.assertEqual(self.api_titles(), {'old news'})
+        response = self.client.get(reverse('authors-list'))
+        self.assertContains(response, 'oscar')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_cached_pages_are_built_from_the_primary(self):
+        response = self.client.get(reverse('posts-list'))
+        self.assertContains(response, 'fresh news')
+        self.assertContains(response, 'Tech (2)')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writing_request_pins_to_the_primary(self):
+        self.client.force_login(self.cu.user)
+        response = self.client.post(reverse('comment-add', kwargs={'post_id': self.lagging.id}),
+                                    {'body': 'nice', 'votes': 3})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        self.assertEqual(self.api_titles(), {'old news', 'fresh news'})
+        response = self.client.get(reverse('posts-detail', kwargs={'post_id': self.lagging.id}))
+        self.assertContains(response, 'nice')
+
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.api_titles(), {'old news'})
+
+    @override_settings(DATABASE_REPLICAS=['missing_replica'])
+    def test_unavailable_replica_falls_back_to_the_primary(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        add_sqlite_database('missing_replica', Path(directory.name) / 'missing.sqlite3')
+        self.addCleanup(remove_database, 'missing_replica')
+
+        with self.assertLogs('press.db_router', 'WARNING'):
+            self.assertEqual(self.api_titles(), {'old news', 'fresh news'})
+        self.assertEqual(self.api_titles(), {'old news', 'fresh news'})
@@ -0,0 +1,103 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from press.export import export_rows, export_text
+from press.models import Category, Comment, CoolUser, Post, PostStatus
+
+
+class ExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.other = CoolUser.objects.create(user=User.objects.create(username='ana'))
+        cls.tech = Category.objects.create(label='Tech', slug='tech')
+        cls.music = Category.objects.create(label='Music', slug='music')
+        for number in range(7):
+            Post.objects.create(category=cls.tech if number % 2 else cls.music,
+                                author=cls.cu if number < 5 else cls.other,
+                                title=f'post, "{number}"', body=f'línea {number}\nsegunda',
+                                status=PostStatus.PUBLISHED if number % 3 else PostStatus.DRAFT)
+        Comment.objects.create(post=Post.objects.first(), author=cls.other, body='nice', votes=0)
+        cls.staff = User.objects.create(username='admin', is_staff=True)
+
+    def ndjson(self, text):
+        return [json.loads(line) for line in text.splitlines()]
+
+    def test_ndjson_in_chunks(self):
+        rows = self.ndjson(''.join(export_text('posts', {}, 'ndjson', chunk_size=3)))
+        self.assertEqual([row['id'] for row in rows],
+                         list(Post.objects.order_by('id').values_list('id', flat=True)))
+        self.assertEqual(rows[0]['body'], 'línea 0\nsegunda')
+        self.assertEqual(rows[0]['creation_date'], Post.objects.first().creation_date.isoformat())
+
+    def test_chunk_size_must_be_positive(self):
+        for chunk_size in [0, -1]:
+            with self.subTest(chunk_size=chunk_size), self.assertRaises(ValueError):
+                export_rows(Post.objects.all(), ['id'], chunk_size)
+
+    def test_csv(self):
+        text = ''.join(export_text('posts', {'author': str(self.other.id)}, 'csv', chunk_size=1))
+        records = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual([record['title'] for record in records], ['post, "5"', 'post, "6"'])
+
+    def test_filters(self):
+        def ids(params, dataset='posts'):
+            return {row['id'] for row in self.ndjson(''.join(export_text(dataset, params,
+                                                                         'ndjson')))}
+
+        self.assertEqual(ids({'category': self.tech.id, 'status': PostStatus.PUBLISHED}),
+                         set(Post.objects.filter(category=self.tech, status=PostStatus.PUBLISHED)
+                             .values_list('id', flat=True)))
+        self.assertEqual(ids({'since': '2000-01-01'}), set(Post.objects.values_list('id', flat=True)))
+        self.assertEqual(ids({'until': '2000-01-01'}), set())
+        self.assertEqual(ids({'category': self.music.id}, 'comments'),
+                         set(Comment.objects.values_list('id', flat=True)))
+        self.assertEqual(ids({'category': self.tech.id}, 'comments'), set())
+
+    def test_view(self):
+        response = self.client.get('/export/posts/')
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get('/export/posts/', {'format': 'csv', 'gzip': '1'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('posts.csv.gz', response['Content-Disposition'])
+        text = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(text)))), 7)
+
+        response = self.client.get('/export/comments/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(self.ndjson(b''.join(response.streaming_content).decode())), 1)
+
+        for params in [{'format': 'xml'}, {'status': 'GONE'}, {'since': 'yesterday'},
+                       {'author': 'oscar'}]:
+            self.assertEqual(self.client.get('/export/posts/', params).status_code, 400)
+        self.assertEqual(self.client.get('/export/users/').status_code, 400)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_data', 'posts', '--status', PostStatus.DRAFT, stdout=out)
+        self.assertEqual(len(self.ndjson(out.getvalue())),
+                         Post.objects.filter(status=PostStatus.DRAFT).count())
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'posts.ndjson.gz'
+            call_command('export_data', 'posts', '--gzip', '--output', str(output),
+                         '--chunk-size', '2', stdout=io.StringIO())
+            self.assertEqual(len(self.ndjson(gzip.decompress(output.read_bytes()).decode())), 7)
+
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'posts', '--gzip')
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'posts', '--since', 'soon')
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'posts', '--chunk-size', '0')
@@ -0,0 +1,73 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from press.models import Category, CoolUser, Post, PostStatus
+from press.serializers import AuthorSerializer, PostSerializer
+
+
+class FastListTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(label='Tech', slug='tech')
+        cls.authors = [CoolUser.objects.create(user=User.objects.create(username=f'writer{number}'),
+                                               github_profile=f'writer{number}')
+                       for number in range(3)]
+        for number in range(25):
+            Post.objects.create(category=category, author=cls.authors[number % 3],
+                                title=f'post {number}   “quoted”', body=f'body {number}',
+                                status=PostStatus.PUBLISHED)
+        cls.user = cls.authors[0].user
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def serializer_json(self, serializer):
+        return json.loads(JSONRenderer().render(serializer.data))
+
+    def test_posts_match_the_serializer(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        posts = Post.objects.filter(status=PostStatus.PUBLISHED).order_by('-creation_date', '-id')
+        self.assertEqual(data['results'], self.serializer_json(PostSerializer(posts[:20], many=True)))
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual(data['results'], self.serializer_json(PostSerializer(posts[20:], many=True)))
+        self.assertIsNone(data['next'])
+
+    def test_authors_match_the_serializer_without_n_plus_one(self):
+        self.client.force_authenticate(self.user)
+        # The ETag aggregate, then the authors with their users.
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/authors/', HTTP_IF_NONE_MATCH='"stale"').json()
+        authors = CoolUser.objects.order_by('id')
+        self.assertEqual(data, self.serializer_json(AuthorSerializer(authors, many=True)))
+
+    def test_sparse_fields(self):
+        data = self.client.get('/api/posts/', {'fields': 'id,title'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'title'})
+        self.assertIsNotNone(data['next'])
+
+        post = Post.objects.first()
+        data = self.client.get(f'/api/posts/{post.id}/', {'fields': 'title'}).json()
+        self.assertEqual(data, {'title': post.title})
+
+        self.client.force_authenticate(self.user)
+        data = self.client.get('/api/authors/', {'fields': 'user'}).json()
+        self.assertEqual(data[0], {'user': {'id': self.user.id, 'username': 'writer0'}})
+
+    def test_unknown_fields(self):
+        response = self.client.get('/api/posts/', {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'])
+
+    def test_browsable_api_uses_the_serializer(self):
+        response = self.client.get('/api/posts/', {'fields': 'title'}, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'post 24')
+        self.assertNotContains(response, '&quot;body&quot;')
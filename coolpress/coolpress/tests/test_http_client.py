@@ -0,0 +1,125 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from press.http_client import HttpClient
+
+
+class StubHttpServer:
+    """
+    Serves ``/etag`` (revalidated with If-None-Match), ``/fresh`` (max-age),
+    ``/plain`` (no validators) and 404 for anything else.
+    """
+
+    def __init__(self):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def reply(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stub.requests.append((self.path, self.headers.get('If-None-Match'),
+                                      self.client_address[1]))
+                if self.path == '/etag':
+                    if self.headers.get('If-None-Match') == '"v1"':
+                        self.reply(304, headers={'ETag': '"v1"'})
+                    else:
+                        self.reply(200, b'tagged', {'ETag': '"v1"'})
+                elif self.path == '/fresh':
+                    self.reply(200, b'fresh', {'Cache-Control': 'max-age=60'})
+                elif self.path == '/plain':
+                    self.reply(200, b'plain')
+                else:
+                    self.reply(404, b'missing')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HttpClientTest(SimpleTestCase):
+
+    def setUp(self):
+        self.client = HttpClient(negative_ttl=60)
+
+    def test_etag_is_revalidated(self):
+        with StubHttpServer() as server:
+            first = self.client.get(f'{server.url}/etag')
+            second = self.client.get(f'{server.url}/etag')
+
+        self.assertEqual((first.text, second.text), ('tagged', 'tagged'))
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual([if_none_match for _, if_none_match, _ in server.requests],
+                         [None, '"v1"'])
+        self.assertEqual(self.client.stats()['revalidated'], 1)
+        self.assertEqual(self.client.stats()['misses'], 1)
+
+    def test_fresh_and_negative_responses_skip_the_network(self):
+        with StubHttpServer() as server:
+            for _ in range(3):
+                self.assertEqual(self.client.get(f'{server.url}/fresh').text, 'fresh')
+                self.assertEqual(self.client.get(f'{server.url}/gone').status_code, 404)
+
+        self.assertEqual(len(server.requests), 2)
+        stats = self.client.stats()
+        self.assertEqual((stats['hits'], stats['negative_hits'], stats['misses']), (2, 2, 2))
+
+    def test_uncacheable_responses_are_not_stored(self):
+        with StubHttpServer() as server:
+            self.client.get(f'{server.url}/plain')
+            self.client.get(f'{server.url}/plain', cache=False)
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(self.client.stats()['cached_entries'], 0)
+
+    def test_cache_is_bounded_by_size(self):
+        client = HttpClient(cache_max_bytes=10)
+        with StubHttpServer() as server:
+            client.get(f'{server.url}/etag')
+            client.get(f'{server.url}/fresh')
+            self.assertEqual(client.get(f'{server.url}/fresh').text, 'fresh')
+            self.assertEqual(client.get(f'{server.url}/etag').text, 'tagged')
+
+        # 'tagged' and 'fresh' do not fit together: the least recently used goes.
+        self.assertEqual([path for path, if_none_match, _ in server.requests],
+                         ['/etag', '/fresh', '/etag'])
+        self.assertEqual(server.requests[-1][1], None)
+        stats = client.stats()
+        self.assertEqual((stats['cached_entries'], stats['cached_bytes']), (1, 6))
+
+    def test_large_bodies_are_not_stored(self):
+        client = HttpClient(cache_max_entry_bytes=4)
+        with StubHttpServer() as server:
+            client.get(f'{server.url}/fresh')
+            client.get(f'{server.url}/fresh')
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(client.stats()['cached_entries'], 0)
+
+    def test_connections_are_reused(self):
+        with StubHttpServer() as server:
+            for _ in range(3):
+                self.client.get(f'{server.url}/plain')
+
+        self.assertEqual(len({port for _, _, port in server.requests}), 1)
@@ -1,10 +1,15 @@
 import datetime
+from unittest import mock
+
 from django.test import TestCase
 
 from django.contrib.auth.models import User
 
-from press.mediastack_manager import serialize_from_mediastack, get_mediastack_posts
+from press.forms import PostForm
+from press.mediastack_manager import serialize_from_mediastack, get_mediastack_posts, \
+    import_mediastack_posts, get_post_body
 from press.models import CoolUser, Post, Category, PostStatus
+from press.testing import StubMediastackServer, mediastack_article
 
 
 class MediaStackImports(TestCase):
@@ -50,12 +55,107 @@ class MediaStackImports(TestCase):
             "country": "us",
             "published_at": "2022-11-24T00:50:31+00:00"
         }
-        post_expected = serialize_from_mediastack(response_json)
-        posts = get_mediastack_posts(sources=['kotaku'], date=datetime.datetime(2022, 11, 24),
-                                     languages=['en'], categories=['general'], countries=['us'],
-                                     keywords=['DLC'])
+        articles = [mediastack_article(1, source='kotaku'), response_json]
+        with StubMediastackServer(articles) as server, \
+                mock.patch('press.mediastack_manager.MEDIASTACK_URL', server.url):
+            post_expected = serialize_from_mediastack(response_json)
+            posts = get_mediastack_posts(sources=['kotaku'], date=datetime.datetime(2022, 11, 24),
+                                         languages=['en'], categories=['general'],
+                                         countries=['us'], keywords=['DLC'])
         self.assertEqual(posts[0], post_expected)
+        self.assertEqual(server.requests[0]['date'], '2022-11-24')
+        self.assertEqual(server.requests[0]['keywords'], 'DLC')
 
     def test_get_media_posts_failing(self):
-        posts = get_mediastack_posts(sources=['cnn'])
-        self.assertTrue(len(posts) > 0)
+        articles = [mediastack_article(number, source=source)
+                    for number, source in enumerate(['cnn', 'kotaku', 'cnn'])]
+        with StubMediastackServer(articles) as server, \
+                mock.patch('press.mediastack_manager.MEDIASTACK_URL', server.url):
+            posts = get_mediastack_posts(sources=['cnn'])
+        self.assertEqual([post.title for post in posts], ['general story 0', 'general story 2'])
+
+
+class MediaStackBatchImports(TestCase):
+
+    def test_batch_import_counts(self):
+        articles = [mediastack_article(number) for number in range(10)]
+        articles.append(mediastack_article(3))
+        articles.append(mediastack_article(10, published_at=None))
+
+        results = import_mediastack_posts(articles, batch_size=6)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(sum(result.inserted for result in results), 10)
+        self.assertEqual(sum(result.duplicates for result in results), 1)
+        self.assertEqual(sum(result.skipped for result in results), 1)
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertEqual(CoolUser.objects.count(), 3)
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(Post.objects.filter(status=PostStatus.PUBLISHED).count(), 10)
+
+    def test_batch_import_skips_bad_articles(self):
+        articles = [mediastack_article(number) for number in range(4)]
+        articles.append(mediastack_article(4, title=None))
+        articles.append(mediastack_article(5, image=['https://example.com/5.png']))
+
+        [result] = import_mediastack_posts(articles)
+
+        self.assertEqual((result.inserted, result.skipped, result.duplicates), (4, 2, 0))
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(sum(Category.objects.values_list('post_count', flat=True)), 4)
+        self.assertEqual(sum(CoolUser.objects.values_list('post_count', flat=True)), 4)
+
+    def test_batch_import_skips_existing_posts(self):
+        articles = [mediastack_article(number) for number in range(5)]
+        import_mediastack_posts(articles)
+
+        results = import_mediastack_posts(articles)
+
+        self.assertEqual(results[0].inserted, 0)
+        self.assertEqual(results[0].duplicates, 5)
+        self.assertEqual(Post.objects.count(), 5)
+
+    def test_batch_import_query_count_is_constant(self):
+        import_mediastack_posts([mediastack_article(number) for number in range(3)])
+        articles = [mediastack_article(number) for number in range(3, 100)]
+
+        with self.assertNumQueries(10):
+            import_mediastack_posts(articles)
+
+    def test_posts_saved_anywhere_are_fingerprinted(self):
+        article = mediastack_article(4)
+        import_mediastack_posts([mediastack_article(2)])
+        post = Post.objects.get()
+        post.title, post.body = article['title'], get_post_body(article)
+        post.save()
+        self.assertEqual(post.fingerprint, post.compute_fingerprint())
+
+        results = import_mediastack_posts([article, mediastack_article(2)])
+
+        self.assertEqual((results[0].inserted, results[0].duplicates), (1, 1))
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_same_content_is_rejected_by_forms_and_api(self):
+        import_mediastack_posts([mediastack_article(1)])
+        post = Post.objects.get()
+        data = {'title': post.title, 'body': post.body, 'category': post.category_id,
+                'status': PostStatus.PUBLISHED}
+
+        form = PostForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('same title', str(form.errors))
+
+        self.client.force_login(post.author.user)
+        response = self.client.post('/api/posts/', data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertTrue(PostForm(data, instance=post).is_valid())
+
+    def test_batch_import_detects_normalized_duplicates(self):
+        import_mediastack_posts([mediastack_article(1)])
+
+        results = import_mediastack_posts([mediastack_article(1, title=' BUSINESS  story 1 ')])
+
+        self.assertEqual(results[0].duplicates, 1)
+        post = Post.objects.get()
+        self.assertEqual(post.fingerprint, post.compute_fingerprint())
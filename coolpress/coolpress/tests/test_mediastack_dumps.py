@@ -0,0 +1,99 @@
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from press.mediastack_dumps import DumpError, import_mediastack_dumps, iter_dump_articles
+from press.models import Category, Post
+from press.testing import mediastack_article
+
+
+def response(articles):
+    return {'pagination': {'limit': 100, 'offset': 0, 'count': len(articles),
+                           'total': len(articles)},
+            'data': articles}
+
+
+class DumpParsingTest(TestCase):
+    articles = [mediastack_article(number, 'science') for number in range(5)] + \
+               [{'title': 'nested [data] {"quoted"}', 'count': 12345, 'ok': True, 'none': None}]
+
+    def parse(self, text, read_size=7):
+        return list(iter_dump_articles(io.StringIO(text), read_size))
+
+    def test_formats(self):
+        dumps = {
+            'response': json.dumps(response(self.articles), indent=2),
+            'list': json.dumps(self.articles),
+            'ndjson articles': '\n'.join(json.dumps(article) for article in self.articles) + '\n',
+            'ndjson responses': '\n'.join(json.dumps(response(self.articles[start:start + 2]))
+                                          for start in range(0, len(self.articles), 2)),
+        }
+        for name, text in dumps.items():
+            for read_size in [1, 7, 1024]:
+                with self.subTest(name, read_size=read_size):
+                    self.assertEqual(self.parse(text, read_size), self.articles)
+
+    def test_empty(self):
+        self.assertEqual(self.parse(''), [])
+        self.assertEqual(self.parse(json.dumps(response([])) + '\n[]'), [])
+
+    def test_invalid(self):
+        for text in ['{"data": [{"title": 1}', '[1 2]', '"article"', '{"title": tru}']:
+            with self.subTest(text), self.assertRaises(DumpError):
+                self.parse(text)
+
+
+class DumpImportTest(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write(self, name, text, compress=False):
+        path = self.directory / name
+        if compress:
+            path.write_bytes(gzip.compress(text.encode()))
+        else:
+            path.write_text(text)
+        return str(path)
+
+    def test_import(self):
+        science = [mediastack_article(number, 'science') for number in range(30)]
+        sports = [mediastack_article(number, 'sports') for number in range(10)]
+        paths = [
+            self.write('science.json', json.dumps(response(science))),
+            self.write('sports.ndjson.gz', '\n'.join(json.dumps(article) for article in sports),
+                       compress=True),
+        ]
+        batches = []
+        progress = import_mediastack_dumps(paths, batch_size=16, on_batch=batches.append)
+        self.assertEqual((progress.rows, progress.inserted, progress.batches), (40, 40, 3))
+        self.assertEqual(Post.objects.count(), 40)
+        self.assertEqual(Category.objects.get(label='Science').post_count, 30)
+
+        progress = import_mediastack_dumps(paths)
+        self.assertEqual((progress.inserted, progress.duplicates), (0, 40))
+
+    def test_command(self):
+        articles = [mediastack_article(number, 'science') for number in range(3)]
+        articles.append({'title': 'no date'})
+        path = self.write('dump.ndjson', '\n'.join(json.dumps(article) for article in articles))
+        out = io.StringIO()
+        call_command('import_posts', '--dump', path, '--batch-size', '2', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Batch 2: 4 read, 3 inserted, 0 duplicates, 1 skipped', output)
+        self.assertIn('rows/s', output)
+        self.assertIn('Saved 3 new posts from 4 articles', output)
+
+        with self.assertRaises(CommandError):
+            call_command('import_posts', 'science', '--dump', path)
+        with self.assertRaises(CommandError):
+            call_command('import_posts', '--dump', str(self.directory / 'missing.json'))
+        with self.assertRaises(CommandError):
+            call_command('import_posts', '--dump', self.write('broken.json', '{"data": ['))
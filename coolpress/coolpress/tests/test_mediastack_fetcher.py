@@ -0,0 +1,93 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from press.mediastack_fetcher import AsyncMediastackFetcher, MediastackFetcher, \
+    afetch_all_mediastack_posts, fetch_all_mediastack_posts, get_query_combinations
+from press.mediastack_manager import import_mediastack_batch
+from press.models import MediastackCheckpoint, Post
+from press.testing import StubMediastackServer, mediastack_article
+
+
+class MediastackFetcherTest(TestCase):
+
+    def setUp(self):
+        self.articles = [mediastack_article(number, 'business') for number in range(25)] + \
+            [mediastack_article(number, 'science') for number in range(7)]
+
+    def fetcher(self, server, **kwargs):
+        return MediastackFetcher(base_url=server.url, access_key='test', limit=10,
+                                 concurrency=2, backoff=0, **kwargs)
+
+    def test_query_combinations(self):
+        combinations = get_query_combinations(['business', 'science'], ['us', 'gb'], ['cnn'])
+        self.assertEqual(len(combinations), 4)
+        self.assertIn({'categories': ['science'], 'countries': ['gb'], 'sources': ['cnn']},
+                      combinations)
+
+    def test_fetches_every_page_of_every_query(self):
+        with StubMediastackServer(self.articles) as server:
+            summary = fetch_all_mediastack_posts(import_mediastack_batch,
+                                                 categories=['business', 'science'],
+                                                 fetcher=self.fetcher(server))
+
+        self.assertEqual(summary.fetched, 32)
+        self.assertEqual(summary.failed, [])
+        self.assertEqual({request['countries'] for request in server.requests}, {'us'})
+        self.assertEqual(Post.objects.count(), 32)
+        self.assertEqual(MediastackCheckpoint.objects.filter(completed_at__isnull=False).count(), 2)
+
+    def test_broken_pages_fail_their_query_only(self):
+        for status, body in [(404, b'{"error": "not found"}'), (200, b'<html>oops</html>'),
+                             (200, b'[]')]:
+            with self.subTest(status=status, body=body):
+                MediastackCheckpoint.objects.all().delete()
+                Post.objects.all().delete()
+                with StubMediastackServer(self.articles) as server:
+                    server.broken_offsets = {10: (status, body)}
+                    summary = fetch_all_mediastack_posts(import_mediastack_batch,
+                                                         categories=['business', 'science'],
+                                                         fetcher=self.fetcher(server))
+
+                self.assertEqual(len(summary.failed), 1)
+                self.assertEqual(Post.objects.count(), 17)
+                business = MediastackCheckpoint.objects.get(query__contains='business')
+                self.assertEqual(business.offset, 10)
+                self.assertIsNone(business.completed_at)
+                science = MediastackCheckpoint.objects.get(query__contains='science')
+                self.assertIsNotNone(science.completed_at)
+
+    def test_async_fetcher_fetches_every_page(self):
+        with StubMediastackServer(self.articles) as server:
+            server.failing_offsets = {20}
+            fetcher = AsyncMediastackFetcher(base_url=server.url, access_key='test', limit=10,
+                                             concurrency=2, backoff=0, max_retries=0)
+            summary = async_to_sync(afetch_all_mediastack_posts)(
+                import_mediastack_batch, categories=['business', 'science'], fetcher=fetcher)
+
+        self.assertEqual(summary.fetched, 27)
+        self.assertEqual(len(summary.failed), 1)
+        self.assertEqual(Post.objects.count(), 27)
+        self.assertEqual(MediastackCheckpoint.objects.filter(completed_at__isnull=False).count(), 1)
+
+    def test_resumes_from_checkpoint(self):
+        with StubMediastackServer(self.articles) as server:
+            server.failing_offsets = {20}
+            summary = fetch_all_mediastack_posts(import_mediastack_batch, categories=['business'],
+                                                 fetcher=self.fetcher(server, max_retries=1))
+
+            self.assertEqual(len(summary.failed), 1)
+            checkpoint = MediastackCheckpoint.objects.get()
+            self.assertEqual(checkpoint.offset, 20)
+            self.assertIsNone(checkpoint.completed_at)
+            self.assertEqual(Post.objects.count(), 20)
+
+            server.failing_offsets = set()
+            server.requests.clear()
+            summary = fetch_all_mediastack_posts(import_mediastack_batch, categories=['business'],
+                                                 fetcher=self.fetcher(server))
+
+        self.assertEqual([request['offset'] for request in server.requests], ['20'])
+        self.assertEqual(summary.fetched, 5)
+        self.assertEqual(Post.objects.count(), 25)
+        checkpoint.refresh_from_db()
+        self.assertIsNotNone(checkpoint.completed_at)
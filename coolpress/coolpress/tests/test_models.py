@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 
 from django.contrib.auth.models import User
@@ -47,6 +48,10 @@ class CommentModelTest(TestCase):
         cls.cu = cu
         cls.comment = comment
 
+    def setUp(self):
+        # Cached pages outlive the rolled back data of the previous test.
+        cache.clear()
+
     def test_creation_proper_comment(self):
         self.assertTrue(isinstance(self.comment, Comment))
         self.assertEqual(self.comment.status, CommentStatus.PUBLISHED)
@@ -77,6 +82,10 @@ class TrendingPostModelTest(TestCase):
         cls.post = post
         cls.cu = cu
 
+    def setUp(self):
+        # Cached pages outlive the rolled back data of the previous test.
+        cache.clear()
+
     def test_creation_proper_post(self):
         self.assertTrue(isinstance(self.post, Post))
 
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from press.models import Category, Comment, CoolUser, Post, PostStatus
+
+
+class PageCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.user = User.objects.create(username='oscar')
+        cls.cu = CoolUser.objects.create(user=cls.user)
+        cls.post = Post.objects.create(category=cls.category, author=cls.cu, title='a new mac',
+                                       body='is out there', status=PostStatus.PUBLISHED)
+
+    def setUp(self):
+        cache.clear()
+
+    def detail_url(self):
+        return reverse('posts-detail', kwargs={'post_id': self.post.id})
+
+    def test_anonymous_pages_are_served_from_the_cache(self):
+        for url in [self.detail_url(), reverse('home'), reverse('posts-list'),
+                    reverse('trending-posts-list')]:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(first.content, second.content)
+
+    def test_anonymous_detail_has_no_comment_form(self):
+        response = self.client.get(self.detail_url())
+
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+        self.assertNotIn('csrftoken', response.cookies)
+        self.assertContains(response, 'to add a comment')
+
+    def test_comment_writes_expire_the_post_only(self):
+        self.client.get(self.detail_url())
+        self.client.get(reverse('posts-list'))
+
+        comment = Comment.objects.create(body='great news', votes=1, author=self.cu, post=self.post)
+        self.assertContains(self.client.get(self.detail_url()), 'great news')
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts-list'))
+
+        comment.delete()
+        self.assertNotContains(self.client.get(self.detail_url()), 'great news')
+
+    def test_post_and_category_writes_expire_the_lists(self):
+        self.client.get(reverse('posts-list'))
+
+        self.post.title = 'a new phone'
+        self.post.save()
+        self.assertContains(self.client.get(reverse('posts-list')), 'a new phone')
+
+        self.category.slug = 'gadgets'
+        self.category.save()
+        self.assertContains(self.client.get(reverse('posts-list')), 'gadgets')
+
+    def test_authenticated_users_share_cached_content(self):
+        other = User.objects.create(username='ana')
+        CoolUser.objects.create(user=other)
+        self.client.force_login(self.user)
+        self.client.get(self.detail_url())
+
+        self.client.force_login(other)
+        with self.assertNumQueries(5):
+            # session, user, post, comment stats and the navbar gravatar; no comments
+            response = self.client.get(self.detail_url())
+        navbar = response.content.decode().split('id="navUser"')[1].split('</a>')[0]
+        self.assertIn('ana', navbar)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertContains(response, 'is out there')
+
+    def test_post_writes_keep_other_posts_cached(self):
+        self.client.get(self.detail_url())
+
+        Post.objects.create(category=self.category, author=self.cu, title='a new phone',
+                            body='is out', status=PostStatus.PUBLISHED)
+        # The navbar counts are filled in from their own cache entry.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url())
+        self.assertContains(response, 'Tech (2)')
+        self.assertNotContains(response, 'press:navbar')
+
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url())
@@ -0,0 +1,99 @@
+import datetime
+import itertools
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from press.models import Category, CoolUser, Post, PostStatus
+from press.pagination import keyset_page, decode_cursor
+
+
+class KeysetPaginationTest(TestCase):
+    # Posts with the same content share a fingerprint, which is unique.
+    post_numbers = itertools.count()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.author = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.create_posts(45)
+        # Give posts pairs the same timestamps, the id has to break the ties.
+        base = timezone.now() - datetime.timedelta(days=1)
+        for post in Post.objects.all():
+            stamp = base + datetime.timedelta(minutes=post.id // 2)
+            Post.objects.filter(id=post.id).update(creation_date=stamp, last_update=stamp)
+
+    @classmethod
+    def create_posts(cls, count):
+        return [Post.objects.create(category=cls.category, author=cls.author,
+                                    title=f'post {next(cls.post_numbers)}', body='some body',
+                                    status=PostStatus.PUBLISHED)
+                for _ in range(count)]
+
+    def expected_ids(self, field='last_update'):
+        return list(Post.objects.order_by(f'-{field}', '-id').values_list('id', flat=True))
+
+    def walk(self, cursor=None, field='last_update', size=10):
+        ids = []
+        while True:
+            page = keyset_page(Post.objects.all(), field, cursor, size)
+            ids.extend(post.id for post in page)
+            if not page.has_next:
+                return ids, page
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once(self):
+        ids, last_page = self.walk()
+        self.assertEqual(ids, self.expected_ids())
+
+        ids = []
+        cursor = last_page.previous_cursor
+        while cursor:
+            page = keyset_page(Post.objects.all(), 'last_update', cursor, 10)
+            ids = [post.id for post in page] + ids
+            cursor = page.previous_cursor
+        self.assertEqual(ids, self.expected_ids()[:40])
+
+    def test_inserts_do_not_shift_the_next_pages(self):
+        first = keyset_page(Post.objects.all(), 'creation_date', None, 10)
+        self.create_posts(5)
+
+        ids, _ = self.walk(first.next_cursor, field='creation_date')
+
+        self.assertEqual([post.id for post in first] + ids, self.expected_ids('creation_date')[5:])
+
+    def test_html_list_pages_with_constant_queries(self):
+        url = reverse('author-posts', kwargs={'username': 'oscar'})
+        response = self.client.get(url)
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 20)
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+
+        cursor = page.next_cursor
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'cursor': cursor})
+        self.assertEqual([post.id for post in response.context['posts_list']],
+                         self.expected_ids()[20:40])
+
+        self.assertEqual(self.client.get(url, {'cursor': 'nonsense'}).status_code, 404)
+
+    def test_api_follows_next_links(self):
+        ids = []
+        url = '/api/posts/'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(post['id'] for post in response.json()['results'])
+            url = response.json()['next']
+
+        self.assertEqual(ids, self.expected_ids('creation_date'))
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': 'bad'}).status_code, 404)
+
+    def test_cursor_round_trip(self):
+        page = keyset_page(Post.objects.all(), 'last_update', None, 3)
+        cursor = decode_cursor(page.next_cursor)
+        self.assertEqual(cursor.id, page.object_list[-1].id)
+        self.assertEqual(cursor.value, page.object_list[-1].last_update)
+        self.assertFalse(cursor.reverse)
@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from press.models import CoolUser, ProfileRefreshJob, ProfileRefreshStatus
+from press.profile_enrichment import ProfileData, RateLimiter, claim_jobs, \
+    enqueue_stale_profiles, fail_job, process_jobs, release_stuck_jobs
+
+
+def fake_fetch(snapshot, limiter):
+    return ProfileData(gravatar_link=f'https://gravatar.test/{snapshot.email}',
+                       github_checked=snapshot.check_github, github_repos=12, github_stars=34)
+
+
+def failing_fetch(snapshot, limiter):
+    raise ConnectionError('gravatar is down')
+
+
+class ProfileRefreshQueueTest(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='juan', email='juan@example.com')
+        self.cu = CoolUser.objects.create(user=user, github_profile='juan')
+
+    def test_save_only_enqueues_a_single_pending_job(self):
+        self.cu.save()
+        self.cu.save()
+
+        job = ProfileRefreshJob.objects.get()
+        self.assertEqual(job.status, ProfileRefreshStatus.PENDING)
+        self.assertIsNone(self.cu.gravatar_link)
+
+    def test_worker_stores_the_profile_data(self):
+        summary = process_jobs(fetch=fake_fetch)
+
+        self.assertEqual((summary.done, summary.failed), (1, 0))
+        self.cu.refresh_from_db()
+        self.assertEqual(self.cu.gravatar_link, 'https://gravatar.test/juan@example.com')
+        self.assertEqual((self.cu.github_repos, self.cu.github_stars), (12, 34))
+        self.assertIsNotNone(self.cu.last_github_check)
+        self.assertEqual(ProfileRefreshJob.objects.get().status, ProfileRefreshStatus.DONE)
+
+        # Writing the results does not queue another refresh.
+        self.assertEqual(process_jobs(fetch=fake_fetch).done, 0)
+
+    def test_failures_back_off_then_give_up(self):
+        process_jobs(fetch=failing_fetch, max_attempts=2, backoff=timedelta(minutes=1))
+
+        job = ProfileRefreshJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (ProfileRefreshStatus.PENDING, 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(process_jobs(fetch=failing_fetch).failed, 0)
+
+        ProfileRefreshJob.objects.update(run_after=timezone.now())
+        process_jobs(fetch=failing_fetch, max_attempts=2)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ProfileRefreshStatus.FAILED, 2))
+        self.assertEqual(job.last_error, 'gravatar is down')
+
+    def test_failure_leaves_a_released_job_alone(self):
+        job = claim_jobs()[0]
+        ProfileRefreshJob.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        release_stuck_jobs()
+
+        fail_job(job, 'gravatar is down')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error),
+                         (ProfileRefreshStatus.FAILED, 0, 'worker lost'))
+        self.assertEqual(ProfileRefreshJob.objects.filter(status=ProfileRefreshStatus.PENDING)
+                         .count(), 1)
+
+    def test_stale_and_stuck_profiles_are_queued_again(self):
+        process_jobs(fetch=fake_fetch)
+        CoolUser.objects.update(gravatar_updated_at=timezone.now() - timedelta(days=3))
+
+        self.assertEqual(enqueue_stale_profiles(timedelta(days=1)), 1)
+        ProfileRefreshJob.objects.filter(status=ProfileRefreshStatus.PENDING).update(
+            status=ProfileRefreshStatus.RUNNING)
+        ProfileRefreshJob.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stuck_jobs(), 1)
+        self.assertEqual(ProfileRefreshJob.objects.filter(status=ProfileRefreshStatus.PENDING)
+                         .count(), 1)
+
+    def test_command_drains_the_queue(self):
+        ProfileRefreshJob.objects.all().delete()
+        # Nothing to fetch for a profile without email nor GitHub account.
+        anonymous = CoolUser.objects.create(user=User.objects.create(username='ana'))
+        stdout = StringIO()
+
+        call_command('refresh_profiles', '--once', stdout=stdout)
+
+        self.assertIn('Refreshed 1 profiles, 0 failed', stdout.getvalue())
+        anonymous.refresh_from_db()
+        self.assertIsNotNone(anonymous.gravatar_updated_at)
+
+
+class RateLimiterTest(SimpleTestCase):
+
+    def test_spaces_requests_per_host(self):
+        limiter = RateLimiter(min_interval=0.05)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait('gravatar.com')
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+        start = time.monotonic()
+        limiter.wait('github.com')
+        self.assertLess(time.monotonic() - start, 0.05)
@@ -0,0 +1,70 @@
+import itertools
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from press.models import Category, Comment, CoolUser, Post, PostStatus
+from press.testing import QueryBudgetMixin
+
+
+class ViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    # Posts with the same content share a fingerprint, which is unique.
+    post_numbers = itertools.count()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.author = cls.create_author('oscar')
+        cls.post = cls.create_posts(cls.author, 3)[0]
+        cls.add_comments(cls.post, 3)
+
+    @classmethod
+    def create_author(cls, username):
+        return CoolUser.objects.create(user=User.objects.create(username=username))
+
+    @classmethod
+    def create_posts(cls, author, count):
+        return [Post.objects.create(category=cls.category, author=author,
+                                    title=f'post {next(cls.post_numbers)}', body='some body',
+                                    status=PostStatus.PUBLISHED)
+                for _ in range(count)]
+
+    @classmethod
+    def add_comments(cls, post, count):
+        for number in range(count):
+            author = cls.create_author(f'commenter-{post.id}-{Comment.objects.count()}')
+            Comment.objects.create(body=f'comment {number}', votes=5, author=author, post=post)
+
+    def grow_posts(self):
+        for number in range(25):
+            self.create_posts(self.create_author(f'writer-{number}'), 1)
+
+    def test_posts_list(self):
+        self.assertQueryBudget(2, reverse('posts-list'))
+        self.assertConstantQueries(reverse('posts-list'), self.grow_posts)
+
+    def test_home(self):
+        self.assertQueryBudget(4, reverse('home'))
+        self.assertConstantQueries(reverse('home'), self.grow_posts)
+
+    def test_authors_list(self):
+        self.assertQueryBudget(2, reverse('authors-list'))
+        self.assertConstantQueries(reverse('authors-list'), self.grow_posts)
+
+    def test_author_posts(self):
+        url = reverse('author-posts', kwargs={'username': 'oscar'})
+        self.assertQueryBudget(3, url)
+        self.assertConstantQueries(url, lambda: self.create_posts(self.author, 25))
+
+    def test_post_detail(self):
+        url = reverse('posts-detail', kwargs={'post_id': self.post.id})
+        self.assertQueryBudget(4, url)
+        self.assertConstantQueries(url, lambda: self.add_comments(self.post, 10))
+
+    def test_trending_posts_list(self):
+        self.add_comments(self.post, 3)
+        self.assertQueryBudget(2, reverse('trending-posts-list'))
+        self.assertConstantQueries(reverse('trending-posts-list'),
+                                   lambda: [self.add_comments(post, 5) for post in
+                                            self.create_posts(self.author, 3)])
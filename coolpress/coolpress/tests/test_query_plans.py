@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from press.models import Category, CoolUser, Post, PostStatus
+from press.pagination import Cursor, keyset_queryset
+from press.testing import QueryPlanMixin
+from press.views import AuthorPosts, PostClassBasedListView, PostViewSet, get_post_comments
+
+
+class HotQueryPlanTest(QueryPlanMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.author = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.post = Post.objects.create(category=cls.category, author=cls.author, title='a post',
+                                       body='some body', status=PostStatus.PUBLISHED)
+        cls.cursor = Cursor(timezone.now(), cls.post.id)
+
+    def pages(self, queryset, field):
+        """The first page and a deeper page of a keyset paginated list."""
+        return [keyset_queryset(queryset, field, None)[:21],
+                keyset_queryset(queryset, field, self.cursor)[:21]]
+
+    def test_api_posts(self):
+        for page in self.pages(PostViewSet.queryset, 'creation_date'):
+            self.assertIndexedPlan(page, 'post_status_created_idx')
+
+    def test_api_posts_by_category(self):
+        queryset = PostViewSet.queryset.filter(category=self.category)
+        for page in self.pages(queryset, 'creation_date'):
+            self.assertIndexedPlan(page, 'post_category_created_idx')
+
+    def test_html_posts(self):
+        for page in self.pages(PostClassBasedListView.queryset, 'last_update'):
+            self.assertIndexedPlan(page, 'post_status_updated_idx')
+
+    def test_author_posts(self):
+        queryset = AuthorPosts.queryset.filter(author=self.author)
+        for page in self.pages(queryset, 'last_update'):
+            self.assertIndexedPlan(page, 'post_author_updated_idx')
+
+    def test_post_comments(self):
+        self.assertIndexedPlan(get_post_comments(self.post), 'comment_post_status_idx')
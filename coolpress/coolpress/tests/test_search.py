@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from press.models import Category, CoolUser, Post, PostStatus
+from press.search import SEARCH_TABLE, search_posts, to_match_query
+
+
+class PostSearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(label='Tech', slug='tech')
+        cls.author = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.in_title = cls.create_post('Python is out', 'A new release of the language')
+        cls.in_body = cls.create_post('Release notes', 'Some python <b>tips</b> for everyone')
+        cls.draft = cls.create_post('Python draft', 'python python', status=PostStatus.DRAFT)
+
+    @classmethod
+    def create_post(cls, title, body, status=PostStatus.PUBLISHED):
+        return Post.objects.create(category=cls.category, author=cls.author, title=title,
+                                   body=body, status=status)
+
+    def found(self, text, **kwargs):
+        return [result.post for result in search_posts(text, **kwargs).results]
+
+    def test_ranked_published_matches(self):
+        self.assertEqual(self.found('python'), [self.in_title, self.in_body])
+        self.assertEqual(self.found('pyth'), [self.in_title, self.in_body])
+        self.assertEqual(self.found('python release'), [self.in_title, self.in_body])
+        self.assertEqual(self.found('python everyone'), [self.in_body])
+
+    def test_highlights_escaped_text(self):
+        result = search_posts('tips').results[0]
+
+        self.assertIn('<mark>tips</mark>', result.snippet)
+        self.assertIn('&lt;b&gt;', result.snippet)
+        self.assertNotIn('<b>', result.snippet)
+
+    def test_index_follows_writes(self):
+        self.in_body.title = 'Renamed kangaroo'
+        self.in_body.save()
+        self.assertEqual(self.found('kangaroo'), [self.in_body])
+
+        Post.objects.bulk_create([Post(category=self.category, author=self.author,
+                                       title='Bulk kangaroo', status=PostStatus.PUBLISHED)])
+        self.assertEqual(len(self.found('kangaroo')), 2)
+
+        self.in_body.delete()
+        self.assertEqual([post.title for post in self.found('kangaroo')], ['Bulk kangaroo'])
+
+    def test_migrations_install_the_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = "
+                           "'press_post' ORDER BY name")
+            triggers = [name for name, in cursor.fetchall()]
+        self.assertEqual(triggers, [f'{SEARCH_TABLE}_{event}'
+                                    for event in ['delete', 'insert', 'update']])
+
+    def test_operators_in_user_input(self):
+        self.assertEqual(to_match_query('python" OR (NEAR'), '"python" "OR" "NEAR"*')
+        self.assertEqual(self.found('"python AND'), [])
+        self.assertEqual(self.found('  -*()'), [])
+
+    def test_pages(self):
+        for number in range(3):
+            self.create_post(f'python {number}', 'more python')
+
+        first = search_posts('python', page_size=3)
+        second = search_posts('python', page=2, page_size=3)
+
+        self.assertTrue(first.has_next)
+        self.assertFalse(second.has_next)
+        ids = [result.post.id for result in first.results + second.results]
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_html_and_api(self):
+        response = self.client.get(reverse('posts-search'), {'q': 'python'})
+        self.assertEqual([result.post for result in response.context['results']],
+                         [self.in_title, self.in_body])
+        self.assertContains(response, '<mark>Python</mark> is out', html=False)
+
+        response = self.client.get('/api/search/', {'q': 'python'})
+        payload = response.json()
+        self.assertEqual([result['post']['id'] for result in payload['results']],
+                         [self.in_title.id, self.in_body.id])
+        self.assertIsNone(payload['next'])
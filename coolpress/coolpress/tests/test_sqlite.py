@@ -0,0 +1,27 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+
+class SqlitePragmasTest(TestCase):
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234, 'busy_timeout': 2500})
+    def test_new_connections_run_the_pragmas(self):
+        wrapper = connection.copy()
+        self.addCleanup(wrapper.close)
+
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -1234)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 2500)
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'wal', 'busy_timeout': 2500},
+                       DATABASE_REPLICAS=['replica'])
+    def test_read_only_connections_skip_file_pragmas(self):
+        wrapper = connection.copy('replica')
+        self.addCleanup(wrapper.close)
+
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 2500)
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'memory')
@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from press.models import Category, CoolUser, Post, PostStatus, WordStat, WordStatScope
+from press.stats_manager import Stats, count_words, compute_word_stats, top_words
+
+
+class StatsTest(SimpleTestCase):
+
+    def test_punctuation_does_not_split_counts(self):
+        stats = Stats('News. news, "NEWS"!\nthe news-room')
+
+        self.assertEqual(stats.top(2), [('news', 3), ('news-room', 1)])
+
+    def test_stopwords_and_numbers_are_ignored(self):
+        self.assertEqual(count_words('the 2022 results - and 3 of them'), {'results': 1})
+
+    def test_top_breaks_ties_alphabetically(self):
+        stats = Stats('pear apple pear apple fig')
+
+        self.assertEqual(stats.top(3), [('apple', 2), ('pear', 2), ('fig', 1)])
+        self.assertEqual(stats.top(0), [])
+        with self.assertRaises(ValueError):
+            stats.top(-1)
+
+
+class CorpusWordStatsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.oscar = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        cls.ana = CoolUser.objects.create(user=User.objects.create(username='ana'))
+        cls.tech = Category.objects.create(label='Tech', slug='tech')
+        cls.food = Category.objects.create(label='Food', slug='food')
+        posts = [
+            (cls.oscar, cls.tech, 'New laptop', 'The laptop has a fast chip. Chip!'),
+            (cls.oscar, cls.food, 'Pasta recipe', 'Pasta with a fast sauce'),
+            (cls.ana, cls.tech, 'Chip shortage', 'Chip makers and laptop makers'),
+        ]
+        for author, category, title, body in posts:
+            Post.objects.create(author=author, category=category, title=title, body=body,
+                                status=PostStatus.PUBLISHED)
+        Post.objects.create(author=cls.ana, category=cls.food, title='Draft chip', body='chip')
+
+    def test_site_category_and_author_breakdowns(self):
+        compute_word_stats(chunk_size=2, workers=1)
+
+        self.assertEqual(top_words(limit=2), [('chip', 4), ('laptop', 3)])
+        self.assertEqual(top_words(WordStatScope.CATEGORY, self.food.id, limit=1), [('pasta', 2)])
+        self.assertEqual(top_words(WordStatScope.AUTHOR, self.ana.id, limit=2),
+                         [('chip', 2), ('makers', 2)])
+
+    def test_process_pool_matches_single_process(self):
+        compute_word_stats(chunk_size=1, workers=1)
+        single = set(WordStat.objects.values_list('scope', 'scope_id', 'word', 'count'))
+
+        call_command('compute_word_stats', '--chunk-size=1', '--workers=2', stdout=StringIO())
+
+        self.assertEqual(set(WordStat.objects.values_list('scope', 'scope_id', 'word', 'count')),
+                         single)
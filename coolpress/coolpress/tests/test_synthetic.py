@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from press.counters import reconcile_counters
+from press.models import Category, Comment, CommentWordCount, CoolUser, Post, TrendingScore, \
+    WordStat
+from press.synthetic import generate_synthetic_data
+
+
+class SyntheticDataTest(TestCase):
+
+    def test_generate(self):
+        data = generate_synthetic_data(users=10, categories=3, posts=40, comments=600, seed=1,
+                                       batch_size=64)
+        self.assertEqual((CoolUser.objects.count(), Category.objects.count(), Post.objects.count(),
+                          Comment.objects.count()), (10, 3, 40, 600))
+        self.assertEqual(sorted(data.posts), list(Post.objects.order_by('id')
+                                                  .values_list('id', flat=True)))
+
+        # Zipf: a few posts get most of the comments.
+        counts = sorted(Post.objects.values_list('comment_count', flat=True), reverse=True)
+        self.assertEqual(sum(counts), 600)
+        self.assertGreater(sum(counts[:4]), 300)
+
+        # What the signals would have kept up to date is there.
+        self.assertEqual(set(reconcile_counters().values()), {0})
+        self.assertTrue(CommentWordCount.objects.exists())
+        self.assertTrue(TrendingScore.objects.exists())
+        self.assertTrue(WordStat.objects.exists())
+
+    def test_seeded(self):
+        generate_synthetic_data(users=2, categories=1, posts=5, comments=20, seed=7)
+        first = list(Comment.objects.order_by('id').values_list('body', flat=True))
+        generate_synthetic_data(users=2, categories=1, posts=5, comments=20, seed=7)
+        second = list(Comment.objects.order_by('id').values_list('body', flat=True))[20:]
+        self.assertEqual(first, second)
+        self.assertEqual(CoolUser.objects.count(), 4)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('generate_data', '--users', '3', '--categories', '2', '--posts', '6',
+                     '--comments', '30', stdout=out)
+        self.assertIn('Created 3 users, 2 categories, 6 posts and 30 comments', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('generate_data', '--posts', '0', '--comments', '5')
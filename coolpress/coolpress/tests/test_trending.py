@@ -0,0 +1,110 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from press.models import Category, Comment, CoolUser, Post, TrendingScore, TrendingWindow
+from press.trending import update_post_trending, rebuild_trending_scores, redecay_trending_scores, \
+    trending_posts, current_score, get_trending_scores
+
+
+class TrendingScoreTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cu = CoolUser.objects.create(user=User.objects.create(username='oscar'))
+        category = Category.objects.create(label='Tech', slug='tech')
+        cls.old_post = Post.objects.create(category=category, title='old news', author=cls.cu)
+        cls.new_post = Post.objects.create(category=category, title='new news', author=cls.cu)
+
+    def add_comments(self, post, count, created_at):
+        for _ in range(count):
+            update_post_trending(post.id, created_at)
+
+    def test_recent_comments_rank_first(self):
+        now = timezone.now()
+        self.add_comments(self.old_post, 8, now - datetime.timedelta(days=2))
+        self.add_comments(self.new_post, 5, now)
+
+        self.assertEqual(trending_posts(TrendingWindow.DAY), [self.new_post])
+        self.assertEqual(trending_posts(TrendingWindow.MONTH), [self.old_post, self.new_post])
+
+    def test_minimum_applies_to_recent_comments(self):
+        now = timezone.now()
+        self.add_comments(self.old_post, 20, now - datetime.timedelta(days=10))
+
+        self.assertEqual(trending_posts(TrendingWindow.WEEK), [self.old_post])
+        self.assertEqual(trending_posts(TrendingWindow.DAY), [])
+        with self.subTest('the post leaves the window as its comments age'):
+            later = now + datetime.timedelta(days=14)
+            self.assertEqual(get_trending_scores(TrendingWindow.WEEK, now=later), [])
+
+    def test_redecay_keeps_the_ranking(self):
+        now = timezone.now()
+        self.add_comments(self.old_post, 6, now - datetime.timedelta(hours=1))
+        self.add_comments(self.new_post, 5, now)
+        before = trending_posts(TrendingWindow.DAY)
+
+        redecay_trending_scores(now + datetime.timedelta(days=1))
+
+        self.assertEqual(trending_posts(TrendingWindow.DAY), before)
+        trending = TrendingScore.objects.get(post=self.new_post, window=TrendingWindow.DAY)
+        self.assertAlmostEqual(trending.score, 2.5)
+
+    def test_comments_update_scores_incrementally(self):
+        comments = [Comment.objects.create(body='hi', votes=1, author=self.cu, post=self.new_post)
+                    for _ in range(5)]
+        trending = TrendingScore.objects.get(post=self.new_post, window=TrendingWindow.WEEK)
+        self.assertEqual(trending.comment_count, 5)
+        self.assertAlmostEqual(current_score(trending), 5, places=3)
+
+        comments[0].delete()
+
+        trending.refresh_from_db()
+        self.assertEqual(trending.comment_count, 4)
+        self.assertAlmostEqual(current_score(trending), 4, places=3)
+        self.assertEqual(trending_posts(), [])
+
+    def test_windows_inserted_meanwhile_are_updated(self):
+        now = timezone.now()
+        bulk_create = TrendingScore.objects.bulk_create
+
+        def after_another_first_comment(objs, **kwargs):
+            # Another first comment inserted the day window after our read.
+            if not TrendingScore.objects.exists():
+                bulk_create([TrendingScore(post=self.new_post, window=TrendingWindow.DAY,
+                                           decayed_at=now)])
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(TrendingScore.objects, 'bulk_create', after_another_first_comment):
+            self.add_comments(self.new_post, 5, now)
+
+        counts = dict(TrendingScore.objects.filter(post=self.new_post)
+                      .values_list('window', 'comment_count'))
+        self.assertEqual(counts, {window: 5 for window in TrendingWindow.HALF_LIVES})
+
+    def test_rebuild_matches_incremental_scores(self):
+        for _ in range(5):
+            Comment.objects.create(body='hi', votes=1, author=self.cu, post=self.new_post)
+        incremental = {trending.window: trending for trending in TrendingScore.objects.all()}
+
+        rebuild_trending_scores()
+
+        for trending in TrendingScore.objects.all():
+            self.assertEqual(trending.comment_count, incremental[trending.window].comment_count)
+            self.assertAlmostEqual(trending.rank, incremental[trending.window].rank, places=6)
+
+    def test_page_and_api_windows(self):
+        self.add_comments(self.new_post, 5, timezone.now())
+
+        response = self.client.get(reverse('trending-posts-list'), {'window': '24h'})
+        self.assertEqual(response.context['window'], '24h')
+        self.assertEqual(list(response.context['trending_posts_list']), [self.new_post])
+
+        response = self.client.get('/api/trending/', {'window': '30d'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['post']['id'], self.new_post.id)
+        self.assertEqual(response.json()[0]['window'], '30d')
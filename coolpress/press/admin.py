@@ -1,5 +1,5 @@
 from django.contrib import admin
-from press.models import Category, Post, CoolUser
+from press.models import Category, Post, CoolUser, ProfileRefreshJob
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -22,3 +22,11 @@ class CoolUserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(CoolUser, CoolUserAdmin)
+
+
+class ProfileRefreshJobAdmin(admin.ModelAdmin):
+    list_filter = ['status']
+    list_display = ['cooluser', 'status', 'attempts', 'run_after', 'last_error']
+
+
+admin.site.register(ProfileRefreshJob, ProfileRefreshJobAdmin)
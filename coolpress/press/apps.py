@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PressConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'press'
+
+    def ready(self):
+        from press import checks, signals, sqlite  # noqa: F401
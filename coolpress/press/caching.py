@@ -0,0 +1,167 @@
+import hashlib
+import uuid
+from functools import wraps
+from typing import Callable, Iterable, List
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from press.db_router import read_from_primary
+from press.models import Category
+
+CATEGORIES_CACHE_TIMEOUT = 60 * 60
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Cached content is keyed by the versions of the scopes it was built from;
+# writes bump the versions of the scopes they touch instead of deleting keys.
+GLOBAL_SCOPE = 'global'
+CATEGORIES_SCOPE = 'categories'
+TRENDING_SCOPE = 'trending'
+
+# Cached anonymous pages hold this instead of the navbar, whose category
+# counts change with every post write; it is filled in when they are served.
+NAVBAR_PLACEHOLDER = b'<!-- press:navbar -->'
+
+
+def post_scope(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def version_key(scope: str) -> str:
+    return f'press:version:{scope}'
+
+
+# (version, categories) of this process, swapped as a whole so threads never
+# see a version paired with the categories of another one.
+_local_categories = (None, None)
+
+
+def new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def get_versions(scopes: List[str]) -> List[str]:
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # add() keeps the version another process may have set meanwhile.
+        for key in missing:
+            cache.add(key, new_version(), None)
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def bump_versions(scopes: Iterable[str]):
+    cache.set_many({version_key(scope): new_version() for scope in scopes}, None)
+
+
+def get_categories_version() -> str:
+    return get_versions([CATEGORIES_SCOPE])[0]
+
+
+def load_categories() -> List[dict]:
+    return list(Category.objects.order_by('id')
+                .values('id', 'label', 'slug', 'post_count'))
+
+
+def get_cached_categories() -> List[dict]:
+    """
+    The category list with per category post counts. The shared cache holds
+    it under a versioned key and every process keeps its own copy, so a
+    steady state render only reads the version key: no database query.
+    """
+    global _local_categories
+    version = get_categories_version()
+    local_version, local_categories = _local_categories
+    if local_version == version:
+        return local_categories
+
+    key = f'press:categories:{version}'
+    categories = cache.get(key)
+    if categories is None:
+        with read_from_primary():
+            categories = load_categories()
+        cache.set(key, categories, CATEGORIES_CACHE_TIMEOUT)
+    _local_categories = (version, categories)
+    return categories
+
+
+def invalidate_categories():
+    global _local_categories
+    bump_versions([CATEGORIES_SCOPE])
+    _local_categories = (None, None)
+
+
+def invalidate_posts(post_ids: Iterable[int] = ()):
+    """Expire the pages rendered from these posts, the lists and the category counts."""
+    bump_versions([GLOBAL_SCOPE] + [post_scope(post_id) for post_id in post_ids])
+    invalidate_categories()
+
+
+def invalidate_comments(post_id: int):
+    bump_versions([post_scope(post_id), TRENDING_SCOPE])
+
+
+def navbar_key() -> str:
+    return f'press:navbar:{get_categories_version()}'
+
+
+def get_anonymous_navbar(request) -> bytes:
+    """The navbar of anonymous readers, cached under the categories version."""
+    key = navbar_key()
+    navbar = cache.get(key)
+    if navbar is None:
+        navbar = render_to_string('navbar.html', request=request).encode()
+        cache.set(key, navbar, CATEGORIES_CACHE_TIMEOUT)
+    return navbar
+
+
+def fill_navbar(request, response):
+    if not response.streaming and NAVBAR_PLACEHOLDER in response.content:
+        response.content = response.content.replace(NAVBAR_PLACEHOLDER,
+                                                    get_anonymous_navbar(request))
+    return response
+
+
+def page_cache_key(request, scopes: List[str]) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'press:page:{path}:{":".join(get_versions(scopes))}'
+
+
+def cache_page_by_version(get_scopes: Callable[..., List[str]],
+                          timeout: int = PAGE_CACHE_TIMEOUT):
+    """
+    Cache a GET view under the versions of the scopes ``get_scopes(**kwargs)``
+    returns for its URL kwargs.
+
+    Anonymous readers get the whole cached response, with the navbar filled
+    in from its own cache entry. For authenticated users
+    the view runs and the ``{% cached_content %}`` block of ``base.html``
+    caches the content under the same key, so the personalized navbar and
+    forms are rendered fresh. A view can opt a response out by setting
+    ``request.page_cache_key`` to None.
+
+    The views read from the primary, never from a replica that may lag
+    behind the versions its content gets cached under.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            request.page_cache_key = key = page_cache_key(request, get_scopes(**kwargs))
+            if request.user.is_authenticated:
+                with read_from_primary():
+                    return view(request, *args, **kwargs)
+
+            response = cache.get(key)
+            if response is not None:
+                return fill_navbar(request, response)
+            with read_from_primary():
+                response = view(request, *args, **kwargs)
+            if request.page_cache_key and response.status_code == 200 and not response.cookies:
+                cache.set(key, response, timeout)
+            return fill_navbar(request, response)
+        return wrapper
+    return decorator
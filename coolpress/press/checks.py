@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from press.word_clouds import WORD_CLOUD_CACHE
+
+PROCESS_LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    The page cache is expired by bumping versions in the cache: a process
+    local backend would only expire the pages of the worker doing the write.
+    """
+    errors = []
+    for alias in ['default', WORD_CLOUD_CACHE]:
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend == PROCESS_LOCAL_CACHE:
+            errors.append(Error(
+                f'The {alias!r} cache uses LocMemCache, which is not shared between '
+                f'worker processes.',
+                hint='Use a shared backend such as FileBasedCache, DatabaseCache or Memcached, '
+                     'as settings-prod does.',
+                id='press.E001'))
+    return errors
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts) -> str:
+    return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering conditional GETs with a 304 before anything is
+    serialized.
+
+    A list is validated by one aggregate over the filtered queryset (latest
+    ``last_update`` and row count, so deletes change it too) plus the full URL
+    with its query params; a detail by the ``last_update`` of its row. Lists
+    send no Last-Modified: a delete does not move the latest ``last_update``,
+    so If-Modified-Since alone cannot notice it.
+
+    The same URL renders as JSON or as the browsable API depending on the
+    Accept header, so ETags include the negotiated media type and responses
+    vary on Accept.
+    """
+    last_update_field = 'last_update'
+
+    def get_list_validators(self, request, queryset) -> Tuple[str, None]:
+        aggregate = queryset.order_by().aggregate(last_update=Max(self.last_update_field),
+                                                  count=Count('pk'))
+        etag = make_etag(queryset.model._meta.label, aggregate['last_update'],
+                         aggregate['count'], request.build_absolute_uri(),
+                         request.accepted_media_type)
+        return etag, None
+
+    def get_detail_validators(self, request, queryset) -> Tuple[Optional[str], Optional[int]]:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_update = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}) \
+            .values_list(self.last_update_field, flat=True).first()
+        if last_update is None:
+            return None, None
+        etag = make_etag(queryset.model._meta.label, self.kwargs[lookup_url_kwarg], last_update,
+                         request.build_absolute_uri(), request.accepted_media_type)
+        # HTTP dates have a one second resolution.
+        return etag, int(last_update.timestamp())
+
+    def conditional(self, request, validators, render):
+        etag, last_modified = validators
+        if etag is None:
+            return render()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+            if response.status_code == 200:
+                response['ETag'] = etag
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(request, self.get_list_validators(request, queryset),
+                                lambda: super(ConditionalGetMixin, self).list(request, *args,
+                                                                              **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(request, self.get_detail_validators(request, queryset),
+                                lambda: super(ConditionalGetMixin, self).retrieve(request, *args,
+                                                                                  **kwargs))
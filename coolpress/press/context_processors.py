@@ -1,6 +1,8 @@
-from press.models import Category
+from django.utils.functional import SimpleLazyObject
+
+from press.caching import get_cached_categories
 
 
 def categories_processor(request):
-    categories = Category.objects.all()
-    return {'categories': categories}
\ No newline at end of file
+    categories = SimpleLazyObject(get_cached_categories)
+    return {'categories': categories}
@@ -0,0 +1,98 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from press.caching import invalidate_posts
+from press.models import Category, Comment, CommentStatus, CoolUser, Post
+
+COUNTER_CHUNK_SIZE = 400
+
+
+def add_to_counter(model, field: str, deltas: Dict[int, int], touch: bool = False):
+    """
+    ``field = field + delta`` for every ``{pk: delta}``, as a single UPDATE per
+    chunk so that concurrent writers never lose an increment. ``touch`` also
+    bumps ``last_update``, for the rows whose API payload shows the counter.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    pks = sorted(deltas)
+    for start in range(0, len(pks), COUNTER_CHUNK_SIZE):
+        chunk = pks[start:start + COUNTER_CHUNK_SIZE]
+        if len(chunk) == 1:
+            increment = Value(deltas[chunk[0]])
+        else:
+            increment = Case(*[When(pk=pk, then=Value(deltas[pk])) for pk in chunk],
+                             default=Value(0), output_field=IntegerField())
+        fields = {field: F(field) + increment}
+        if touch:
+            fields['last_update'] = timezone.now()
+        model.objects.filter(pk__in=chunk).update(**fields)
+
+
+def count_new_posts(posts: Iterable[Post], weight: int = 1):
+    categories, authors = Counter(), Counter()
+    for post in posts:
+        categories[post.category_id] += weight
+        authors[post.author_id] += weight
+    add_to_counter(Category, 'post_count', categories, touch=True)
+    add_to_counter(CoolUser, 'post_count', authors)
+
+
+def move_post(previous: Tuple[int, int], post: Post):
+    """Move a saved post from its ``(category_id, author_id)`` before the save."""
+    previous_category_id, previous_author_id = previous
+    if previous_category_id != post.category_id:
+        add_to_counter(Category, 'post_count', {previous_category_id: -1, post.category_id: 1},
+                       touch=True)
+    if previous_author_id != post.author_id:
+        add_to_counter(CoolUser, 'post_count', {previous_author_id: -1, post.author_id: 1})
+
+
+def count_comment(post_id: int, status: str, weight: int = 1):
+    fields = {'comment_count': F('comment_count') + weight}
+    if status == CommentStatus.PUBLISHED:
+        fields['published_comment_count'] = F('published_comment_count') + weight
+    Post.objects.filter(pk=post_id).update(**fields)
+
+
+def counter_subquery(model, field: str, **filters):
+    counts = model.objects.filter(**{field: OuterRef('pk')}, **filters).order_by() \
+        .values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def counter_definitions() -> List[tuple]:
+    """(model, counter field, expression counting it) for every counter column."""
+    return [
+        (Category, 'post_count', counter_subquery(Post, 'category')),
+        (CoolUser, 'post_count', counter_subquery(Post, 'author')),
+        (Post, 'comment_count', counter_subquery(Comment, 'post')),
+        (Post, 'published_comment_count',
+         counter_subquery(Comment, 'post', status=CommentStatus.PUBLISHED)),
+    ]
+
+
+def reconcile_counters() -> Dict[str, int]:
+    """
+    Recount the rows whose counters drifted; returns how many were fixed per
+    counter. The fixed rows get a new ``last_update`` and the pages showing
+    them are expired, as when the signals move a counter.
+    """
+    fixed = {}
+    fixed_posts = set()
+    for model, field, expression in counter_definitions():
+        drifted = list(model.objects.annotate(actual=expression)
+                       .exclude(**{field: F('actual')})
+                       .values_list('pk', flat=True))
+        for start in range(0, len(drifted), COUNTER_CHUNK_SIZE):
+            model.objects.filter(pk__in=drifted[start:start + COUNTER_CHUNK_SIZE]) \
+                .update(**{field: expression, 'last_update': timezone.now()})
+        if model is Post:
+            fixed_posts.update(drifted)
+        fixed[f'{model._meta.model_name}.{field}'] = len(drifted)
+    if any(fixed.values()):
+        invalidate_posts(sorted(fixed_posts))
+    return fixed
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+try:
+    from asgiref.sync import markcoroutinefunction
+except ImportError:
+    # asgiref < 3.6, which Django 3.2 allows: mark it the way Django does.
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'use_primary'
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# Per request (thread or async task): whether reads may use a replica, the
+# replica picked for them and whether anything was written yet.
+_state = Local()
+_replica_down_until: Dict[str, float] = {}
+
+
+def replica_available(alias: str) -> bool:
+    """
+    Whether ``alias`` can be connected to. A replica that fails is skipped for
+    ``REPLICA_RETRY_SECONDS`` instead of being probed on every read.
+    """
+    if _replica_down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable, reading from the primary', alias, exc_info=True)
+        _replica_down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        return False
+    _replica_down_until.pop(alias, None)
+    return True
+
+
+def pick_replica() -> Optional[str]:
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_available(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def read_from_replicas(enabled: bool = True):
+    """
+    Send the reads made inside the block to one replica, until the first write
+    pins the rest of the block to the primary. Yields the state, whose
+    ``wrote`` tells whether that happened.
+    """
+    previous = getattr(_state, 'routing', None)
+    routing = _state.routing = ReplicaRouting(enabled)
+    try:
+        yield routing
+    finally:
+        _state.routing = previous
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Send the reads made inside the block to the primary, for results that get
+    cached: a lagging replica would have them served stale after it caught up.
+    A write in the block still pins the enclosing one.
+    """
+    outer = getattr(_state, 'routing', None)
+    try:
+        with read_from_replicas(False) as routing:
+            yield routing
+    finally:
+        if outer is not None and routing.wrote:
+            outer.wrote = True
+
+
+class ReplicaRouting:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.wrote = False
+        self._replica = None
+        self._picked = False
+
+    @property
+    def replica(self) -> Optional[str]:
+        if not self.enabled or self.wrote:
+            return None
+        if not self._picked:
+            # One replica per block, so all of its reads see the same snapshot.
+            self._replica = pick_replica()
+            self._picked = True
+        return self._replica
+
+
+class ReplicaRouter:
+    """
+    Reads go to a replica only inside ``read_from_replicas`` (safe requests,
+    through ``ReplicaMiddleware``); writes and everything else go to the
+    primary. Replicas are copies of the primary, so they are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = getattr(_state, 'routing', None)
+        return routing.replica if routing else None
+
+    def db_for_write(self, model, **hints):
+        routing = getattr(_state, 'routing', None)
+        if routing:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """
+    Lets safe requests read from the replicas. A request that writes sets a
+    short lived cookie, so the requests following it read their own writes
+    from the primary while the replicas catch up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with read_from_replicas(self.replicas_enabled(request)) as routing:
+            response = self.get_response(request)
+        return self.pin_if_written(routing, response)
+
+    async def __acall__(self, request):
+        with read_from_replicas(self.replicas_enabled(request)) as routing:
+            response = await self.get_response(request)
+        return self.pin_if_written(routing, response)
+
+    def replicas_enabled(self, request) -> bool:
+        return request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+
+    def pin_if_written(self, routing: ReplicaRouting, response):
+        if routing.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.READ_YOUR_WRITES_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,173 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from press.models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_SIZE = 64 * 1024
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+GZIP_CONTENT_TYPE = 'application/gzip'
+
+
+class ExportError(ValueError):
+    pass
+
+
+@dataclass
+class ExportDataset:
+    model: type
+    fields: List[str]
+    # Filter name -> lookup, besides the creation date range.
+    lookups: Dict[str, str]
+
+
+EXPORT_DATASETS = {
+    'posts': ExportDataset(Post, ['id', 'title', 'body', 'image_link', 'status', 'category_id',
+                                  'author_id', 'creation_date', 'publish_date', 'last_update'],
+                           {'category': 'category_id', 'author': 'author_id',
+                            'status': 'status'}),
+    'comments': ExportDataset(Comment, ['id', 'post_id', 'author_id', 'body', 'status', 'votes',
+                                        'creation_date', 'last_update'],
+                              {'category': 'post__category_id', 'author': 'author_id',
+                               'status': 'status'}),
+}
+
+
+def parse_moment(value: str) -> datetime.datetime:
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ExportError(f'Invalid date {value!r}, use YYYY-MM-DD or an ISO 8601 datetime')
+        moment = datetime.datetime.combine(day, datetime.time())
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def get_export_filters(dataset: ExportDataset, params: Mapping[str, str]) -> dict:
+    """
+    Queryset filters for the ``category``, ``author`` (ids), ``status``,
+    ``since`` (inclusive) and ``until`` (exclusive) params that are set.
+    """
+    filters = {}
+    for name in ('category', 'author'):
+        if params.get(name):
+            try:
+                filters[dataset.lookups[name]] = int(params[name])
+            except ValueError as e:
+                raise ExportError(f'{name} must be an id, got {params[name]!r}') from e
+    status = params.get('status')
+    if status:
+        statuses = [value for value, _ in dataset.model._meta.get_field('status').choices]
+        if status not in statuses:
+            raise ExportError(f'status must be one of {", ".join(statuses)}')
+        filters[dataset.lookups['status']] = status
+    if params.get('since'):
+        filters['creation_date__gte'] = parse_moment(params['since'])
+    if params.get('until'):
+        filters['creation_date__lt'] = parse_moment(params['until'])
+    return filters
+
+
+def export_rows(queryset, fields: List[str], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Every row of ``queryset`` in id order, read in chunks that each start
+    after the last id of the previous one, so memory stays constant and no
+    chunk pays for an OFFSET.
+    """
+    # Checked now rather than on the first row, which may be read much later.
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, got {chunk_size}')
+    return iter_chunks(queryset, fields, chunk_size)
+
+
+def iter_chunks(queryset, fields: List[str], chunk_size: int) -> Iterator[dict]:
+    last_id = 0
+    while True:
+        chunk = queryset.filter(pk__gt=last_id).order_by('pk').values(*fields)[:chunk_size]
+        count = 0
+        for row in chunk.iterator(chunk_size=chunk_size):
+            yield row
+            last_id = row['id']
+            count += 1
+        if count < chunk_size:
+            return
+
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+def ndjson_lines(rows: Iterable[dict], fields: List[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({name: export_value(row[name]) for name in fields},
+                         ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows: Iterable[dict], fields: List[str]) -> Iterator[str]:
+    line = io.StringIO()
+    writer = csv.writer(line)
+    records = ([export_value(row[name]) for name in fields] for row in rows)
+    for record in itertools.chain([fields], records):
+        writer.writerow(record)
+        yield line.getvalue()
+        line.seek(0)
+        line.truncate()
+
+
+ENCODERS = {'ndjson': ndjson_lines, 'csv': csv_lines}
+
+
+def buffered(lines: Iterable[str], size: int = EXPORT_BUFFER_SIZE) -> Iterator[str]:
+    pending, pending_size = [], 0
+    for line in lines:
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= size:
+            yield ''.join(pending)
+            pending, pending_size = [], 0
+    if pending:
+        yield ''.join(pending)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_text(dataset_name: str, params: Mapping[str, str], export_format: str,
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    The rows of an ``EXPORT_DATASETS`` entry matching ``params`` as NDJSON or
+    CSV text, in chunks of about ``EXPORT_BUFFER_SIZE`` characters. The params
+    are checked here, before anything is read.
+    """
+    if dataset_name not in EXPORT_DATASETS:
+        raise ExportError(f'Unknown dataset {dataset_name!r}, use {" or ".join(EXPORT_DATASETS)}')
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f'Unknown format {export_format!r}, use {" or ".join(EXPORT_FORMATS)}')
+    dataset = EXPORT_DATASETS[dataset_name]
+    queryset = dataset.model.objects.filter(**get_export_filters(dataset, params))
+    rows = export_rows(queryset, dataset.fields, chunk_size)
+    return buffered(ENCODERS[export_format](rows, dataset.fields))
+
+
+def export_bytes(text_chunks: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    chunks = (chunk.encode() for chunk in text_chunks)
+    return gzipped(chunks) if compress else chunks
+
+
+def export_filename(dataset_name: str, export_format: str, compress: bool = False) -> str:
+    return f'{dataset_name}.{export_format}' + ('.gz' if compress else '')
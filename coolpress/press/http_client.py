@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TIMEOUT = (3.05, 30)
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 16
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Bodies larger than this are never kept: one would push out most of the cache.
+CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+NEGATIVE_TTL = 300
+NEGATIVE_STATUSES = {404, 410}
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class CachedResponse:
+    """What is needed to answer a GET again: no connection, request or raw stream."""
+    url: str
+    status_code: int
+    headers: dict
+    content: bytes
+    encoding: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fresh_until: float = 0
+
+    @classmethod
+    def from_response(cls, response: requests.Response, **kwargs) -> 'CachedResponse':
+        return cls(url=response.url, status_code=response.status_code,
+                   headers=dict(response.headers), content=response.content,
+                   encoding=response.encoding, **kwargs)
+
+    @property
+    def negative(self) -> bool:
+        return self.status_code in NEGATIVE_STATUSES
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        return response
+
+
+def get_max_age(response: requests.Response) -> int:
+    cache_control = response.headers.get('Cache-Control', '')
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    match = MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class HttpClient:
+    """
+    A ``requests`` session with pooled keep-alive connections per host, default
+    timeouts and a small in-memory LRU cache of GET responses, bounded by the
+    size of the bodies it keeps.
+
+    Responses carrying an ETag or Last-Modified header are revalidated with a
+    conditional request (served from the cache on 304), fresh ``max-age``
+    responses are served without a request and 404/410 answers are remembered
+    for ``negative_ttl`` seconds.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE, cache_max_bytes: int = CACHE_MAX_BYTES,
+                 cache_max_entry_bytes: int = CACHE_MAX_ENTRY_BYTES,
+                 negative_ttl: float = NEGATIVE_TTL):
+        self.timeout = timeout
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_entry_bytes = min(cache_max_entry_bytes, cache_max_bytes)
+        self.negative_ttl = negative_ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def get_cached(self, key: str) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+            return entry
+
+    def store(self, key: str, response: requests.Response):
+        now = time.monotonic()
+        if len(response.content) > self.cache_max_entry_bytes:
+            return
+        if response.status_code in NEGATIVE_STATUSES:
+            entry = CachedResponse.from_response(response, fresh_until=now + self.negative_ttl)
+        elif response.status_code == 200:
+            entry = CachedResponse.from_response(
+                response, etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                fresh_until=now + get_max_age(response))
+            if not (entry.etag or entry.last_modified or entry.fresh_until > now):
+                return
+        else:
+            return
+        with self.lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self.cache_bytes -= previous.size
+            self.cache[key] = entry
+            self.cache_bytes += entry.size
+            while self.cache_bytes > self.cache_max_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= evicted.size
+
+    def count(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def get(self, url: str, params: dict = None, cache: bool = True, timeout=None,
+            headers: dict = None) -> requests.Response:
+        timeout = timeout or self.timeout
+        headers = dict(headers or {})
+        if not cache:
+            self.count('uncached')
+            return self.session.get(url, params=params, timeout=timeout, headers=headers)
+
+        key = requests.Request('GET', url, params=params).prepare().url
+        entry = self.get_cached(key)
+        if entry is not None:
+            if entry.fresh_until > time.monotonic():
+                self.count('negative_hits' if entry.negative else 'hits')
+                return entry.to_response()
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self.session.get(url, params=params, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.count('revalidated')
+            entry.fresh_until = time.monotonic() + get_max_age(response)
+            return entry.to_response()
+        self.count('misses')
+        self.store(key, response)
+        return response
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'hits': self.counters['hits'],
+                    'negative_hits': self.counters['negative_hits'],
+                    'revalidated': self.counters['revalidated'],
+                    'misses': self.counters['misses'],
+                    'uncached': self.counters['uncached'],
+                    'cached_entries': len(self.cache),
+                    'cached_bytes': self.cache_bytes}
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.cache_bytes = 0
+            self.counters.clear()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
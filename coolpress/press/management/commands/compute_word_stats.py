@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from press.stats_manager import compute_word_stats
+
+
+class Command(BaseCommand):
+    help = 'Compute the site, category and author top words of the published posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=50,
+                            help='Number of words stored for each scope')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Tokenizer processes, defaults to the number of CPUs')
+
+    def handle(self, *args, **options):
+        stored = compute_word_stats(limit=options['top'], chunk_size=options['chunk_size'],
+                                    workers=options['workers'])
+        self.stdout.write(f'Stored {stored} word stats')
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from press.trending import redecay_trending_scores, rebuild_trending_scores
+
+
+class Command(BaseCommand):
+    help = 'Decay the stored trending scores to the current time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Recompute every score from the comments instead')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            stored = rebuild_trending_scores()
+            self.stdout.write(f'Rebuilt {stored} trending scores')
+        else:
+            updated = redecay_trending_scores()
+            self.stdout.write(f'Decayed {updated} trending scores')
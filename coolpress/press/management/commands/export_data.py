@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand, CommandError
+
+from press.export import EXPORT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS, ExportError, \
+    export_bytes, export_text
+
+
+class Command(BaseCommand):
+    help = 'Stream every post or comment matching the filters as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_DATASETS))
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='File to write, defaults to stdout')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output file')
+        parser.add_argument('--category', help='Category id')
+        parser.add_argument('--author', help='CoolUser id')
+        parser.add_argument('--status')
+        parser.add_argument('--since', help='Created at or after this date or datetime')
+        parser.add_argument('--until', help='Created before this date or datetime')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Rows read per query')
+
+    def handle(self, *args, **options):
+        if options['gzip'] and not options['output']:
+            raise CommandError('--gzip needs an --output file')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        try:
+            text = export_text(options['dataset'], options, options['format'],
+                               options['chunk_size'])
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if not options['output']:
+            for chunk in text:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'wb') as fw:
+            for chunk in export_bytes(text, options['gzip']):
+                fw.write(chunk)
+        self.stdout.write(f'Exported the {options["dataset"]} to {options["output"]}')
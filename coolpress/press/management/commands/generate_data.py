@@ -0,0 +1,32 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from press.synthetic import DEFAULT_ZIPF, SYNTHETIC_BATCH_SIZE, generate_synthetic_data
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic users, categories, posts and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--zipf', type=float, default=DEFAULT_ZIPF,
+                            help='Exponent of the Zipf law spreading the comments over the posts')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=SYNTHETIC_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            data = generate_synthetic_data(options['users'], options['categories'],
+                                           options['posts'], options['comments'],
+                                           exponent=options['zipf'], seed=options['seed'],
+                                           batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'Created {len(data.users)} users, {len(data.categories)} categories, '
+                          f'{len(data.posts)} posts and {data.comments} comments '
+                          f'in {time.perf_counter() - start:.1f}s')
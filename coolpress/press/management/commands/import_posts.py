@@ -1,21 +1,68 @@
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 
-from press.mediastack_manager import get_mediastack_posts
+from press.mediastack_dumps import DUMP_BATCH_SIZE, DumpError, DumpProgress, \
+    import_mediastack_dumps
+from press.mediastack_fetcher import MediastackFetcher, fetch_all_mediastack_posts, \
+    DEFAULT_CONCURRENCY
+from press.mediastack_manager import import_mediastack_batch
 
 
 class Command(BaseCommand):
-    help = 'Get the latest news from mediastack'
+    help = 'Get the latest news from mediastack, or load them from saved mediastack responses'
 
     def add_arguments(self, parser):
         parser.add_argument('categories', nargs='*', type=str)
-        parser.add_argument('sources', nargs='*', type=str)
-        parser.add_argument('countries', nargs='*', type=str)
+        parser.add_argument('--sources', nargs='*', type=str, default=[])
+        parser.add_argument('--countries', nargs='*', type=str, default=[])
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+        parser.add_argument('--no-resume', action='store_false', dest='resume',
+                            help='Ignore saved checkpoints and start every query from the first page')
+        parser.add_argument('--dump', nargs='+', type=str, default=[],
+                            help='JSON or NDJSON files of mediastack responses or articles, '
+                                 'gzipped or not, to import instead of calling the API')
+        parser.add_argument('--batch-size', type=int, default=DUMP_BATCH_SIZE,
+                            help='Articles imported per transaction with --dump')
 
     def handle(self, *args, **options):
+        if options['dump']:
+            return self.import_dumps(options)
+
         sources = options['sources']
         categories = options['categories']
         countries = options['countries']
 
-        posts = get_mediastack_posts(sources=sources, categories=categories, countries=countries)
+        results = []
+
+        def on_page(news):
+            result = import_mediastack_batch(news)
+            results.append(result)
+            self.stdout.write(f'Batch {len(results)}: {result.inserted} inserted, '
+                              f'{result.duplicates} duplicates, {result.skipped} skipped')
+
+        fetcher = MediastackFetcher(concurrency=options['concurrency'], resume=options['resume'])
+        summary = fetch_all_mediastack_posts(on_page, categories=categories, countries=countries,
+                                             sources=sources, fetcher=fetcher)
+
+        for query in summary.failed:
+            self.stderr.write(f'Could not finish {query}, run the command again to resume it')
+        inserted = sum(result.inserted for result in results)
+        self.stdout.write(f'Saved {inserted} new posts for {sources} sources and {categories} categories')
+
+    def import_dumps(self, options):
+        if options['categories'] or options['sources'] or options['countries']:
+            raise CommandError('--dump imports whole files, it takes no categories, '
+                               'sources or countries')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        def on_batch(progress: DumpProgress):
+            self.stdout.write(f'Batch {progress.batches}: {progress.rows} read, '
+                              f'{progress.inserted} inserted, {progress.duplicates} duplicates, '
+                              f'{progress.skipped} skipped, {progress.rows_per_second:.0f} rows/s')
 
-        self.stdout.write(f'Saved {len(posts)} new posts for {sources} sources and {categories} categories')
\ No newline at end of file
+        try:
+            progress = import_mediastack_dumps(options['dump'], options['batch_size'], on_batch)
+        except (OSError, EOFError, UnicodeDecodeError, DumpError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'Saved {progress.inserted} new posts from {progress.rows} articles '
+                          f'in {progress.elapsed:.1f}s')
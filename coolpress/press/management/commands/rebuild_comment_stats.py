@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from press.stats_manager import rebuild_comment_word_counts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per post comment word counts from the published comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post', nargs='*', type=int, dest='post_ids',
+                            help='Only rebuild the counts of these posts')
+
+    def handle(self, *args, **options):
+        created = rebuild_comment_word_counts(post_ids=options['post_ids'])
+        self.stdout.write(f'Stored {created} comment word counts')
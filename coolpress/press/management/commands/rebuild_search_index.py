@@ -0,0 +1,11 @@
+from django.core.management import BaseCommand
+
+from press.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full text search index of the posts'
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        self.stdout.write('Rebuilt the post search index')
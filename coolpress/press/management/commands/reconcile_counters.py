@@ -0,0 +1,11 @@
+from django.core.management import BaseCommand
+
+from press.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized post and comment counters that drifted'
+
+    def handle(self, *args, **options):
+        for counter, fixed in reconcile_counters().items():
+            self.stdout.write(f'{counter}: fixed {fixed} rows')
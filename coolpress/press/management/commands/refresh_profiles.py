@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+
+from press.profile_enrichment import DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, \
+    HOST_MIN_INTERVAL, MAX_ATTEMPTS, RateLimiter, enqueue_stale_profiles, process_jobs, \
+    release_stuck_jobs
+
+
+class Command(BaseCommand):
+    help = 'Refresh the gravatar and GitHub data of the queued profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+        parser.add_argument('--host-interval', type=float, default=HOST_MIN_INTERVAL,
+                            help='Minimum seconds between two requests to the same host')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--stale-hours', type=int,
+                            help='Also queue the profiles not refreshed for that many hours')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling it')
+        parser.add_argument('--poll-interval', type=float, default=10)
+
+    def handle(self, *args, **options):
+        if options['stale_hours'] is not None:
+            queued = enqueue_stale_profiles(timedelta(hours=options['stale_hours']))
+            self.stdout.write(f'Queued {queued} stale profiles')
+        released = release_stuck_jobs()
+        if released:
+            self.stdout.write(f'Requeued {released} stuck jobs')
+
+        limiter = RateLimiter(options['host_interval'])
+        while True:
+            summary = process_jobs(batch_size=options['batch_size'],
+                                   concurrency=options['concurrency'],
+                                   limiter=limiter, max_attempts=options['max_attempts'])
+            if summary.done or summary.failed:
+                self.stdout.write(f'Refreshed {summary.done} profiles, {summary.failed} failed')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,207 @@
+import gzip
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
+
+from press.mediastack_manager import BatchResult, chunked, import_mediastack_batch
+
+DUMP_BATCH_SIZE = 2000
+DUMP_READ_SIZE = 1024 * 1024
+# No article comes close, a value this long means the JSON is broken.
+DUMP_MAX_VALUE_SIZE = 64 * 1024 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+NOT_WHITESPACE = re.compile(r'[^ \t\n\r]')
+
+_decoder = json.JSONDecoder()
+
+
+class DumpError(ValueError):
+    pass
+
+
+@dataclass
+class DumpProgress:
+    rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add(self, rows: int, result: BatchResult, elapsed: float):
+        self.rows += rows
+        self.inserted += result.inserted
+        self.duplicates += result.duplicates
+        self.skipped += result.skipped
+        self.batches += 1
+        self.elapsed = elapsed
+
+
+def open_dump(path: str) -> TextIO:
+    """Open a dump as text, gunzipping it when it starts with the gzip magic number."""
+    with open(path, 'rb') as fr:
+        compressed = fr.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class JsonReader:
+    """
+    Reads JSON values from a text stream a window at a time, so a file is
+    never held in memory whole: only the value being decoded is.
+    """
+
+    def __init__(self, stream: TextIO, read_size: int = DUMP_READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.stream.read(self.read_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next character that is not whitespace, '' at the end of the stream."""
+        while True:
+            match = NOT_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise DumpError(f'Expected {char!r}, found {found or "the end of the file"!r}')
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if len(self.buffer) - self.pos > DUMP_MAX_VALUE_SIZE or not self.fill():
+                    raise DumpError(f'Invalid JSON: {e}') from e
+                continue
+            # A number or a literal cut at the end of the window may go on.
+            if end < len(self.buffer) or not self.fill():
+                self.pos = end
+                return value
+
+    def buffered_value(self):
+        """
+        The next value if it is complete in the window, else None with nothing
+        consumed.
+        """
+        self.peek()
+        try:
+            value, end = _decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            return None
+        if end == len(self.buffer):
+            return None
+        self.pos = end
+        return value
+
+    def items(self, opening: str, closing: str) -> Iterator[None]:
+        """Step through the members of an array or an object, one per ``next``."""
+        self.expect(opening)
+        if self.peek() == closing:
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == closing:
+                self.pos += 1
+                return
+            self.expect(',')
+
+
+def iter_array(reader: JsonReader) -> Iterator:
+    for _ in reader.items('[', ']'):
+        yield reader.value()
+
+
+def iter_object(reader: JsonReader) -> Iterator[dict]:
+    """
+    An article, or the articles in the ``data`` array of a response. Objects
+    that fit in the window are decoded at once, longer ones member by member
+    so only one article of a response is in memory at a time.
+    """
+    value = reader.buffered_value()
+    if value is not None:
+        data = value.get('data')
+        yield from data if isinstance(data, list) else [value]
+        return
+
+    members, is_response = {}, False
+    for _ in reader.items('{', '}'):
+        key = reader.value()
+        reader.expect(':')
+        if key == 'data' and reader.peek() == '[':
+            is_response = True
+            yield from iter_array(reader)
+        else:
+            members[key] = reader.value()
+    if not is_response:
+        yield members
+
+
+def iter_dump_articles(stream: TextIO, read_size: int = DUMP_READ_SIZE) -> Iterator[dict]:
+    """
+    The articles of a mediastack dump: a saved API response, a JSON list of
+    articles, or NDJSON with an article or a response per line.
+    """
+    reader = JsonReader(stream, read_size)
+    while True:
+        char = reader.peek()
+        if not char:
+            return
+        if char == '[':
+            yield from iter_array(reader)
+        elif char == '{':
+            yield from iter_object(reader)
+        else:
+            raise DumpError(f'Expected an article, a response or a list, found {char!r}')
+
+
+def iter_dump_files(paths: Iterable[str]) -> Iterator[dict]:
+    for path in paths:
+        with open_dump(path) as stream:
+            yield from iter_dump_articles(stream)
+
+
+def import_mediastack_dumps(paths: List[str], batch_size: int = DUMP_BATCH_SIZE,
+                            on_batch: Optional[Callable[[DumpProgress], None]] = None
+                            ) -> DumpProgress:
+    """
+    Import every article of the dump files with ``import_mediastack_batch``,
+    one transaction per batch, reporting the running totals after each batch.
+    """
+    progress = DumpProgress()
+    start = time.perf_counter()
+    for batch in chunked(iter_dump_files(paths), batch_size):
+        result = import_mediastack_batch(batch)
+        progress.add(len(batch), result, time.perf_counter() - start)
+        if on_batch:
+            on_batch(progress)
+    return progress
@@ -0,0 +1,232 @@
+import asyncio
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+import requests
+
+from coolpress.settings import MEDIASTACK_ACCESS_KEY
+from press.http_client import get_client
+from press.mediastack_manager import MEDIASTACK_URL, get_mediastack_params, \
+    get_post_publish_time
+from press.models import MediastackCheckpoint
+
+logger = logging.getLogger(__name__)
+
+PAGE_LIMIT = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = (3.05, 30)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class MediastackError(Exception):
+    pass
+
+
+# What fails a single query: the others carry on and its checkpoint is kept.
+FETCH_ERRORS = (MediastackError, requests.RequestException)
+
+
+@dataclass
+class FetchSummary:
+    fetched: int = 0
+    pages: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+def get_query_combinations(categories: List[str] = None, countries: List[str] = None,
+                           sources: List[str] = None) -> List[dict]:
+    combinations = itertools.product(categories or [None], countries or [None], sources or [None])
+    return [{'categories': [category] if category else None,
+             'countries': [country] if country else None,
+             'sources': [source] if source else None}
+            for category, country, source in combinations]
+
+
+def get_query_key(params: dict) -> str:
+    ignored = {'access_key', 'offset', 'limit'}
+    return urlencode(sorted((key, value) for key, value in params.items() if key not in ignored))
+
+
+class MediastackFetcher:
+    """
+    Pages through every result of a set of mediastack queries, running the
+    queries concurrently on a thread pool.
+
+    Only the HTTP calls run on the worker threads: pages are handed to
+    ``on_page`` and checkpointed from the calling thread, so each query can
+    resume from its last ingested offset after an interruption.
+    """
+
+    def __init__(self, base_url: str = MEDIASTACK_URL, access_key: str = MEDIASTACK_ACCESS_KEY,
+                 concurrency: int = DEFAULT_CONCURRENCY, limit: int = PAGE_LIMIT,
+                 timeout=DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff: float = RETRY_BACKOFF, resume: bool = True):
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        self.base_url = base_url
+        self.access_key = access_key
+        self.concurrency = concurrency
+        self.limit = limit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.resume = resume
+
+    def fetch_page(self, params: dict, offset: int) -> dict:
+        params = dict(params, offset=offset, limit=self.limit)
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Result pages are read once, there is no point keeping them around.
+                response = get_client().get(self.base_url, params=params, cache=False,
+                                            timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if not response.ok:
+                        raise MediastackError(f'mediastack answered {response.status_code}: '
+                                              f'{response.text[:200]}')
+                    return self.parse_page(response)
+                error = MediastackError(f'mediastack answered {response.status_code}')
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        raise MediastackError(f'Giving up on offset {offset} after {self.max_retries} retries') \
+            from error
+
+    @staticmethod
+    def parse_page(response) -> dict:
+        try:
+            page = response.json()
+        except ValueError as e:
+            raise MediastackError(f'mediastack answered invalid JSON: {response.text[:200]}') from e
+        if not isinstance(page, dict):
+            raise MediastackError(f'mediastack answered a {type(page).__name__}, not an object')
+        return page
+
+    def get_checkpoint(self, key: str) -> MediastackCheckpoint:
+        checkpoint, _ = MediastackCheckpoint.objects.get_or_create(query=key)
+        if not self.resume or checkpoint.completed_at is not None:
+            checkpoint.offset = 0
+            checkpoint.completed_at = None
+        return checkpoint
+
+    def save_page(self, checkpoint: MediastackCheckpoint, page: dict) -> bool:
+        data = page.get('data') or []
+        checkpoint.offset += len(data)
+        if data:
+            try:
+                checkpoint.last_published_at = get_post_publish_time(data[-1])
+            except (KeyError, TypeError, ValueError):
+                pass
+        total = (page.get('pagination') or {}).get('total')
+        finished = not data or (total is not None and checkpoint.offset >= total)
+        if finished:
+            checkpoint.completed_at = timezone.now()
+        checkpoint.save()
+        return finished
+
+    def run(self, queries: List[dict], on_page: Callable[[List[dict]], None]) -> FetchSummary:
+        summary = FetchSummary()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending: Dict = {}
+
+            def submit(params: dict, checkpoint: MediastackCheckpoint):
+                future = executor.submit(self.fetch_page, params, checkpoint.offset)
+                pending[future] = (params, checkpoint)
+
+            for query in queries:
+                params = get_mediastack_params(access_key=self.access_key, **query)
+                submit(params, self.get_checkpoint(get_query_key(params)))
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    params, checkpoint = pending.pop(future)
+                    try:
+                        page = future.result()
+                    except FETCH_ERRORS:
+                        self.record_failure(checkpoint, summary)
+                        continue
+                    if not self.ingest_page(checkpoint, page, on_page, summary):
+                        submit(params, checkpoint)
+        return summary
+
+    def record_failure(self, checkpoint: MediastackCheckpoint, summary: FetchSummary):
+        logger.exception('Stopped fetching %s at offset %s', checkpoint.query, checkpoint.offset)
+        summary.failed.append(checkpoint.query)
+
+    def ingest_page(self, checkpoint: MediastackCheckpoint, page: dict,
+                    on_page: Callable[[List[dict]], None], summary: FetchSummary) -> bool:
+        """Hand a fetched page to ``on_page`` and checkpoint it; True once the query is done."""
+        data = page.get('data') or []
+        if data:
+            on_page(data)
+        summary.pages += 1
+        summary.fetched += len(data)
+        return self.save_page(checkpoint, page)
+
+
+class AsyncMediastackFetcher(MediastackFetcher):
+    """
+    ``MediastackFetcher`` for async code, with the same paging, retries and
+    checkpoints. There is no async HTTP client here: the pages are fetched by
+    the shared pooled client on worker threads, at most ``concurrency`` at a
+    time, while ``on_page`` and the checkpoints run on Django's sync thread.
+    """
+
+    async def run(self, queries: List[dict], on_page: Callable[[List[dict]], None]) -> FetchSummary:
+        summary = FetchSummary()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fetch_page = sync_to_async(self.fetch_page, thread_sensitive=False)
+        get_checkpoint = sync_to_async(self.get_checkpoint)
+        ingest_page = sync_to_async(self.ingest_page)
+        pending: Dict = {}
+
+        async def fetch(params: dict, offset: int) -> dict:
+            async with semaphore:
+                return await fetch_page(params, offset)
+
+        def submit(params: dict, checkpoint: MediastackCheckpoint):
+            pending[asyncio.ensure_future(fetch(params, checkpoint.offset))] = (params, checkpoint)
+
+        for query in queries:
+            params = get_mediastack_params(access_key=self.access_key, **query)
+            submit(params, await get_checkpoint(get_query_key(params)))
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                params, checkpoint = pending.pop(future)
+                try:
+                    page = future.result()
+                except FETCH_ERRORS:
+                    self.record_failure(checkpoint, summary)
+                    continue
+                if not await ingest_page(checkpoint, page, on_page, summary):
+                    submit(params, checkpoint)
+        return summary
+
+
+def fetch_all_mediastack_posts(on_page: Callable[[List[dict]], None],
+                               categories: List[str] = None, countries: List[str] = None,
+                               sources: List[str] = None,
+                               fetcher: Optional[MediastackFetcher] = None) -> FetchSummary:
+    fetcher = fetcher or MediastackFetcher()
+    return fetcher.run(get_query_combinations(categories, countries, sources), on_page)
+
+
+async def afetch_all_mediastack_posts(on_page: Callable[[List[dict]], None],
+                                      categories: List[str] = None, countries: List[str] = None,
+                                      sources: List[str] = None,
+                                      fetcher: Optional[AsyncMediastackFetcher] = None) -> FetchSummary:
+    fetcher = fetcher or AsyncMediastackFetcher()
+    return await fetcher.run(get_query_combinations(categories, countries, sources), on_page)
@@ -1,16 +1,47 @@
 import datetime
-from typing import List
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
 
 from django.contrib.auth.models import User
-import requests
+from django.db import transaction
 
 from coolpress.settings import MEDIASTACK_ACCESS_KEY
-from press.models import Post, PostStatus, Category, CoolUser
+from press.caching import invalidate_posts
+from press.counters import count_new_posts
+from press.http_client import get_client
+from press.models import Post, PostStatus, Category, CoolUser, post_fingerprint
+
+MEDIASTACK_URL = 'http://api.mediastack.com/v1/news'
+IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class BatchResult:
+    inserted: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+
+
+def get_mediastack_author_names(r_json) -> List[str]:
+    return (r_json.get('author') or '').split() or ['anonymous']
+
+
+def get_mediastack_username(r_json) -> str:
+    return ''.join(get_mediastack_author_names(r_json)).lower()
+
+
+def get_mediastack_category_label(r_json) -> str:
+    return (r_json.get('category') or 'general').title()
+
+
+def get_mediastack_category_slug(label: str) -> str:
+    return label.replace(' ', '-').lower()
 
 
 def get_or_create_mediastack_author(r_json) -> CoolUser:
-    names = (r_json.get('author') or 'anonymous').split()
-    username = ''.join(names).lower()
+    names = get_mediastack_author_names(r_json)
+    username = get_mediastack_username(r_json)
     try:
         return CoolUser.objects.get(user__username=username)
     except CoolUser.DoesNotExist:
@@ -21,11 +52,11 @@ def get_or_create_mediastack_author(r_json) -> CoolUser:
 
 
 def get_or_create_mediastack_category(r_json) -> Category:
-    label = r_json.get('category', 'general').title()
+    label = get_mediastack_category_label(r_json)
     try:
         return Category.objects.get(label=label)
     except Category.DoesNotExist:
-        slug = label.replace(' ', '-').lower()
+        slug = get_mediastack_category_slug(label)
         return Category.objects.create(label=label, slug=slug)
 
 
@@ -33,13 +64,26 @@ def get_post_publish_time(r_json) -> datetime:
     return datetime.datetime.fromisoformat(r_json['published_at'])
 
 
+def get_post_body(r_json) -> str:
+    return f"{r_json.get('description', '')}\nsee more at: {r_json.get('url', '')}"
+
+
+def get_post_title(r_json) -> str:
+    return r_json.get('title', 'No Title')
+
+
+def get_post_image_link(r_json) -> str:
+    return r_json.get('image', '')
+
+
 def serialize_from_mediastack(response_json) -> Post:
-    body = f"{response_json.get('description', '')}\nsee more at: {response_json.get('url', '')}"
-    title = response_json.get('title', 'No Title')
+    body = get_post_body(response_json)
+    title = get_post_title(response_json)
     category = get_or_create_mediastack_category(response_json)
-    image_link = response_json.get('image', '')
+    image_link = get_post_image_link(response_json)
+    fingerprint = post_fingerprint(title, body, image_link, category.id)
     try:
-        return Post.objects.get(body=body, title=title, category=category, image_link=image_link)
+        return Post.objects.get(fingerprint=fingerprint)
     except Post.DoesNotExist:
         cu = get_or_create_mediastack_author(response_json)
         publish_date = get_post_publish_time(response_json)
@@ -49,13 +93,142 @@ def serialize_from_mediastack(response_json) -> Post:
                                    status=PostStatus.PUBLISHED,
                                    author=cu,
                                    category=category,
-                                   publish_date=publish_date)
+                                   publish_date=publish_date,
+                                   fingerprint=fingerprint)
 
 
-def get_mediastack_posts(sources: List[str] = None, date: datetime.datetime = None,
-                         languages: List[str] = None, keywords: List[str] = None,
-                         categories: List[str] = None, countries=None,
-                         access_key=MEDIASTACK_ACCESS_KEY):
+def resolve_mediastack_authors(r_jsons: Iterable[dict]) -> Dict[str, CoolUser]:
+    names_by_username = {}
+    for r_json in r_jsons:
+        names_by_username.setdefault(get_mediastack_username(r_json),
+                                     get_mediastack_author_names(r_json))
+
+    def fetch(usernames):
+        authors_qs = CoolUser.objects.filter(user__username__in=usernames).select_related('user')
+        return {cu.user.username: cu for cu in authors_qs}
+
+    authors = fetch(names_by_username)
+    missing = [username for username in names_by_username if username not in authors]
+    if missing:
+        existing_users = set(User.objects.filter(username__in=missing)
+                             .values_list('username', flat=True))
+        new_users = []
+        for username in missing:
+            if username not in existing_users:
+                names = names_by_username[username]
+                new_users.append(User(username=username, first_name=names[0],
+                                      last_name=' '.join(names[1:])))
+        User.objects.bulk_create(new_users)
+        users = User.objects.filter(username__in=missing).only('id')
+        CoolUser.objects.bulk_create([CoolUser(user=user) for user in users])
+        authors.update(fetch(missing))
+    return authors
+
+
+def resolve_mediastack_categories(r_jsons: Iterable[dict]) -> Dict[str, Category]:
+    labels = {get_mediastack_category_label(r_json) for r_json in r_jsons}
+
+    def fetch(labels_to_fetch):
+        categories = {}
+        for category in Category.objects.filter(label__in=labels_to_fetch).order_by('id'):
+            categories.setdefault(category.label, category)
+        return categories
+
+    categories = fetch(labels)
+    missing = [label for label in labels if label not in categories]
+    if missing:
+        Category.objects.bulk_create([Category(label=label, slug=get_mediastack_category_slug(label))
+                                      for label in missing])
+        categories.update(fetch(missing))
+    return categories
+
+
+def is_valid_mediastack_article(r_json) -> bool:
+    """Whether the title and the image link can be stored as they are."""
+    title = get_post_title(r_json)
+    return isinstance(title, str) and bool(title.strip()) and \
+        isinstance(get_post_image_link(r_json) or '', str)
+
+
+@transaction.atomic
+def import_mediastack_batch(r_jsons: List[dict]) -> BatchResult:
+    """
+    Import one batch of mediastack articles with a constant number of queries:
+    authors, categories and duplicates are resolved for the whole batch and the
+    new posts are written with a single bulk insert.
+    """
+    result = BatchResult()
+    valid = []
+    for r_json in r_jsons:
+        try:
+            publish_date = get_post_publish_time(r_json)
+        except (KeyError, TypeError, ValueError):
+            result.skipped += 1
+            continue
+        if not is_valid_mediastack_article(r_json):
+            result.skipped += 1
+            continue
+        valid.append((r_json, publish_date))
+    if not valid:
+        return result
+
+    authors = resolve_mediastack_authors(r_json for r_json, _ in valid)
+    categories = resolve_mediastack_categories(r_json for r_json, _ in valid)
+
+    candidates = {}
+    for r_json, publish_date in valid:
+        post = Post(title=get_post_title(r_json),
+                    body=get_post_body(r_json),
+                    image_link=get_post_image_link(r_json),
+                    status=PostStatus.PUBLISHED,
+                    author=authors[get_mediastack_username(r_json)],
+                    category=categories[get_mediastack_category_label(r_json)],
+                    publish_date=publish_date)
+        post.fingerprint = post.compute_fingerprint()
+        if post.fingerprint in candidates:
+            result.duplicates += 1
+        else:
+            candidates[post.fingerprint] = post
+
+    existing = set(Post.objects.filter(fingerprint__in=candidates)
+                   .values_list('fingerprint', flat=True))
+    new_posts = [post for fingerprint, post in candidates.items() if fingerprint not in existing]
+    result.duplicates += len(candidates) - len(new_posts)
+
+    Post.objects.bulk_create(new_posts, ignore_conflicts=True)
+    # INSERT OR IGNORE drops any row breaking a constraint without a word and
+    # gives no ids back on SQLite: count what is there now, not what was sent.
+    if new_posts:
+        stored = set(Post.objects.filter(fingerprint__in=[post.fingerprint for post in new_posts])
+                     .values_list('fingerprint', flat=True))
+        result.skipped += len(new_posts) - len(stored)
+        new_posts = [post for post in new_posts if post.fingerprint in stored]
+    result.inserted = len(new_posts)
+    if new_posts:
+        # bulk_create sends no post_save signals
+        count_new_posts(new_posts)
+        transaction.on_commit(invalidate_posts)
+    return result
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_mediastack_posts(r_jsons: Iterable[dict],
+                            batch_size: int = IMPORT_BATCH_SIZE) -> List[BatchResult]:
+    return [import_mediastack_batch(batch) for batch in chunked(r_jsons, batch_size)]
+
+
+def get_mediastack_params(sources: List[str] = None, date: datetime.datetime = None,
+                          languages: List[str] = None, keywords: List[str] = None,
+                          categories: List[str] = None, countries=None,
+                          access_key=MEDIASTACK_ACCESS_KEY):
     if countries is None:
         countries = ['us']
     params = {}
@@ -73,12 +246,26 @@ def get_mediastack_posts(sources: List[str] = None, date: datetime.datetime = No
     if countries:
         params['countries'] = ','.join(countries)
     params['access_key'] = access_key
+    return params
+
 
-    url = f'http://api.mediastack.com/v1/news'
-    response = requests.get(url, params=params)
+def fetch_mediastack_news(**kwargs) -> List[dict]:
+    # The news change from one call to the next and are read once: never cache them.
+    response = get_client().get(MEDIASTACK_URL, params=get_mediastack_params(**kwargs),
+                                cache=False)
     json_returned = response.json()
+    return json_returned.get('data', [])
+
+
+def get_mediastack_posts(sources: List[str] = None, date: datetime.datetime = None,
+                         languages: List[str] = None, keywords: List[str] = None,
+                         categories: List[str] = None, countries=None,
+                         access_key=MEDIASTACK_ACCESS_KEY):
+    news = fetch_mediastack_news(sources=sources, date=date, languages=languages,
+                                 keywords=keywords, categories=categories,
+                                 countries=countries, access_key=access_key)
     posts = []
-    for response_json_post in json_returned.get('data', []):
+    for response_json_post in news:
         post = serialize_from_mediastack(response_json_post)
         posts.append(post)
     return posts
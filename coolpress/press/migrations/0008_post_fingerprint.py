@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0007_post_publish_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
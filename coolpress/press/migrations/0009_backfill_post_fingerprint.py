@@ -0,0 +1,52 @@
+import hashlib
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+# Copies of press.models.normalize_text and post_fingerprint as they were
+# when the fingerprints were introduced.
+def normalize_text(text):
+    return ' '.join((text or '').lower().split())
+
+
+def post_fingerprint(title, body, image_link, category_id):
+    content = '\x1f'.join([normalize_text(title), normalize_text(body),
+                           (image_link or '').strip(), str(category_id)])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Post = apps.get_model('press', 'Post')
+    seen = set()
+    pending = []
+    rows = Post.objects.filter(fingerprint__isnull=True).order_by('id') \
+        .values_list('id', 'title', 'body', 'image_link', 'category_id')
+    for post_id, title, body, image_link, category_id in rows.iterator(chunk_size=BATCH_SIZE):
+        fingerprint = post_fingerprint(title, body, image_link, category_id)
+        # Duplicated content keeps the fingerprint on its oldest row only.
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        pending.append(Post(id=post_id, fingerprint=fingerprint))
+        if len(pending) >= BATCH_SIZE:
+            Post.objects.bulk_update(pending, ['fingerprint'])
+            pending = []
+    Post.objects.bulk_update(pending, ['fingerprint'])
+
+
+def clear_fingerprints(apps, schema_editor):
+    Post = apps.get_model('press', 'Post')
+    Post.objects.update(fingerprint=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0008_post_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_fingerprints, clear_fingerprints),
+    ]
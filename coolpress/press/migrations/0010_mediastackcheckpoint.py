@@ -0,0 +1,24 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0009_backfill_post_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediastackCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=400, unique=True)),
+                ('offset', models.IntegerField(default=0)),
+                ('last_published_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0010_mediastackcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentWordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='press.post')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='commentwordcount',
+            index=models.Index(fields=['post', '-count', 'word'], name='comment_word_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commentwordcount',
+            constraint=models.UniqueConstraint(fields=('post', 'word'), name='unique_comment_word_per_post'),
+        ),
+    ]
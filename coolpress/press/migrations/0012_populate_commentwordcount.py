@@ -0,0 +1,60 @@
+import json
+import os.path
+import re
+import string
+from collections import Counter
+from itertools import groupby
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+# A copy of press.stats_manager.count_words as it was when the word counts
+# were introduced.
+with open(os.path.join(os.path.dirname(__file__), os.pardir, 'stopwords.json')) as fr:
+    STOPWORDS = frozenset(json.load(fr))
+
+WORD_RE = re.compile(r"[^\W_]+(?:['’-][^\W_]+)*")
+WORD_JOINERS = "'’-"
+SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation + '“”‘«»–—…'
+                            if char not in WORD_JOINERS})
+
+
+def count_words(text):
+    tokens = Counter(text.lower().translate(SEPARATORS).split())
+    counts = Counter()
+    for token, count in tokens.items():
+        words = (token,) if token.isalnum() else WORD_RE.findall(token)
+        for word in words:
+            if word not in STOPWORDS and not word.isdigit():
+                counts[word] += count
+    return counts
+
+
+def populate_comment_word_counts(apps, schema_editor):
+    Comment = apps.get_model('press', 'Comment')
+    CommentWordCount = apps.get_model('press', 'CommentWordCount')
+    rows = Comment.objects.filter(status='PUBLISHED').order_by('post_id') \
+        .values_list('post_id', 'body').iterator(chunk_size=BATCH_SIZE)
+    pending = []
+    for post_id, post_rows in groupby(rows, key=lambda row: row[0]):
+        counts = Counter()
+        for _, body in post_rows:
+            counts.update(count_words(body))
+        pending.extend(CommentWordCount(post_id=post_id, word=word, count=count)
+                       for word, count in counts.items())
+        if len(pending) >= BATCH_SIZE:
+            CommentWordCount.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+            pending = []
+    CommentWordCount.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0011_commentwordcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_comment_word_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0012_populate_commentwordcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('SITE', 'Site'), ('CATEGORY', 'Category'), ('AUTHOR', 'Author')], max_length=16)),
+                ('scope_id', models.BigIntegerField(blank=True, null=True)),
+                ('word', models.CharField(max_length=200)),
+                ('count', models.IntegerField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wordstat',
+            index=models.Index(fields=['scope', 'scope_id', '-count', 'word'], name='word_stat_top_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+import math
+
+from django.db import migrations
+from django.utils import timezone
+
+# Copies of press.trending.apply_comment_to_score and the half lives of
+# press.models.TrendingWindow as they were when the scores were introduced.
+HALF_LIVES = {
+    '24h': 24 * 60 * 60,
+    '7d': 7 * 24 * 60 * 60,
+    '30d': 30 * 24 * 60 * 60,
+}
+WINDOWS = list(HALF_LIVES)
+MIN_SCORE = 1e-12
+
+
+def apply_comment_to_score(trending, created_at, weight):
+    half_life = HALF_LIVES[trending.window]
+    now = max(created_at, trending.decayed_at)
+    elapsed = (now - trending.decayed_at).total_seconds()
+    score = trending.score * 2 ** (-elapsed / half_life)
+    score += weight * 2 ** (-(now - created_at).total_seconds() / half_life)
+    trending.score = max(score, 0)
+    trending.rank = math.log2(max(trending.score, MIN_SCORE)) + now.timestamp() / half_life
+    trending.decayed_at = now
+    trending.comment_count = max(trending.comment_count + weight, 0)
+
+
+def populate_trending_scores(apps, schema_editor):
+    Comment = apps.get_model('press', 'Comment')
+    TrendingScore = apps.get_model('press', 'TrendingScore')
+    now = timezone.now()
+    scores = {}
+    comments = Comment.objects.order_by().values_list('post_id', 'creation_date')
+    for post_id, created_at in comments.iterator(chunk_size=1000):
+        for window in WINDOWS:
+            trending = scores.get((post_id, window))
+            if trending is None:
+                trending = TrendingScore(post_id=post_id, window=window, decayed_at=now)
+                scores[(post_id, window)] = trending
+            apply_comment_to_score(trending, created_at, 1)
+    TrendingScore.objects.bulk_create(scores.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0014_trendingscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_trending_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0015_populate_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRefreshJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=16)),
+                ('attempts', models.IntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cooluser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='press.cooluser')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='profilerefreshjob',
+            index=models.Index(fields=['status', 'run_after'], name='profile_refresh_due_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='profilerefreshjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('cooluser',), name='unique_pending_profile_refresh'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE press_post_fts USING fts5(
+        title, body,
+        content='press_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER press_post_fts_insert AFTER INSERT ON press_post BEGIN
+        INSERT INTO press_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER press_post_fts_delete AFTER DELETE ON press_post BEGIN
+        INSERT INTO press_post_fts(press_post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER press_post_fts_update AFTER UPDATE OF title, body ON press_post BEGIN
+        INSERT INTO press_post_fts(press_post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO press_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    "INSERT INTO press_post_fts(press_post_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS press_post_fts_update',
+    'DROP TRIGGER IF EXISTS press_post_fts_delete',
+    'DROP TRIGGER IF EXISTS press_post_fts_insert',
+    'DROP TABLE IF EXISTS press_post_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0017_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH_INDEX, DROP_SEARCH_INDEX),
+    ]
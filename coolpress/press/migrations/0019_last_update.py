@@ -0,0 +1,23 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0018_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='cooluser',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
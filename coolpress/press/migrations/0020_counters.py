@@ -0,0 +1,66 @@
+# Generated by Django 3.2.7 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+# The triggers of 0018_post_search_index, as they were then.
+SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER press_post_fts_insert AFTER INSERT ON press_post BEGIN
+        INSERT INTO press_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER press_post_fts_delete AFTER DELETE ON press_post BEGIN
+        INSERT INTO press_post_fts(press_post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER press_post_fts_update AFTER UPDATE OF title, body ON press_post BEGIN
+        INSERT INTO press_post_fts(press_post_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO press_post_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+DROP_SEARCH_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS press_post_fts_update',
+    'DROP TRIGGER IF EXISTS press_post_fts_delete',
+    'DROP TRIGGER IF EXISTS press_post_fts_insert',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0019_last_update'),
+    ]
+
+    operations = [
+        # Runs last when unapplied: removing the post columns remakes press_post
+        # again, and 0018 still counts as applied, so its triggers come back.
+        migrations.RunSQL(migrations.RunSQL.noop, SEARCH_TRIGGERS),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='cooluser',
+            name='post_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='published_comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # Adding the post columns remade press_post without its search triggers.
+        migrations.RunSQL(SEARCH_TRIGGERS, DROP_SEARCH_TRIGGERS),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Copies of press.counters.counter_subquery and reconcile_counters as they were
+# when the counters were introduced.
+COUNTER_CHUNK_SIZE = 400
+
+
+def counter_subquery(model, field, **filters):
+    counts = model.objects.filter(**{field: OuterRef('pk')}, **filters).order_by() \
+        .values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def populate_counters(apps, schema_editor):
+    Category = apps.get_model('press', 'Category')
+    CoolUser = apps.get_model('press', 'CoolUser')
+    Post = apps.get_model('press', 'Post')
+    Comment = apps.get_model('press', 'Comment')
+    definitions = [
+        (Category, 'post_count', counter_subquery(Post, 'category')),
+        (CoolUser, 'post_count', counter_subquery(Post, 'author')),
+        (Post, 'comment_count', counter_subquery(Comment, 'post')),
+        (Post, 'published_comment_count', counter_subquery(Comment, 'post', status='PUBLISHED')),
+    ]
+    for model, field, expression in definitions:
+        drifted = list(model.objects.annotate(actual=expression)
+                       .exclude(**{field: F('actual')})
+                       .values_list('pk', flat=True))
+        for start in range(0, len(drifted), COUNTER_CHUNK_SIZE):
+            model.objects.filter(pk__in=drifted[start:start + COUNTER_CHUNK_SIZE]) \
+                .update(**{field: expression})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0020_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
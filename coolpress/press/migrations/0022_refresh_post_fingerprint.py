@@ -0,0 +1,54 @@
+import hashlib
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+# Copies of press.models.normalize_text and post_fingerprint as they were
+# when Post.save() started keeping the fingerprint up to date.
+def normalize_text(text):
+    return ' '.join((text or '').lower().split())
+
+
+def post_fingerprint(title, body, image_link, category_id):
+    content = '\x1f'.join([normalize_text(title), normalize_text(body),
+                           (image_link or '').strip(), str(category_id)])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def refresh_fingerprints(apps, schema_editor):
+    """
+    Fingerprint the posts written outside the importer and the ones edited
+    since; duplicated content keeps the fingerprint on its oldest row only.
+    """
+    Post = apps.get_model('press', 'Post')
+    seen = set()
+    changed = []
+    rows = Post.objects.order_by('id') \
+        .values_list('id', 'title', 'body', 'image_link', 'category_id', 'fingerprint')
+    for post_id, title, body, image_link, category_id, stored in rows.iterator(BATCH_SIZE):
+        fingerprint = post_fingerprint(title, body, image_link, category_id)
+        if fingerprint in seen:
+            fingerprint = None
+        else:
+            seen.add(fingerprint)
+        if fingerprint != stored:
+            changed.append(Post(id=post_id, fingerprint=fingerprint))
+    # Cleared first, so no new value collides with a stale one not yet replaced.
+    changed_ids = [post.id for post in changed]
+    for start in range(0, len(changed_ids), BATCH_SIZE):
+        Post.objects.filter(id__in=changed_ids[start:start + BATCH_SIZE]).update(fingerprint=None)
+    Post.objects.bulk_update([post for post in changed if post.fingerprint], ['fingerprint'],
+                             batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('press', '0021_populate_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_fingerprints, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,10 @@
-from datetime import datetime
+import hashlib
 from typing import Optional
 
-from bs4 import BeautifulSoup
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.db import models
-from libgravatar import Gravatar
-
-import requests
+from django.utils import timezone
 
 
 class CoolUser(models.Model):
@@ -17,60 +15,17 @@ class CoolUser(models.Model):
     github_repos = models.IntegerField(null=True, blank=True)
     github_stars = models.IntegerField(null=True, blank=True)
     last_github_check = models.DateTimeField(null=True, blank=True)
+    last_update = models.DateTimeField(auto_now=True)
+    post_count = models.IntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         super(CoolUser, self).save(*args, **kwargs)
-
-        if self.user.email is not None:
-            gravatar_link = get_gravatar_image(self.user.email)
-            self.gravatar_link = gravatar_link
-            if self.last_github_check.date() != datetime.today().date():
-                self.last_github_check = datetime.now()
-                self.github_repos = self.get_github_repos()
-                self.github_stars = self.get_github_stars()
-
-        self.gravatar_updated_at = datetime.now()
-
-    def get_github_url(self) -> Optional[str]:
-        if self.github_profile:
-            url = f'https://github.com/{self.github_profile}'
-            response = requests.get(url)
-            if response.status_code == 200:
-                return url
-
-    def get_github_repos(self) -> Optional[int]:
-        url = self.get_github_url()
-        if url:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            css_selector = '.Counter'
-            repositories_info = soup.select_one(css_selector)
-            repos_text = repositories_info.text
-            return int(repos_text)
-
-    def get_github_stars(self) -> Optional[int]:
-        url = self.get_github_url()
-        if url:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            css_selector = 'div.Layout-main > div > nav > a:nth-child(5) > span'
-            stars_info = soup.select(css_selector)
-            stars_text = stars_info.text
-            return int(stars_text)
+        ProfileRefreshJob.enqueue(self)
 
     def __str__(self):
         return f"{self.user.username}"
 
 
-def get_gravatar_image(email):
-    g = Gravatar(email)
-    profile_url = g.get_profile()
-    res = requests.get(profile_url)
-    if res.status_code == 200:
-        return g.get_image()
-    return None
-
-
 class Category(models.Model):
     class Meta:
         verbose_name_plural = "categories"
@@ -79,6 +34,8 @@ class Category(models.Model):
     slug = models.SlugField()
 
     created_by = models.ForeignKey(CoolUser, on_delete=models.CASCADE, null=True)
+    last_update = models.DateTimeField(auto_now=True)
+    post_count = models.IntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.label}"
@@ -89,6 +46,16 @@ class PostStatus:
     PUBLISHED = "PUBLISHED"
 
 
+def normalize_text(text: Optional[str]) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def post_fingerprint(title, body, image_link, category_id) -> str:
+    content = '\x1f'.join([normalize_text(title), normalize_text(body),
+                           (image_link or '').strip(), str(category_id)])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
 class Post(models.Model):
     title = models.CharField(max_length=400)
     body = models.TextField(null=True)
@@ -105,11 +72,51 @@ class Post(models.Model):
     publish_date = models.DateTimeField(null=True, blank=True)
     last_update = models.DateTimeField(auto_now=True)
 
+    fingerprint = models.CharField(max_length=64, unique=True, null=True, blank=True,
+                                   editable=False)
+
+    comment_count = models.IntegerField(default=0, editable=False)
+    published_comment_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        # One per hot list: the filters lead, the keyset ordering follows.
+        indexes = [
+            models.Index(fields=['status', 'creation_date', 'id'], name='post_status_created_idx'),
+            models.Index(fields=['status', 'last_update', 'id'], name='post_status_updated_idx'),
+            models.Index(fields=['category', 'status', 'creation_date', 'id'],
+                         name='post_category_created_idx'),
+            models.Index(fields=['author', 'status', 'last_update', 'id'],
+                         name='post_author_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def compute_fingerprint(self) -> str:
+        return post_fingerprint(self.title, self.body, self.image_link, self.category_id)
+
+    def same_content_posts(self) -> models.QuerySet:
+        return Post.objects.filter(fingerprint=self.compute_fingerprint()).exclude(pk=self.pk)
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # The fingerprint is not a form field, so forms would not check it.
+        if self.same_content_posts().exists():
+            raise ValidationError('A post with the same title, body, image and category '
+                                  'already exists.')
+
+    def save(self, *args, **kwargs):
+        # Kept in step with the content on every save, so imports dedupe
+        # against posts written anywhere and edits never leave it stale.
+        self.fingerprint = self.compute_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'fingerprint'}
+        super().save(*args, **kwargs)
+
     def __eq__(self, other):
-        excluding_fields = {'creation_date', 'last_update', 'id'}
+        excluding_fields = {'creation_date', 'last_update', 'id', 'fingerprint', 'comment_count',
+                            'published_comment_count'}
         comparison_field = [key for key in self.__dict__.keys() if
                             not key.startswith('_') and key not in excluding_fields]
         for field in comparison_field:
@@ -117,6 +124,9 @@ class Post(models.Model):
                 return False
         return True
 
+    # Defining __eq__ drops the inherited hash, which the deletion collector needs.
+    __hash__ = models.Model.__hash__
+
 
 class CommentStatus:
     PUBLISHED = 'PUBLISHED'
@@ -137,5 +147,144 @@ class Comment(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
     last_update = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'status', 'creation_date'],
+                         name='comment_post_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.body[:10]} - from: {self.author.user.username}'
+
+
+class MediastackCheckpoint(models.Model):
+    query = models.CharField(max_length=400, unique=True)
+    offset = models.IntegerField(default=0)
+    last_published_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.query} @ {self.offset}'
+
+
+class CommentWordCount(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    word = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'word'], name='unique_comment_word_per_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-count', 'word'], name='comment_word_top_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.word}: {self.count}'
+
+
+class WordStatScope:
+    SITE = 'SITE'
+    CATEGORY = 'CATEGORY'
+    AUTHOR = 'AUTHOR'
+
+
+class WordStat(models.Model):
+    scope = models.CharField(max_length=16,
+                             choices=[(WordStatScope.SITE, 'Site'),
+                                      (WordStatScope.CATEGORY, 'Category'),
+                                      (WordStatScope.AUTHOR, 'Author')])
+    scope_id = models.BigIntegerField(null=True, blank=True)
+    word = models.CharField(max_length=200)
+    count = models.IntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['scope', 'scope_id', '-count', 'word'], name='word_stat_top_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.scope_id or ""} {self.word}: {self.count}'
+
+
+class TrendingWindow:
+    DAY = '24h'
+    WEEK = '7d'
+    MONTH = '30d'
+
+    HALF_LIVES = {
+        DAY: 24 * 60 * 60,
+        WEEK: 7 * 24 * 60 * 60,
+        MONTH: 30 * 24 * 60 * 60,
+    }
+
+
+class TrendingScore(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    window = models.CharField(max_length=8,
+                              choices=[(TrendingWindow.DAY, 'Last 24 hours'),
+                                       (TrendingWindow.WEEK, 'Last 7 days'),
+                                       (TrendingWindow.MONTH, 'Last 30 days')])
+    # score is the decayed number of comments as of decayed_at, while rank is
+    # log2(score) + decayed_at / half_life: it orders posts the same way at any
+    # later time, so ranking never needs to re-decay every row first.
+    score = models.FloatField(default=0)
+    rank = models.FloatField(default=0)
+    comment_count = models.IntegerField(default=0)
+    decayed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'window'], name='unique_trending_window_per_post'),
+        ]
+        indexes = [
+            models.Index(fields=['window', '-rank'], name='trending_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} {self.window}: {self.score:.2f}'
+
+
+class ProfileRefreshStatus:
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+
+class ProfileRefreshJob(models.Model):
+    cooluser = models.ForeignKey(CoolUser, on_delete=models.CASCADE)
+    status = models.CharField(max_length=16,
+                              choices=[(ProfileRefreshStatus.PENDING, 'Pending'),
+                                       (ProfileRefreshStatus.RUNNING, 'Running'),
+                                       (ProfileRefreshStatus.DONE, 'Done'),
+                                       (ProfileRefreshStatus.FAILED, 'Failed')],
+                              default=ProfileRefreshStatus.PENDING)
+    attempts = models.IntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cooluser'],
+                                    condition=models.Q(status=ProfileRefreshStatus.PENDING),
+                                    name='unique_pending_profile_refresh'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='profile_refresh_due_idx'),
+        ]
+
+    @classmethod
+    def enqueue(cls, cooluser: CoolUser):
+        # A single INSERT OR IGNORE: the partial unique constraint keeps at
+        # most one pending job per user.
+        cls.objects.bulk_create([cls(cooluser=cooluser)], ignore_conflicts=True)
+
     def __str__(self):
-        return f'{self.body[:10]} - from: {self.author.user.username}'
\ No newline at end of file
+        return f'{self.cooluser_id} {self.status}'
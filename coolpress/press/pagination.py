@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from django.db.models import QuerySet
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE = 20
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class Cursor:
+    value: datetime
+    id: int
+    reverse: bool = False
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps([cursor.value.isoformat(), cursor.id, int(cursor.reverse)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(encoded: str) -> Cursor:
+    try:
+        padded = encoded + '=' * (-len(encoded) % 4)
+        value, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(value), int(pk), bool(reverse))
+    except (binascii.Error, TypeError, ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {encoded!r}') from e
+
+
+@dataclass
+class KeysetPage:
+    object_list: List
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def cursor_for(obj, field: str, reverse: bool = False) -> str:
+    if isinstance(obj, dict):
+        # A values() row
+        return encode_cursor(Cursor(obj[field], obj['pk'], reverse))
+    return encode_cursor(Cursor(getattr(obj, field), obj.pk, reverse))
+
+
+def keyset_queryset(queryset: QuerySet, field: str, cursor: Optional[Cursor]) -> QuerySet:
+    """
+    ``queryset`` in descending (``field``, id) order, restricted to the rows
+    after ``cursor`` (before it for a reverse cursor).
+
+    The bound is written as ``field <= value AND NOT (field = value AND id >= pk)``
+    rather than an OR so that SQLite seeks the (…, field, id) index to ``value``.
+    """
+    if cursor is None:
+        return queryset.order_by(f'-{field}', '-pk')
+    if not cursor.reverse:
+        return queryset.filter(**{f'{field}__lte': cursor.value}) \
+            .exclude(**{field: cursor.value, 'pk__gte': cursor.id}) \
+            .order_by(f'-{field}', '-pk')
+    return queryset.filter(**{f'{field}__gte': cursor.value}) \
+        .exclude(**{field: cursor.value, 'pk__lte': cursor.id}) \
+        .order_by(field, 'pk')
+
+
+def keyset_page(queryset: QuerySet, field: str, encoded_cursor: Optional[str],
+                page_size: int = PAGE_SIZE) -> KeysetPage:
+    """
+    One page of ``queryset`` in descending (``field``, id) order, starting
+    after ``encoded_cursor``. The page is found with a range condition on the
+    (field, id) index instead of an OFFSET, so it costs the same at any depth
+    and rows inserted meanwhile never shift the following pages.
+    """
+    cursor = decode_cursor(encoded_cursor) if encoded_cursor else None
+    ordered = keyset_queryset(queryset, field, cursor)
+
+    rows = list(ordered[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if cursor is not None and cursor.reverse:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, cursor is not None
+
+    page = KeysetPage(rows)
+    if rows and has_next:
+        page.next_cursor = cursor_for(rows[-1], field)
+    if rows and has_previous:
+        page.previous_cursor = cursor_for(rows[0], field, reverse=True)
+    return page
+
+
+class KeysetPaginationMixin:
+    """
+    Replaces the OFFSET pagination of a ListView. The template gets the usual
+    ``page_obj``/``is_paginated`` with ``next_cursor`` and ``previous_cursor``
+    in place of page numbers; there is no paginator since nothing is counted.
+    """
+    cursor_field = 'last_update'
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            page = keyset_page(queryset, self.cursor_field,
+                               self.request.GET.get(CURSOR_PARAM), page_size)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return None, page, page.object_list, page.has_next or page.has_previous
+
+
+class KeysetPagination(BasePagination):
+    """DRF flavour of the keyset pagination: ``{next, previous, results}``."""
+    cursor_field = 'creation_date'
+    page_size = PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = keyset_page(queryset, self.cursor_field,
+                                    request.query_params.get(CURSOR_PARAM), self.page_size)
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return self.page.object_list
+
+    def get_link(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), CURSOR_PARAM, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_link(self.page.next_cursor),
+                         'previous': self.get_link(self.page.previous_cursor),
+                         'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
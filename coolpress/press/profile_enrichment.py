@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from django.db import transaction
+from django.utils import timezone
+from libgravatar import Gravatar
+import requests
+
+from press.http_client import get_client
+from press.models import CoolUser, ProfileRefreshJob, ProfileRefreshStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = (3.05, 10)
+HOST_MIN_INTERVAL = 0.5
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = timedelta(minutes=1)
+GITHUB_CHECK_INTERVAL = timedelta(days=1)
+STUCK_AFTER = timedelta(minutes=15)
+
+GITHUB_REPOS_SELECTOR = '.Counter'
+GITHUB_STARS_SELECTOR = 'div.Layout-main > div > nav > a:nth-child(5) > span'
+
+
+class RateLimiter:
+    """
+    Spaces the requests made to each host by at least ``min_interval`` seconds,
+    whatever the number of threads sharing the limiter.
+    """
+
+    def __init__(self, min_interval: float = HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self.next_slot = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def wait(self, host: str):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot[host])
+            self.next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class ProfileSnapshot:
+    cooluser_id: int
+    email: str
+    github_profile: Optional[str]
+    check_github: bool
+
+
+@dataclass
+class ProfileData:
+    gravatar_link: Optional[str]
+    github_checked: bool = False
+    github_repos: Optional[int] = None
+    github_stars: Optional[int] = None
+
+
+def http_get(url: str, limiter: RateLimiter) -> requests.Response:
+    limiter.wait(urlparse(url).hostname)
+    return get_client().get(url, timeout=DEFAULT_TIMEOUT)
+
+
+def get_gravatar_image(email: str, limiter: RateLimiter) -> Optional[str]:
+    g = Gravatar(email)
+    response = http_get(g.get_profile(), limiter)
+    if response.status_code == 200:
+        return g.get_image()
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+
+def get_github_url(github_profile: str) -> str:
+    if github_profile.startswith('http'):
+        return github_profile
+    return f'https://github.com/{github_profile}'
+
+
+def parse_counter(soup: BeautifulSoup, selector: str) -> Optional[int]:
+    element = soup.select_one(selector)
+    if element is None:
+        return None
+    try:
+        return int(element.text.strip().replace(',', ''))
+    except ValueError:
+        return None
+
+
+def get_github_stats(github_profile: str, limiter: RateLimiter) -> ProfileData:
+    """Fetch the GitHub profile page once and read both counters from it."""
+    response = http_get(get_github_url(github_profile), limiter)
+    if response.status_code == 404:
+        return ProfileData(gravatar_link=None, github_checked=True)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.content, 'html.parser')
+    return ProfileData(gravatar_link=None, github_checked=True,
+                       github_repos=parse_counter(soup, GITHUB_REPOS_SELECTOR),
+                       github_stars=parse_counter(soup, GITHUB_STARS_SELECTOR))
+
+
+def fetch_profile(snapshot: ProfileSnapshot, limiter: RateLimiter) -> ProfileData:
+    data = ProfileData(gravatar_link=None)
+    if snapshot.email:
+        data.gravatar_link = get_gravatar_image(snapshot.email, limiter)
+    if snapshot.check_github and snapshot.github_profile:
+        github = get_github_stats(snapshot.github_profile, limiter)
+        data.github_checked = True
+        data.github_repos = github.github_repos
+        data.github_stars = github.github_stars
+    return data
+
+
+def get_snapshot(cooluser: CoolUser, now) -> ProfileSnapshot:
+    last_check = cooluser.last_github_check
+    check_github = last_check is None or now - last_check >= GITHUB_CHECK_INTERVAL
+    return ProfileSnapshot(cooluser_id=cooluser.id,
+                           email=cooluser.user.email,
+                           github_profile=cooluser.github_profile,
+                           check_github=check_github)
+
+
+def enqueue_stale_profiles(older_than: timedelta) -> int:
+    stale = CoolUser.objects.filter(gravatar_updated_at__isnull=True) | \
+        CoolUser.objects.filter(gravatar_updated_at__lt=timezone.now() - older_than)
+    jobs = [ProfileRefreshJob(cooluser_id=cooluser_id)
+            for cooluser_id in stale.values_list('id', flat=True)]
+    ProfileRefreshJob.objects.bulk_create(jobs, ignore_conflicts=True)
+    return len(jobs)
+
+
+def release_stuck_jobs(stuck_after: timedelta = STUCK_AFTER) -> int:
+    """Jobs left running by a dead worker are failed and queued again."""
+    stuck = ProfileRefreshJob.objects.filter(status=ProfileRefreshStatus.RUNNING,
+                                             updated_at__lt=timezone.now() - stuck_after)
+    cooluser_ids = list(stuck.values_list('cooluser_id', flat=True))
+    stuck.update(status=ProfileRefreshStatus.FAILED, last_error='worker lost',
+                 updated_at=timezone.now())
+    ProfileRefreshJob.objects.bulk_create([ProfileRefreshJob(cooluser_id=cooluser_id)
+                                           for cooluser_id in cooluser_ids],
+                                          ignore_conflicts=True)
+    return len(cooluser_ids)
+
+
+@transaction.atomic
+def claim_jobs(batch_size: int = DEFAULT_BATCH_SIZE) -> List[ProfileRefreshJob]:
+    now = timezone.now()
+    due = ProfileRefreshJob.objects.select_for_update().filter(
+        status=ProfileRefreshStatus.PENDING, run_after__lte=now).order_by('run_after', 'id')
+    job_ids = list(due.values_list('id', flat=True)[:batch_size])
+    ProfileRefreshJob.objects.filter(id__in=job_ids, status=ProfileRefreshStatus.PENDING) \
+        .update(status=ProfileRefreshStatus.RUNNING, updated_at=now)
+    return list(ProfileRefreshJob.objects.filter(id__in=job_ids)
+                .select_related('cooluser__user').order_by('run_after', 'id'))
+
+
+def complete_job(job: ProfileRefreshJob, data: ProfileData):
+    now = timezone.now()
+    fields = {'gravatar_link': data.gravatar_link, 'gravatar_updated_at': now,
+              'last_update': now}
+    if data.github_checked:
+        fields.update(github_repos=data.github_repos, github_stars=data.github_stars,
+                      last_github_check=now)
+    # update() rather than save(): saving would enqueue yet another refresh.
+    CoolUser.objects.filter(id=job.cooluser_id).update(**fields)
+    ProfileRefreshJob.objects.filter(id=job.id).update(status=ProfileRefreshStatus.DONE,
+                                                       last_error='', updated_at=now)
+
+
+def fail_job(job: ProfileRefreshJob, error: str, max_attempts: int = MAX_ATTEMPTS,
+             backoff: timedelta = RETRY_BACKOFF):
+    """
+    Retry the job later with an exponential backoff, up to ``max_attempts``.
+    A job no longer running, e.g. failed meanwhile by ``release_stuck_jobs``,
+    is left as it is.
+    """
+    now = timezone.now()
+    attempts = job.attempts + 1
+    fields = {'attempts': attempts, 'last_error': error, 'updated_at': now}
+    # A save of the profile meanwhile already queued a fresh job, which
+    # replaces the retry.
+    superseded = ProfileRefreshJob.objects.filter(cooluser_id=job.cooluser_id,
+                                                  status=ProfileRefreshStatus.PENDING).exists()
+    if attempts >= max_attempts or superseded:
+        fields['status'] = ProfileRefreshStatus.FAILED
+    else:
+        fields.update(status=ProfileRefreshStatus.PENDING,
+                      run_after=now + backoff * 2 ** (attempts - 1))
+    ProfileRefreshJob.objects.filter(id=job.id, status=ProfileRefreshStatus.RUNNING) \
+        .update(**fields)
+
+
+@dataclass
+class RefreshSummary:
+    done: int = 0
+    failed: int = 0
+
+
+def process_jobs(batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                 limiter: Optional[RateLimiter] = None, max_attempts: int = MAX_ATTEMPTS,
+                 backoff: timedelta = RETRY_BACKOFF,
+                 fetch: Callable[[ProfileSnapshot, RateLimiter], ProfileData] = fetch_profile
+                 ) -> RefreshSummary:
+    """
+    Claim one batch of due jobs and refresh their profiles. Only the HTTP calls
+    run on the thread pool; the results are written from the calling thread.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+    limiter = limiter or RateLimiter()
+    summary = RefreshSummary()
+    jobs = claim_jobs(batch_size)
+    if not jobs:
+        return summary
+    now = timezone.now()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(fetch, get_snapshot(job.cooluser, now), limiter): job
+                   for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                logger.warning('Refreshing profile %s failed: %s', job.cooluser_id, e)
+                fail_job(job, str(e) or e.__class__.__name__, max_attempts, backoff)
+                summary.failed += 1
+            else:
+                complete_job(job, data)
+                summary.done += 1
+    return summary
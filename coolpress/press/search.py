@@ -0,0 +1,112 @@
+import re
+from dataclasses import dataclass
+from typing import List
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe, SafeString
+
+from press.models import Post, PostStatus
+
+SEARCH_TABLE = 'press_post_fts'
+PAGE_SIZE = 20
+SNIPPET_TOKENS = 24
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+TERM_RE = re.compile(r'\w+')
+# Control characters cannot appear in the indexed text, so highlight() can
+# mark matches with them and the text is escaped before they become <mark>.
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+# SEARCH_TABLE is kept in sync by triggers so that bulk inserts and queryset
+# updates are indexed too; the migrations own their SQL. SQLite drops the
+# triggers whenever a migration remakes the press_post table (e.g. to add a
+# column): such migrations must create them again, as 0020_counters does.
+
+SEARCH_SQL = f"""
+    SELECT {SEARCH_TABLE}.rowid,
+           highlight({SEARCH_TABLE}, 0, %s, %s),
+           snippet({SEARCH_TABLE}, 1, %s, %s, '…', %s),
+           bm25({SEARCH_TABLE}, %s, %s) AS rank
+    FROM {SEARCH_TABLE}
+    JOIN press_post ON press_post.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH %s AND press_post.status = %s
+    ORDER BY rank, {SEARCH_TABLE}.rowid
+    LIMIT %s OFFSET %s
+"""
+
+
+@dataclass
+class SearchResult:
+    post: Post
+    title: SafeString
+    snippet: SafeString
+    rank: float
+
+
+@dataclass
+class SearchPage:
+    results: List[SearchResult]
+    number: int
+    has_next: bool
+
+    @property
+    def has_previous(self) -> bool:
+        return self.number > 1
+
+    @property
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    @property
+    def previous_page_number(self) -> int:
+        return self.number - 1
+
+
+def to_match_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word, the last one as a
+    prefix. Quoting each term keeps the FTS5 operators out of user input.
+    """
+    terms = TERM_RE.findall(text or '')
+    if not terms:
+        return ''
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def highlighted(text: str) -> SafeString:
+    return mark_safe(escape(text or '').replace(MATCH_START, '<mark>')
+                     .replace(MATCH_END, '</mark>'))
+
+
+def search_posts(text: str, page: int = 1, page_size: int = PAGE_SIZE) -> SearchPage:
+    """
+    Published posts matching ``text``, best first (bm25 with the title
+    weighing more than the body), with the matches highlighted.
+    """
+    page = max(page, 1)
+    query = to_match_query(text)
+    if not query:
+        return SearchPage([], page, False)
+
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [MATCH_START, MATCH_END, MATCH_START, MATCH_END,
+                                    SNIPPET_TOKENS, TITLE_WEIGHT, BODY_WEIGHT, query,
+                                    PostStatus.PUBLISHED, page_size + 1,
+                                    (page - 1) * page_size])
+        rows = cursor.fetchall()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    posts = Post.objects.select_related('category', 'author__user') \
+        .in_bulk([post_id for post_id, *_ in rows])
+    results = [SearchResult(posts[post_id], highlighted(title), highlighted(snippet), rank)
+               for post_id, title, snippet, rank in rows if post_id in posts]
+    return SearchPage(results, page, has_next)
+
+
+def rebuild_search_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
@@ -1,7 +1,8 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from press.models import Category, Post, CoolUser
+from press.models import Category, Post, CoolUser, WordStat, TrendingScore
+from press.trending import current_score
 
 
 class CategorySerializer(serializers.HyperlinkedModelSerializer):
@@ -17,6 +18,14 @@ class PostSerializer(serializers.ModelSerializer):
         read_only_fields = ('author',)
         ordering = ['-creation_date']
 
+    def validate(self, attrs):
+        content = {field: attrs.get(field, getattr(self.instance, field, None))
+                   for field in ['title', 'body', 'image_link', 'category']}
+        if Post(pk=getattr(self.instance, 'pk', None), **content).same_content_posts().exists():
+            raise serializers.ValidationError('A post with the same title, body, image and '
+                                              'category already exists.')
+        return attrs
+
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
@@ -29,4 +38,29 @@ class AuthorSerializer(serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = CoolUser
-        fields = ['id', 'user', 'github_profile']
\ No newline at end of file
+        fields = ['id', 'user', 'github_profile']
+
+
+class WordStatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WordStat
+        fields = ['scope', 'scope_id', 'word', 'count', 'computed_at']
+
+
+class TrendingScoreSerializer(serializers.ModelSerializer):
+    post = PostSerializer(read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrendingScore
+        fields = ['window', 'score', 'comment_count', 'post']
+
+    def get_score(self, obj):
+        return round(current_score(obj), 4)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    post = PostSerializer(read_only=True)
+    title = serializers.CharField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
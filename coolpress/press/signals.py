@@ -0,0 +1,122 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from press.caching import invalidate_comments, invalidate_posts
+from press.counters import count_comment, count_new_posts, move_post
+from press.models import Category, Comment, CoolUser, Post
+from press.stats_manager import comment_word_counts, apply_comment_word_delta
+from press.trending import update_post_trending
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_comment(sender, instance, raw=False, **kwargs):
+    instance._previous_words = None
+    instance._previous_state = None
+    if raw or instance.pk is None:
+        return
+    previous = Comment.objects.filter(pk=instance.pk).values('post_id', 'body', 'status').first()
+    if previous:
+        instance._previous_state = (previous['post_id'], previous['status'])
+        instance._previous_words = (previous['post_id'],
+                                    comment_word_counts(previous['body'], previous['status']))
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if created:
+        count_comment(instance.post_id, instance.status)
+    elif previous is not None and previous != (instance.post_id, instance.status):
+        count_comment(*previous, weight=-1)
+        count_comment(instance.post_id, instance.status)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_counters(sender, instance, **kwargs):
+    count_comment(instance.post_id, instance.status, weight=-1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw=False, **kwargs):
+    instance._previous_owners = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_owners = Post.objects.filter(pk=instance.pk) \
+        .values_list('category_id', 'author_id').first()
+
+
+@receiver(post_save, sender=Post)
+def update_post_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        count_new_posts([instance])
+    elif getattr(instance, '_previous_owners', None):
+        move_post(instance._previous_owners, instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_counters(sender, instance, **kwargs):
+    count_new_posts([instance], weight=-1)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_words(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = comment_word_counts(instance.body, instance.status)
+    previous_post_id, previous = getattr(instance, '_previous_words', None) or (None, Counter())
+    if previous_post_id is not None and previous_post_id != instance.post_id:
+        apply_comment_word_delta(previous_post_id, {word: -count for word, count in previous.items()})
+        previous = Counter()
+    current.subtract(previous)
+    apply_comment_word_delta(instance.post_id, current)
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_trending(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        update_post_trending(instance.post_id, instance.creation_date)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_words(sender, instance, **kwargs):
+    removed = comment_word_counts(instance.body, instance.status)
+    apply_comment_word_delta(instance.post_id, {word: -count for word, count in removed.items()})
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_trending(sender, instance, **kwargs):
+    update_post_trending(instance.post_id, instance.creation_date, weight=-1)
+
+
+@receiver(post_save, sender=User)
+def touch_cooluser(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # The authors API renders the username: its ETag follows CoolUser.last_update.
+    if created or raw or update_fields == frozenset(['last_login']):
+        return
+    CoolUser.objects.filter(user=instance).update(last_update=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_category(sender, instance, **kwargs):
+    invalidate_posts()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    invalidate_posts([instance.id])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_cached_comments(sender, instance, **kwargs):
+    invalidate_comments(instance.post_id)
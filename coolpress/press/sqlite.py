@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Stored in the database file rather than in the connection: read-only
+# connections (the replicas) cannot change them.
+FILE_PRAGMAS = {'journal_mode'}
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Run ``settings.SQLITE_PRAGMAS`` on every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    read_only = connection.alias in settings.DATABASE_REPLICAS
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        if read_only and name in FILE_PRAGMAS:
+            continue
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -1,43 +1,80 @@
+import heapq
 import json
 import os.path
-from collections import Counter
+import re
+import string
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import QuerySet, F, Case, When, Value
+from django.utils import timezone
 from wordcloud import WordCloud
 
-from press.models import Post, Comment
+from press.caching import GLOBAL_SCOPE, bump_versions
+from press.models import Post, Comment, CommentStatus, CommentWordCount, PostStatus, WordStat, \
+    WordStatScope
 
 with open(os.path.join(os.path.dirname(__file__), 'stopwords.json')) as fr:
-    file_stopwords = json.load(fr)
-    STOPWORDS = set(file_stopwords)
-    STOPWORDS.add('"')
-    STOPWORDS.add('.')
-    STOPWORDS.add('-')
+    STOPWORDS = frozenset(json.load(fr))
+
+# Words are runs of letters and digits, optionally joined by apostrophes or
+# hyphens ("don't", "vis-a-vis"), so surrounding punctuation never sticks to them.
+WORD_RE = re.compile(r"[^\W_]+(?:['’-][^\W_]+)*")
+WORD_JOINERS = "'’-"
+SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation + '“”‘«»–—…'
+                            if char not in WORD_JOINERS})
+
+WORD_DELTA_CHUNK_SIZE = 400
+
+
+def count_words(text: str) -> Counter:
+    # translate and split run in C over the whole text; the regex and the
+    # stopword filter then only look at each distinct token once.
+    tokens = Counter(text.lower().translate(SEPARATORS).split())
+    counts = Counter()
+    for token, count in tokens.items():
+        words = (token,) if token.isalnum() else WORD_RE.findall(token)
+        for word in words:
+            if word not in STOPWORDS and not word.isdigit():
+                counts[word] += count
+    return counts
+
+
+def word_cloud_from_frequencies(frequencies: Dict[str, int]) -> WordCloud:
+    return WordCloud(colormap='Greens').generate_from_frequencies(frequencies)
 
 
 class Stats:
     def __init__(self, text):
         self.text = text
+        self._counts: Optional[Counter] = None
+
+    @classmethod
+    def from_counts(cls, counts) -> 'Stats':
+        stats = cls('')
+        stats._counts = Counter(counts)
+        return stats
 
     def _analyze(self):
-        words = self.text.lower().replace(',', ' ').replace('\n', ' ').split(' ')
-        words = filter(lambda x: len(x) > 0 and not x.isdigit() and not x.isspace()
-                                 and x not in STOPWORDS, words)
-        return Counter(words)
+        if self._counts is None:
+            self._counts = count_words(self.text)
+        return self._counts
 
     def top(self, limit=1):
         if limit < 0:
             raise ValueError()
 
         analyzed = self._analyze()
-        results = sorted(analyzed.items(),
-                         key=lambda key_val: (-key_val[1], key_val[0]))
-        return results[:limit]
+        return heapq.nsmallest(limit, analyzed.items(),
+                               key=lambda key_val: (-key_val[1], key_val[0]))
 
     @property
     def word_cloud(self):
         top_words = self.top(20)
-        return WordCloud(colormap='Greens').generate_from_frequencies(dict(top_words))
+        return word_cloud_from_frequencies(dict(top_words))
 
 
 def posts_analyzer(qs_post: QuerySet[Post], limit=1):
@@ -55,4 +92,178 @@ def comment_analyzer(qs_post: QuerySet[Comment], limit=1):
     comment_bodies = ' '.join(comment_qs_bodies)
     full_msg = f'{comment_bodies}'
     st = Stats(full_msg)
-    return st
\ No newline at end of file
+    return st
+
+
+def comment_word_counts(body: str, status: str) -> Counter:
+    if status != CommentStatus.PUBLISHED:
+        return Counter()
+    return count_words(body)
+
+
+@transaction.atomic
+def apply_comment_word_delta(post_id: int, delta: Dict[str, int]):
+    delta = {word: count for word, count in delta.items() if count}
+    if not delta:
+        return
+    # Missing rows are created at zero and every row is then incremented in
+    # SQL, so concurrent comments adding the same new word never collide.
+    CommentWordCount.objects.bulk_create([CommentWordCount(post_id=post_id, word=word, count=0)
+                                          for word, count in delta.items() if count > 0],
+                                         ignore_conflicts=True)
+    post_words = CommentWordCount.objects.filter(post_id=post_id)
+    words = sorted(delta)
+    for start in range(0, len(words), WORD_DELTA_CHUNK_SIZE):
+        chunk = words[start:start + WORD_DELTA_CHUNK_SIZE]
+        increments = Case(*[When(word=word, then=Value(delta[word])) for word in chunk],
+                          default=Value(0))
+        post_words.filter(word__in=chunk).update(count=F('count') + increments)
+    if any(count < 0 for count in delta.values()):
+        post_words.filter(count__lte=0).delete()
+
+
+def top_comment_words(post: Post, limit: int = 10) -> List[Tuple[str, int]]:
+    return list(CommentWordCount.objects.filter(post=post)
+                .order_by('-count', 'word')
+                .values_list('word', 'count')[:limit])
+
+
+def iter_post_comment_word_counts(comments: QuerySet[Comment],
+                                  chunk_size: int = 2000) -> Iterable[Tuple[int, Counter]]:
+    rows = comments.filter(status=CommentStatus.PUBLISHED).order_by('post_id') \
+        .values_list('post_id', 'body').iterator(chunk_size=chunk_size)
+    for post_id, post_rows in groupby(rows, key=lambda row: row[0]):
+        counts = Counter()
+        for _, body in post_rows:
+            counts.update(count_words(body))
+        yield post_id, counts
+
+
+@transaction.atomic
+def rebuild_comment_word_counts(post_ids: Iterable[int] = None, batch_size: int = 2000) -> int:
+    comments = Comment.objects.all()
+    word_counts = CommentWordCount.objects.all()
+    if post_ids is not None:
+        comments = comments.filter(post_id__in=post_ids)
+        word_counts = word_counts.filter(post_id__in=post_ids)
+    word_counts.delete()
+
+    created = 0
+    pending = []
+    for post_id, counts in iter_post_comment_word_counts(comments):
+        pending.extend(CommentWordCount(post_id=post_id, word=word, count=count)
+                       for word, count in counts.items())
+        if len(pending) >= batch_size:
+            CommentWordCount.objects.bulk_create(pending, batch_size=batch_size)
+            created += len(pending)
+            pending = []
+    CommentWordCount.objects.bulk_create(pending, batch_size=batch_size)
+    return created + len(pending)
+
+
+class CorpusCounts:
+    def __init__(self):
+        self.site = Counter()
+        self.categories = defaultdict(Counter)
+        self.authors = defaultdict(Counter)
+
+    def add_post(self, title: str, body: Optional[str], category_id: int, author_id: int):
+        counts = count_words(f'{title} {body or ""}')
+        self.site.update(counts)
+        self.categories[category_id].update(counts)
+        self.authors[author_id].update(counts)
+
+    def merge(self, other: 'CorpusCounts'):
+        self.site.update(other.site)
+        for category_id, counts in other.categories.items():
+            self.categories[category_id].update(counts)
+        for author_id, counts in other.authors.items():
+            self.authors[author_id].update(counts)
+
+
+def count_posts_chunk(rows: List[Tuple[str, str, int, int]]) -> CorpusCounts:
+    corpus = CorpusCounts()
+    for title, body, category_id, author_id in rows:
+        corpus.add_post(title, body, category_id, author_id)
+    return corpus
+
+
+def iter_post_chunks(qs_post: QuerySet[Post], chunk_size: int) -> Iterable[list]:
+    rows = qs_post.order_by().values_list('title', 'body', 'category_id', 'author_id') \
+        .iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def compute_corpus_counts(qs_post: QuerySet[Post], chunk_size: int = 2000,
+                          workers: Optional[int] = None) -> CorpusCounts:
+    """
+    Map-reduce the word counts of the posts: chunks streamed from the database
+    are tokenized on a process pool and the partial counts merged as they
+    finish. At most two chunks per worker are in flight, so memory stays
+    bounded by the size of the merged counters, not by the corpus.
+    """
+    total = CorpusCounts()
+    chunks = iter_post_chunks(qs_post, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            total.merge(count_posts_chunk(chunk))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_in_flight = workers * 2
+        in_flight = set()
+        for chunk in chunks:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+            in_flight.add(executor.submit(count_posts_chunk, chunk))
+        for future in in_flight:
+            total.merge(future.result())
+    return total
+
+
+def top_items(counts: Counter, limit: int) -> List[Tuple[str, int]]:
+    return heapq.nsmallest(limit, counts.items(), key=lambda key_val: (-key_val[1], key_val[0]))
+
+
+@transaction.atomic
+def store_word_stats(corpus: CorpusCounts, limit: int = 50, batch_size: int = 2000) -> int:
+    computed_at = timezone.now()
+    scopes = [(WordStatScope.SITE, None, corpus.site)]
+    scopes.extend((WordStatScope.CATEGORY, category_id, counts)
+                  for category_id, counts in corpus.categories.items())
+    scopes.extend((WordStatScope.AUTHOR, author_id, counts)
+                  for author_id, counts in corpus.authors.items())
+    rows = [WordStat(scope=scope, scope_id=scope_id, word=word, count=count,
+                     computed_at=computed_at)
+            for scope, scope_id, counts in scopes
+            for word, count in top_items(counts, limit)]
+    WordStat.objects.all().delete()
+    WordStat.objects.bulk_create(rows, batch_size=batch_size)
+    # The home page lists the site top words.
+    bump_versions([GLOBAL_SCOPE])
+    return len(rows)
+
+
+def compute_word_stats(qs_post: QuerySet[Post] = None, limit: int = 50, chunk_size: int = 2000,
+                       workers: Optional[int] = None) -> int:
+    if qs_post is None:
+        qs_post = Post.objects.filter(status=PostStatus.PUBLISHED)
+    corpus = compute_corpus_counts(qs_post, chunk_size=chunk_size, workers=workers)
+    return store_word_stats(corpus, limit=limit)
+
+
+def top_words(scope: str = WordStatScope.SITE, scope_id: Optional[int] = None,
+              limit: int = 10) -> List[Tuple[str, int]]:
+    return list(WordStat.objects.filter(scope=scope, scope_id=scope_id)
+                .order_by('-count', 'word')
+                .values_list('word', 'count')[:limit])
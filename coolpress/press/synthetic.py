@@ -0,0 +1,202 @@
+import datetime
+import itertools
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from press.caching import invalidate_posts
+from press.counters import reconcile_counters
+from press.models import Category, Comment, CommentStatus, CoolUser, Post, PostStatus
+from press.stats_manager import STOPWORDS, compute_word_stats, rebuild_comment_word_counts
+from press.trending import rebuild_trending_scores
+
+SYNTHETIC_BATCH_SIZE = 2000
+SYNTHETIC_PREFIX = 'synthetic'
+DEFAULT_ZIPF = 1.1
+VOCABULARY_SIZE = 5000
+SYLLABLES = ['ba', 'ca', 'de', 'di', 'fo', 'ga', 'ka', 'la', 'li', 'lo', 'ma', 'me', 'mi', 'na',
+             'ne', 'no', 'pa', 'pe', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'ta', 'te', 'ti',
+             'to', 'va', 've', 'vi', 'za', 'tion', 'ing', 'er', 'al', 'ous', 'ment', 'ly']
+# Share of the words of a text that are stopwords, about what English prose has.
+STOPWORD_RATE = 0.4
+PUBLISHED_POST_RATE = 0.9
+PUBLISHED_COMMENT_RATE = 0.95
+PUBLISH_SPREAD_DAYS = 365
+
+
+@dataclass
+class SyntheticData:
+    users: List[int]
+    categories: List[int]
+    posts: List[int]
+    comments: int = 0
+
+
+def zipf_cum_weights(count: int, exponent: float) -> List[float]:
+    """Cumulative weights of ranks 1..count under Zipf's law, for ``random.choices``."""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class TextGenerator:
+    """
+    Text whose words follow Zipf's law, with stopwords, numbers and
+    punctuation mixed in, so the word statistics have what real comments
+    give them to do.
+    """
+
+    def __init__(self, rng: random.Random, vocabulary_size: int = VOCABULARY_SIZE,
+                 exponent: float = DEFAULT_ZIPF):
+        self.rng = rng
+        words = set()
+        while len(words) < vocabulary_size:
+            word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+            if word not in STOPWORDS:
+                words.add(word)
+        self.vocabulary = sorted(words)
+        rng.shuffle(self.vocabulary)
+        self.cum_weights = zipf_cum_weights(len(self.vocabulary), exponent)
+        self.stopwords = sorted(STOPWORDS)
+        self.stopword_weights = zipf_cum_weights(len(self.stopwords), exponent)
+
+    def words(self, count: int) -> List[str]:
+        stopwords = sum(self.rng.random() < STOPWORD_RATE for _ in range(count))
+        words = self.rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=count - stopwords)
+        words += self.rng.choices(self.stopwords, cum_weights=self.stopword_weights, k=stopwords)
+        self.rng.shuffle(words)
+        return words
+
+    def sentence(self) -> str:
+        words = self.words(self.rng.randint(5, 18))
+        if self.rng.random() < 0.1:
+            words.insert(self.rng.randrange(len(words)), str(self.rng.randint(2, 2024)))
+        if len(words) > 8 and self.rng.random() < 0.5:
+            words[self.rng.randrange(2, len(words) - 2)] += ','
+        return ' '.join(words).capitalize() + self.rng.choices('.!?', weights=[8, 1, 1])[0]
+
+    def text(self, min_sentences: int, max_sentences: int) -> str:
+        sentences = [self.sentence() for _ in range(self.rng.randint(min_sentences, max_sentences))]
+        return ' '.join(sentences)
+
+    def title(self) -> str:
+        return ' '.join(self.words(self.rng.randint(3, 8))).capitalize()
+
+
+def ids_after(model, last_id: int) -> List[int]:
+    return list(model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True))
+
+
+def last_id(model) -> int:
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def create_users(count: int, prefix: str = SYNTHETIC_PREFIX,
+                 batch_size: int = SYNTHETIC_BATCH_SIZE) -> List[int]:
+    """Create ``count`` users with their CoolUser, returns the CoolUser ids."""
+    start = User.objects.filter(username__startswith=f'{prefix}-user-').count()
+    users_from, coolusers_from = last_id(User), last_id(CoolUser)
+    User.objects.bulk_create([User(username=f'{prefix}-user-{number}', first_name='Synthetic',
+                                   last_name=f'User {number}')
+                              for number in range(start, start + count)], batch_size=batch_size)
+    CoolUser.objects.bulk_create([CoolUser(user_id=user_id)
+                                  for user_id in ids_after(User, users_from)],
+                                 batch_size=batch_size)
+    return ids_after(CoolUser, coolusers_from)
+
+
+def create_categories(count: int, text: TextGenerator, author_ids: Sequence[int]) -> List[int]:
+    since = last_id(Category)
+    labels = [f'{text.title()} {since + number}' for number in range(1, count + 1)]
+    Category.objects.bulk_create([Category(label=label, slug=slugify(label),
+                                           created_by_id=text.rng.choice(author_ids))
+                                  for label in labels])
+    return ids_after(Category, since)
+
+
+def create_posts(count: int, text: TextGenerator, category_ids: Sequence[int],
+                 author_ids: Sequence[int], batch_size: int = SYNTHETIC_BATCH_SIZE) -> List[int]:
+    rng = text.rng
+    since = last_id(Post)
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        posts = []
+        for number in range(since + start + 1, since + min(start + batch_size, count) + 1):
+            published = rng.random() < PUBLISHED_POST_RATE
+            post = Post(title=f'{text.title()} #{number}', body=text.text(3, 12),
+                        status=PostStatus.PUBLISHED if published else PostStatus.DRAFT,
+                        category_id=rng.choice(category_ids), author_id=rng.choice(author_ids),
+                        publish_date=now - datetime.timedelta(
+                            seconds=rng.randrange(PUBLISH_SPREAD_DAYS * 86400))
+                        if published else None)
+            post.fingerprint = post.compute_fingerprint()
+            posts.append(post)
+        Post.objects.bulk_create(posts)
+    return ids_after(Post, since)
+
+
+def create_comments(count: int, text: TextGenerator, post_ids: Sequence[int],
+                    author_ids: Sequence[int], exponent: Optional[float] = DEFAULT_ZIPF,
+                    batch_size: int = SYNTHETIC_BATCH_SIZE) -> int:
+    """
+    Spread ``count`` comments over the posts: the n-th most commented post,
+    in a random order of the posts, gets a share proportional to 1 / n ** exponent.
+    """
+    rng = text.rng
+    ranked = list(post_ids)
+    rng.shuffle(ranked)
+    cum_weights = zipf_cum_weights(len(ranked), exponent) if exponent else None
+    for start in range(0, count, batch_size):
+        targets = rng.choices(ranked, cum_weights=cum_weights, k=min(batch_size, count - start))
+        Comment.objects.bulk_create([
+            Comment(post_id=post_id, author_id=rng.choice(author_ids), body=text.text(1, 4),
+                    votes=rng.randint(0, 50),
+                    status=CommentStatus.PUBLISHED if rng.random() < PUBLISHED_COMMENT_RATE
+                    else CommentStatus.NON_PUBLISHED)
+            for post_id in targets])
+    return count
+
+
+def refresh_derived_data():
+    """
+    Bring back in line what the signals keep up to date, which ``bulk_create``
+    skips: the counters, the comment words, the trending scores, the site
+    word stats and the cached pages.
+    """
+    reconcile_counters()
+    rebuild_comment_word_counts()
+    rebuild_trending_scores()
+    compute_word_stats(workers=1)
+    invalidate_posts()
+
+
+def generate_synthetic_data(users: int, categories: int, posts: int, comments: int,
+                            exponent: float = DEFAULT_ZIPF, seed: int = 0,
+                            batch_size: int = SYNTHETIC_BATCH_SIZE) -> SyntheticData:
+    """
+    Add users, categories, posts and Zipf distributed comments with
+    ``bulk_create``; the same seed on the same database gives the same data.
+    The rows are committed together, then the derived data is refreshed, so
+    no cache is filled from rows that are not visible yet.
+    """
+    if users < 1 and (categories or posts or comments):
+        raise ValueError('Categories, posts and comments need at least one user')
+    if categories < 1 and posts:
+        raise ValueError('Posts need at least one category')
+    if posts < 1 and comments:
+        raise ValueError('Comments need at least one post')
+    text = TextGenerator(random.Random(seed), exponent=exponent)
+    with transaction.atomic():
+        author_ids = create_users(users, batch_size=batch_size)
+        data = SyntheticData(users=author_ids,
+                             categories=create_categories(categories, text, author_ids),
+                             posts=[])
+        data.posts = create_posts(posts, text, data.categories, author_ids, batch_size)
+        data.comments = create_comments(comments, text, data.posts, author_ids, exponent,
+                                        batch_size)
+    refresh_derived_data()
+    return data
@@ -0,0 +1,50 @@
+from django import template
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from press.caching import NAVBAR_PLACEHOLDER, PAGE_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+class CachedContentNode(template.Node):
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        request = context.get('request')
+        key = getattr(request, 'page_cache_key', None)
+        # Anonymous pages are cached whole by the view decorator.
+        if not key or not request.user.is_authenticated:
+            return self.nodelist.render(context)
+        key = f'{key}:content'
+        content = cache.get(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, PAGE_CACHE_TIMEOUT)
+        return content
+
+
+@register.tag
+def cached_content(parser, token):
+    """
+    Cache the enclosed block for authenticated users under the page key set
+    by ``cache_page_by_version``; render it as is on other pages.
+    """
+    nodelist = parser.parse(('endcached_content',))
+    parser.delete_first_token()
+    return CachedContentNode(nodelist)
+
+
+@register.simple_tag(takes_context=True)
+def navbar(context):
+    """
+    The navbar, or on pages cached whole for anonymous readers a placeholder
+    ``cache_page_by_version`` fills in, so the category counts in it never
+    expire the pages.
+    """
+    request = context.get('request')
+    if getattr(request, 'page_cache_key', None) and not request.user.is_authenticated:
+        return mark_safe(NAVBAR_PLACEHOLDER.decode())
+    return context.template.engine.get_template('navbar.html').render(context)
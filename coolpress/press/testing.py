@@ -0,0 +1,166 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting how many queries a page costs.
+
+    ``assertQueryBudget`` fails when a GET runs more queries than allowed and
+    ``assertConstantQueries`` fails when the number of queries of a page
+    changes after ``grow`` adds more rows, which is how N+1 queries show up.
+    Caches are cleared before measuring so every run starts cold.
+    """
+
+    def count_queries(self, url: str, **params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return context
+
+    def format_queries(self, context) -> str:
+        return '\n'.join(f"{number}. {query['sql']}"
+                         for number, query in enumerate(context.captured_queries, start=1))
+
+    def assertQueryBudget(self, budget: int, url: str, **params):
+        context = self.count_queries(url, **params)
+        self.assertLessEqual(len(context), budget,
+                             f'{url} ran {len(context)} queries, the budget is {budget}:\n'
+                             f'{self.format_queries(context)}')
+
+    def assertConstantQueries(self, url: str, grow: Callable[[], None], **params):
+        before = self.count_queries(url, **params)
+        grow()
+        after = self.count_queries(url, **params)
+        self.assertEqual(len(before), len(after),
+                         f'{url} went from {len(before)} to {len(after)} queries:\n'
+                         f'{self.format_queries(after)}')
+
+
+class QueryPlanMixin:
+    """
+    TestCase mixin checking the SQLite plan of a queryset: every table must be
+    read through an index and no temporary B-tree may be built for sorting.
+    """
+    bad_plan_steps = ('USE TEMP B-TREE',)
+
+    def query_plan(self, queryset) -> List[str]:
+        return queryset.explain().splitlines()
+
+    def assertIndexedPlan(self, queryset, index: str = None):
+        plan = self.query_plan(queryset)
+        report = f'{queryset.query}\n' + '\n'.join(plan)
+        for step in plan:
+            detail = step.split(maxsplit=3)[-1]
+            self.assertFalse(detail.startswith('SCAN') and 'INDEX' not in detail,
+                             f'Full scan:\n{report}')
+            self.assertFalse(any(bad in detail for bad in self.bad_plan_steps),
+                             f'Temporary sort:\n{report}')
+        if index:
+            self.assertIn(index, '\n'.join(plan), f'{index} is not used:\n{report}')
+
+
+def mediastack_article(number: int, category: str = None, **fields) -> dict:
+    """
+    A canned mediastack result, newer for lower numbers. Without a ``category``
+    the articles alternate between general and business; ``fields`` override
+    any key.
+    """
+    category = category or ['general', 'business'][number % 2]
+    published_at = datetime.datetime(2022, 11, 24, tzinfo=datetime.timezone.utc) - \
+        datetime.timedelta(hours=number)
+    article = {
+        "author": f"Staff Writer {number % 3}",
+        "title": f"{category} story {number}",
+        "description": f"Canned {category} story number {number}",
+        "url": f"https://example.com/{category}/{number}",
+        "source": "example",
+        "image": None,
+        "category": category,
+        "language": "en",
+        "country": "us",
+        "published_at": published_at.isoformat()
+    }
+    article.update(fields)
+    return article
+
+
+class StubMediastackServer:
+    """
+    Replays canned mediastack results on a local port, as a context manager.
+    ``articles`` are filtered by the ``categories``, ``countries``,
+    ``languages`` and ``sources`` params like the real API and pages are cut
+    with the ``limit``/``offset`` params.
+    """
+    filters = {'categories': 'category', 'countries': 'country', 'languages': 'language',
+               'sources': 'source'}
+
+    def __init__(self, articles: List[dict]):
+        self.articles = articles
+        self.requests = []
+        self.failing_offsets = set()
+        # offset -> (status, body) answered instead of the page.
+        self.broken_offsets = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                stub.requests.append(params)
+                offset, limit = int(params.get('offset', 0)), int(params.get('limit', 25))
+                if offset in stub.failing_offsets:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if offset in stub.broken_offsets:
+                    status, body = stub.broken_offsets[offset]
+                    self.send_response(status)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                results = stub.matching(params)
+                payload = {
+                    'pagination': {'limit': limit, 'offset': offset,
+                                   'count': len(results[offset:offset + limit]),
+                                   'total': len(results)},
+                    'data': results[offset:offset + limit],
+                }
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1/news'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def matching(self, params: dict) -> List[dict]:
+        results = self.articles
+        for param, key in self.filters.items():
+            if param in params:
+                values = params[param].split(',')
+                results = [article for article in results if article[key] in values]
+        return results
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
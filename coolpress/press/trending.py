@@ -0,0 +1,121 @@
+import math
+from datetime import datetime
+from typing import List
+
+from django.db import transaction
+from django.utils import timezone
+
+from press.models import Comment, Post, TrendingScore, TrendingWindow
+
+TRENDING_MIN_COMMENTS = 5
+# The windows are half-lives: old comments never leave them, they only weigh
+# less. A trending post needs TRENDING_MIN_COMMENTS comments and a decayed
+# score of at least TRENDING_MIN_SCORE, what that many comments made one
+# half-life ago are worth now, so the minimum is on recent comments rather
+# than on the all-time count.
+TRENDING_MIN_SCORE = TRENDING_MIN_COMMENTS / 2
+DEFAULT_WINDOW = TrendingWindow.WEEK
+MIN_SCORE = 1e-12
+
+
+def decayed(score: float, since: datetime, now: datetime, half_life: int) -> float:
+    elapsed = (now - since).total_seconds()
+    return score * 2 ** (-elapsed / half_life)
+
+
+def rank_for(score: float, at: datetime, half_life: int) -> float:
+    return math.log2(max(score, MIN_SCORE)) + at.timestamp() / half_life
+
+
+def apply_comment_to_score(trending: TrendingScore, created_at: datetime, weight: int):
+    half_life = TrendingWindow.HALF_LIVES[trending.window]
+    now = max(created_at, trending.decayed_at)
+    score = decayed(trending.score, trending.decayed_at, now, half_life)
+    score += weight * 2 ** (-(now - created_at).total_seconds() / half_life)
+    trending.score = max(score, 0)
+    trending.rank = rank_for(trending.score, now, half_life)
+    trending.decayed_at = now
+    trending.comment_count = max(trending.comment_count + weight, 0)
+
+
+@transaction.atomic
+def update_post_trending(post_id: int, created_at: datetime, weight: int = 1):
+    """
+    Add (weight=1) or remove (weight=-1) one comment created at ``created_at``
+    to the trending scores of its post in every window.
+    """
+    scores = TrendingScore.objects.select_for_update().filter(post_id=post_id)
+    existing = list(scores.all())
+    if weight > 0 and len(existing) < len(TrendingWindow.HALF_LIVES):
+        # Rows that do not exist cannot be locked: the missing windows are
+        # inserted empty, skipping any another comment has just inserted, and
+        # read again.
+        TrendingScore.objects.bulk_create([TrendingScore(post_id=post_id, window=window,
+                                                         decayed_at=created_at)
+                                           for window in TrendingWindow.HALF_LIVES],
+                                          ignore_conflicts=True)
+        existing = list(scores.all())
+    for trending in existing:
+        apply_comment_to_score(trending, created_at, weight)
+        trending.save(update_fields=['score', 'rank', 'decayed_at', 'comment_count'])
+
+
+def redecay_trending_scores(now: datetime = None, batch_size: int = 1000) -> int:
+    """
+    Bring every stored score to ``now``. Ranks are time invariant, so this only
+    refreshes the displayed scores; it never changes the order of the posts.
+    """
+    now = now or timezone.now()
+    updated = 0
+    pending = []
+    for trending in TrendingScore.objects.order_by('id').iterator(chunk_size=batch_size):
+        half_life = TrendingWindow.HALF_LIVES[trending.window]
+        trending.score = decayed(trending.score, trending.decayed_at, now, half_life)
+        trending.decayed_at = now
+        pending.append(trending)
+        if len(pending) >= batch_size:
+            TrendingScore.objects.bulk_update(pending, ['score', 'decayed_at'])
+            updated += len(pending)
+            pending = []
+    TrendingScore.objects.bulk_update(pending, ['score', 'decayed_at'])
+    return updated + len(pending)
+
+
+@transaction.atomic
+def rebuild_trending_scores(now: datetime = None, batch_size: int = 1000) -> int:
+    now = now or timezone.now()
+    TrendingScore.objects.all().delete()
+    scores = {}
+    comments = Comment.objects.order_by().values_list('post_id', 'creation_date')
+    for post_id, created_at in comments.iterator(chunk_size=batch_size):
+        for window in TrendingWindow.HALF_LIVES:
+            trending = scores.get((post_id, window))
+            if trending is None:
+                trending = TrendingScore(post_id=post_id, window=window, decayed_at=now)
+                scores[(post_id, window)] = trending
+            apply_comment_to_score(trending, created_at, 1)
+    TrendingScore.objects.bulk_create(scores.values(), batch_size=batch_size)
+    return len(scores)
+
+
+def min_rank(window: str, now: datetime) -> float:
+    """The rank of a score worth TRENDING_MIN_SCORE at ``now``."""
+    return rank_for(TRENDING_MIN_SCORE, now, TrendingWindow.HALF_LIVES[window])
+
+
+def get_trending_scores(window: str = DEFAULT_WINDOW, limit: int = 20,
+                        now: datetime = None) -> List[TrendingScore]:
+    return list(TrendingScore.objects.filter(window=window,
+                                             rank__gte=min_rank(window, now or timezone.now()),
+                                             comment_count__gte=TRENDING_MIN_COMMENTS)
+                .select_related('post__category', 'post__author__user')
+                .order_by('-rank')[:limit])
+
+
+def current_score(trending: TrendingScore, now: datetime = None) -> float:
+    return decayed(trending.score, trending.decayed_at, now or timezone.now(),
+                   TrendingWindow.HALF_LIVES[trending.window])
+
+
+def trending_posts(window: str = DEFAULT_WINDOW, limit: int = 20) -> List[Post]:
+    return [trending.post for trending in get_trending_scores(window, limit)]
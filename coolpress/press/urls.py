@@ -9,6 +9,9 @@ router = routers.DefaultRouter()
 router.register(r'categories', views.CategoryViewSet)
 router.register(r'posts', views.PostViewSet)
 router.register(r'authors', views.AuthorsViewSet)
+router.register(r'word-stats', views.WordStatViewSet)
+router.register(r'trending', views.TrendingPostViewSet, basename='trending')
+router.register(r'search', views.PostSearchViewSet, basename='search')
 
 urlpatterns = [
     path('home/', views.home, name='home'),
@@ -20,6 +23,8 @@ urlpatterns = [
     path('post/add/', views.post_update, name='post-add'),
     path('authors/', views.authors_list, name='authors-list'),
     path('trending/', views.trending_posts_list, name='trending-posts-list'),
+    path('search/', views.search, name='posts-search'),
+    path('export/<str:dataset>/', views.export, name='export'),
     path('author/<int:user_id>', views.cu_detail, name='cooluser-detail'),
     path('posts/author/<str:username>', AuthorPosts.as_view(), name='author-posts'),
 
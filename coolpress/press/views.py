@@ -1,32 +1,80 @@
 import datetime
 
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
-from django.db.models import Count, Max
-from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest, \
+    StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import add_never_cache_headers
+from django.utils.functional import SimpleLazyObject
 from django.views import View
 from django.views.generic import TemplateView, ListView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, permissions, viewsets
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import GenericViewSet
 
-from press.models import Category, Post, CoolUser, Comment, PostStatus
+from press.models import Category, Post, CoolUser, Comment, CommentStatus, PostStatus, WordStat, \
+    WordStatScope, TrendingWindow
+from press.caching import CATEGORIES_SCOPE, GLOBAL_SCOPE, TRENDING_SCOPE, cache_page_by_version, \
+    post_scope
+from press.conditional import ConditionalGetMixin
+from press.export import EXPORT_FORMATS, GZIP_CONTENT_TYPE, ExportError, export_bytes, \
+    export_filename, export_text
+from press.fast_lists import FastListMixin
 from press.forms import PostForm, CategoryForm, CommentForm
-from press.serializers import CategorySerializer, PostSerializer, AuthorSerializer
-from press.stats_manager import comment_analyzer
+from press.pagination import KeysetPagination, KeysetPaginationMixin
+from press.serializers import CategorySerializer, PostSerializer, AuthorSerializer, \
+    WordStatSerializer, TrendingScoreSerializer, SearchResultSerializer
+from press.search import search_posts
+from press.stats_manager import Stats, top_comment_words, top_words
+from press.trending import DEFAULT_WINDOW, trending_posts, get_trending_scores
+from press.word_clouds import get_word_cloud_svg
 
 
+# Columns the post cards of the list templates render.
+POST_CARD_FIELDS = ['id', 'title', 'body', 'image_link', 'last_update', 'category__slug',
+                    'author__user__username']
+
+
+def with_post_cards(queryset):
+    return queryset.select_related('category', 'author__user').only(*POST_CARD_FIELDS)
+
+
+# The navbar is not part of the cached pages: only the category list of the
+# home page depends on the categories.
+def home_scopes(**kwargs):
+    return [GLOBAL_SCOPE, CATEGORIES_SCOPE]
+
+
+def list_scopes(**kwargs):
+    return [GLOBAL_SCOPE]
+
+
+def trending_scopes(**kwargs):
+    return [GLOBAL_SCOPE, TRENDING_SCOPE]
+
+
+def post_scopes(post_id, **kwargs):
+    return [post_scope(post_id)]
+
+
+# The context of the cached views is lazy: when the content comes from the
+# cache its queries never run.
+@cache_page_by_version(home_scopes)
 def home(request):
-    categories = Category.objects.all().annotate(p_count=Count('post'))
-    posts = Post.objects.all()[:5]
+    categories = Category.objects.all()
+    posts = with_post_cards(Post.objects.all())[:5]
+    site_top_words = SimpleLazyObject(lambda: top_words(WordStatScope.SITE))
 
-    return render(request, 'home.html', {'cat_obj': categories, 'posts_list': posts})
+    return render(request, 'home.html', {'cat_obj': categories, 'posts_list': posts,
+                                         'top_words': site_top_words})
 
 
 def authors_list(request):
-    objects = CoolUser.objects.all()
+    objects = CoolUser.objects.select_related('user')
 
     return render(request, 'authors_list.html', {'author_obj': objects})
 
@@ -35,28 +83,67 @@ def render_a_post(post):
     return f'<div style="margin: 20px;padding-bottom: 10px;"><h2>{post.title}</h2><p style="color: gray;">{post.body}</p><p>{post.author.user.username}</p></div>'
 
 
+@cache_page_by_version(list_scopes)
 def posts_list(request):
-    objects = Post.objects.all()[:20]
+    objects = with_post_cards(Post.objects.all())[:20]
     return render(request, 'posts_list.html', {'posts_list': objects})
 
 
+def get_trending_window(request):
+    window = request.GET.get('window', DEFAULT_WINDOW)
+    if window not in TrendingWindow.HALF_LIVES:
+        return DEFAULT_WINDOW
+    return window
+
+
+@cache_page_by_version(trending_scopes)
 def trending_posts_list(request):
-    objects = Post.objects.annotate(c_count=Count('comment')) \
-                  .annotate(latest_comment=Max('comment__creation_date')).filter(c_count__gte=5) \
-                  .order_by('-c_count').order_by('-latest_comment')[:20]
+    window = get_trending_window(request)
+    objects = SimpleLazyObject(lambda: trending_posts(window))
+
+    return render(request, 'trending_posts_list.html', {'trending_posts_list': objects,
+                                                        'window': window,
+                                                        'windows': list(TrendingWindow.HALF_LIVES)})
+
 
-    return render(request, 'trending_posts_list.html', {'trending_posts_list': objects})
+def get_search_page_number(request) -> int:
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return 1
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = search_posts(query, get_search_page_number(request))
+    return render(request, 'search_results.html', {'query': query, 'page_obj': page,
+                                                   'results': page.results})
+
+
+def get_post_comments(post):
+    return post.comment_set.filter(status=CommentStatus.PUBLISHED).select_related('author__user') \
+        .order_by('-creation_date')
 
 
+@cache_page_by_version(post_scopes)
 def post_detail(request, post_id):
-    post = Post.objects.get(id=post_id)
+    post = get_object_or_404(Post.objects.select_related('category', 'author__user'), id=post_id)
     data = request.POST or {'votes': 10}
     form = CommentForm(data)
 
-    comments = post.comment_set.filter(status='PUBLISHED').order_by('-creation_date')
-    stats = comment_analyzer(comments)
+    comments = get_post_comments(post)
+    stats = Stats.from_counts(dict(top_comment_words(post, limit=20)))
     comment_stats = stats.top(10)
-    return render(request, 'post_detail.html', {'post_obj': post, 'comment_form': form, 'comments': comments, 'comment_stats': comment_stats, 'stats': stats})
+    cloud_words = dict(stats.top(20))
+    word_cloud_svg = get_word_cloud_svg(cloud_words)
+    cloud_pending = cloud_words and word_cloud_svg is None
+    if cloud_pending:
+        # Keep the page out of the cache until the word cloud is rendered.
+        request.page_cache_key = None
+    response = render(request, 'post_detail.html', {'post_obj': post, 'comment_form': form, 'comments': comments, 'comment_stats': comment_stats, 'word_cloud_svg': word_cloud_svg})
+    if cloud_pending:
+        add_never_cache_headers(response)
+    return response
 
 
 @login_required
@@ -111,14 +198,32 @@ def new_category(request):
 
 
 def cu_detail(request, user_id):
-    cu = CoolUser.objects.get(id=user_id)
-    return render(request, 'cooluser_detail.html', {'object': cu})
-
-
-
-class PostClassBasedListView(ListView):
+    cu = get_object_or_404(CoolUser.objects.select_related('user'), id=user_id)
+    author_top_words = top_words(WordStatScope.AUTHOR, cu.id)
+    return render(request, 'cooluser_detail.html', {'object': cu, 'top_words': author_top_words})
+
+
+@staff_member_required
+def export(request, dataset):
+    export_format = request.GET.get('format', 'ndjson')
+    compress = request.GET.get('gzip') == '1'
+    try:
+        text = export_text(dataset, request.GET, export_format)
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
+    response = StreamingHttpResponse(
+        export_bytes(text, compress),
+        content_type=GZIP_CONTENT_TYPE if compress else EXPORT_FORMATS[export_format])
+    filename = export_filename(dataset, export_format, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class PostClassBasedListView(KeysetPaginationMixin, ListView):
     paginate_by = 20
-    queryset = Post.objects.filter(status=PostStatus.PUBLISHED).order_by('-last_update')
+    cursor_field = 'last_update'
+    queryset = with_post_cards(Post.objects.filter(status=PostStatus.PUBLISHED)) \
+        .order_by('-last_update')
     context_object_name = 'posts_list'
     template_name = 'posts_list.html'
 
@@ -127,9 +232,8 @@ class AuthorPosts(PostClassBasedListView):
 
     def get_queryset(self):
         queryset = super(AuthorPosts, self).get_queryset()
-        username = get_object_or_404(User, username=self.kwargs['username'])
-        user = User.objects.get(username=username)
-        author = CoolUser.objects.get(user_id=user.id)
+        author = get_object_or_404(CoolUser.objects.only('id'),
+                                   user__username=self.kwargs['username'])
         return queryset.filter(author=author)
 
 
@@ -146,7 +250,7 @@ class ModelNonDeletableViewSet(mixins.CreateModelMixin,
     pass
 
 
-class CategoryViewSet(ModelNonDeletableViewSet):
+class CategoryViewSet(ConditionalGetMixin, ModelNonDeletableViewSet):
     """
     API endpoint that allows users to be viewed or edited.
     """
@@ -172,26 +276,74 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         return obj.author == request.user.cooluser
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
     """
     queryset = Post.objects.all().filter(status=PostStatus.PUBLISHED) \
         .order_by('-creation_date')
     serializer_class = PostSerializer
+    fast_fields = {'id': 'id', 'title': 'title', 'body': 'body', 'category': 'category_id',
+                   'author': 'author_id', 'creation_date': 'creation_date'}
     permission_classes = [permissions.IsAuthenticatedOrReadOnly,
                           IsOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['category']
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user.cooluser)
 
 
-class AuthorsViewSet(viewsets.ReadOnlyModelViewSet):
+class AuthorsViewSet(ConditionalGetMixin, FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
     """
-    queryset = CoolUser.objects.alias(posts=Count('post')).filter(posts__gte=1)
+    queryset = CoolUser.objects.filter(post_count__gte=1).select_related('user').order_by('id')
     serializer_class = AuthorSerializer
+    fast_fields = {'id': 'id', 'user': {'id': 'user_id', 'username': 'user__username'},
+                   'github_profile': 'github_profile'}
     permission_classes = [permissions.IsAuthenticated]
+
+
+class WordStatViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that allows the precomputed top words to be viewed.
+    """
+    queryset = WordStat.objects.order_by('scope', 'scope_id', '-count', 'word')
+    serializer_class = WordStatSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['scope', 'scope_id']
+
+
+class TrendingPostViewSet(viewsets.ViewSet):
+    """
+    API endpoint that lists the trending posts of a window (?window=24h, 7d or 30d).
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def list(self, request):
+        scores = get_trending_scores(get_trending_window(request))
+        serializer = TrendingScoreSerializer(scores, many=True)
+        return Response(serializer.data)
+
+
+class PostSearchViewSet(viewsets.ViewSet):
+    """
+    API endpoint that searches the published posts (?q=words&page=2), best matches first.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_link(self, request, page_number: int):
+        return replace_query_param(request.build_absolute_uri(), 'page', page_number)
+
+    def list(self, request):
+        page = search_posts(request.query_params.get('q', ''), get_search_page_number(request))
+        serializer = SearchResultSerializer(page.results, many=True)
+        return Response({
+            'next': self.get_link(request, page.next_page_number) if page.has_next else None,
+            'previous': self.get_link(request, page.previous_page_number)
+            if page.has_previous else None,
+            'results': serializer.data,
+        })
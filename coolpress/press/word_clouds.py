@@ -0,0 +1,60 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.core.cache import caches
+
+from press.stats_manager import word_cloud_from_frequencies
+
+logger = logging.getLogger(__name__)
+
+WORD_CLOUD_CACHE = 'wordclouds'
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wordcloud')
+_in_flight = set()
+_lock = threading.Lock()
+
+
+def word_cloud_key(frequencies: Dict[str, int]) -> str:
+    payload = json.dumps(sorted(frequencies.items()), separators=(',', ':'))
+    return f"wordcloud:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+
+def render_word_cloud_svg(frequencies: Dict[str, int]) -> str:
+    return word_cloud_from_frequencies(frequencies).to_svg()
+
+
+def _render_and_store(key: str, frequencies: Dict[str, int]):
+    try:
+        caches[WORD_CLOUD_CACHE].set(key, render_word_cloud_svg(frequencies), timeout=None)
+    except Exception:
+        logger.exception('Could not render the word cloud %s', key)
+    finally:
+        with _lock:
+            _in_flight.discard(key)
+
+
+def schedule_word_cloud(frequencies: Dict[str, int]) -> Optional[Future]:
+    key = word_cloud_key(frequencies)
+    with _lock:
+        if key in _in_flight:
+            return None
+        _in_flight.add(key)
+    return _executor.submit(_render_and_store, key, dict(frequencies))
+
+
+def get_word_cloud_svg(frequencies: Dict[str, int]) -> Optional[str]:
+    """
+    Return the cached SVG of the word cloud for these frequencies. On a miss
+    the cloud is rendered by a background worker and None is returned, so the
+    page can be served right away without it.
+    """
+    if not frequencies:
+        return None
+    svg = caches[WORD_CLOUD_CACHE].get(word_cloud_key(frequencies))
+    if svg is None:
+        schedule_word_cloud(frequencies)
+    return svg